@@ -0,0 +1,95 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compare validating model tests for upload one ModelTest at a time with
+validating them as a ModelTestBatch.
+
+Usage: python benchmarks/batch_validation.py [--rows 100000] [--repeats 5]
+
+Both validate the same columns of field values and then build the
+dictionaries that create requests send.
+"""
+
+import argparse
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from ringling_lib.batch import ModelTestBatch
+from ringling_lib.model_test import ModelTest
+
+
+def make_columns(rows):
+    """
+    Build the columns of model tests
+    :param rows: the number of model tests
+    :return: a dictionary of field:list of values
+    """
+    start = datetime(2023, 1, 1)
+    return {"project_id": [1] * rows,
+            "parameter_set_id": [2] * rows,
+            "model_id": [row % 100 for row in range(rows)],
+            "test_timestamp": [(start + timedelta(seconds=row)).isoformat()
+                               for row in range(rows)],
+            "test_metrics": [{"recall": (row % 1000) / 1000} for row in range(rows)],
+            "passed_testing": [row % 7 != 0 for row in range(rows)],
+            "metadata": [{} for _ in range(rows)]}
+
+
+def best_time(repeats, function, *args):
+    """
+    Measure the best time of a function
+    :param repeats: the number of times to run it
+    :param function: the function
+    :param args: the arguments of the function
+    :return: the best time in seconds and the result of the last run
+    """
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    columns = make_columns(args.rows)
+    ways = {
+        "objects": (lambda: [ModelTest(*row) for row in zip(*columns.values())],
+                    lambda tests: [test.to_dict() for test in tests]),
+        "batch": (lambda: ModelTestBatch(**columns), ModelTestBatch.to_records),
+    }
+
+    print(f"{args.rows:,} model tests")
+    for name, (validate, to_dicts) in ways.items():
+        validate_time, records = best_time(args.repeats, validate)
+        to_dicts_time, _ = best_time(args.repeats, to_dicts, records)
+        print(f"{name:<8} validate {validate_time * 1000:8.1f} ms  "
+              f"to dictionaries {to_dicts_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
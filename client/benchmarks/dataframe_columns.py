@@ -0,0 +1,107 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compare building a DataFrame of model tests from ModelTest objects with
+building it from the columns of the decoded json pages.
+
+Usage: python benchmarks/dataframe_columns.py [--rows 1000000] [--page-size 1000]
+
+Run from the client directory with numpy and pandas installed.  The rows are
+pages of decoded json as list_model_tests reads them, so the time measured
+is that of turning them into a DataFrame, not of downloading them.
+"""
+
+import argparse
+import gc
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import pandas
+
+from ringling_lib.frames import model_test_columns
+from ringling_lib.ringling_db import json_to_model_test
+
+
+def make_pages(rows, page_size):
+    """
+    Build pages of model test json like those listed by Ringling
+    :param rows: the number of model tests
+    :param page_size: the number of model tests per page
+    :return: the list of pages
+    """
+    start = datetime(2023, 1, 1)
+    tests = [{"test_id": test_id, "project_id": 1, "parameter_set_id": 2,
+              "model_id": test_id % 100, "passed_testing": test_id % 7 != 0,
+              "test_timestamp": (start + timedelta(seconds=test_id)).isoformat(),
+              "test_metrics": {"recall": (test_id % 1000) / 1000, "rows": test_id},
+              "metadata": {}}
+             for test_id in range(rows)]
+    return [tests[offset:offset + page_size] for offset in range(0, rows, page_size)]
+
+
+def from_objects(pages):
+    """
+    Build the DataFrame the way a caller of list_model_tests does: a ModelTest
+    per row, then a row per object with its metrics and parsed timestamp
+    :param pages: the pages of model test json
+    :return: the DataFrame
+    """
+    tests = dict(json_to_model_test(obj, True) for page in pages for obj in page)
+    rows = [{"test_id": test_id, "project_id": test.project_id,
+             "parameter_set_id": test.parameter_set_id, "model_id": test.model_id,
+             "test_timestamp": datetime.fromisoformat(test.test_timestamp),
+             "passed_testing": test.passed_testing,
+             **{f"test_metrics.{key}": value for key, value in test.test_metrics.items()}}
+            for test_id, test in tests.items()]
+    return pandas.DataFrame(rows)
+
+
+def from_columns(pages):
+    """
+    Build the DataFrame as model_tests_dataframe does
+    :param pages: the pages of model test json
+    :return: the DataFrame
+    """
+    builder = model_test_columns()
+    for page in pages:
+        builder.add_page(page)
+    return builder.to_dataframe()
+
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    pages = make_pages(args.rows, args.page_size)
+    print(f"{args.rows:,} model tests in pages of {args.page_size:,}")
+    for name, build in [("objects", from_objects), ("columns", from_columns)]:
+        gc.collect()
+        start = time.perf_counter()
+        frame = build(pages)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} {elapsed:8.2f} s  {args.rows / elapsed:12,.0f} rows/s  "
+              f"{frame.memory_usage(deep=True).sum() / args.rows:6.0f} bytes/row")
+        del frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compare peak memory and time of the hex encoded pickle path with the
+protocol 5 out-of-band path for a model made of large arrays.
+
+Usage: python benchmarks/out_of_band_pickle.py [--size-mb 1024] [--arrays 8]
+
+Uses numpy arrays when numpy is installed, and PickleBuffer wrapped
+bytearrays otherwise.
+"""
+
+import argparse
+import gc
+import pickle
+import time
+import tracemalloc
+
+from ringling_lib.serialization import deserialize_model
+from ringling_lib.serialization import dumps_out_of_band
+from ringling_lib.serialization import loads_out_of_band
+from ringling_lib.serialization import serialize_model
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def make_model(size_mb, arrays):
+    """
+    Build a model holding size_mb of array data
+    :param size_mb: the total size of the arrays in MiB
+    :param arrays: the number of arrays
+    :return: the model
+    """
+    length = size_mb * 1024 * 1024 // arrays
+    if np is not None:
+        return {"layers": [np.full(length // 8, i, dtype=np.float64) for i in range(arrays)]}
+    return {"layers": [pickle.PickleBuffer(bytearray([i % 256]) * length)
+                       for i in range(arrays)]}
+
+
+def measure(func, arg):
+    """
+    Call a function and measure its run time and the peak memory it allocates
+    :param func: the function
+    :param arg: the argument to call it with
+    :return: the result, the time in seconds, and the peak in MiB
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(arg)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def run(name, dump, load, model):
+    """
+    Measure one serialization path
+    :param name: the name of the path
+    :param dump: the serialization function
+    :param load: the deserialization function
+    :param model: the model
+    :return: None
+    """
+    artifact, dump_time, dump_peak = measure(dump, model)
+    loaded, load_time, load_peak = measure(load, artifact)
+    del artifact, loaded
+    print(f"{name:<22} dump {dump_time:7.2f} s {dump_peak:9.0f} MiB   "
+          f"load {load_time:7.2f} s {load_peak:9.0f} MiB")
+
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--arrays", type=int, default=8)
+    args = parser.parse_args()
+
+    model = make_model(args.size_mb, args.arrays)
+    print(f"{args.size_mb} MiB model in {args.arrays} "
+          f"{'numpy arrays' if np is not None else 'PickleBuffers'}")
+    run("hex pickle", lambda obj: pickle.dumps(obj, protocol=5).hex(),
+        lambda text: pickle.loads(bytes.fromhex(text)), model)
+    run("hex out-of-band", serialize_model, deserialize_model, model)
+    run("binary out-of-band", dumps_out_of_band, loads_out_of_band, model)
+
+
+if __name__ == "__main__":
+    main()
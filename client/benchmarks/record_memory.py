@@ -0,0 +1,92 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Measure the memory per record and the construction rate of the slotted
+TrainedModel and ModelTest records against the same records with a
+per-instance __dict__.
+
+Usage: python benchmarks/record_memory.py [--rows 1000000]
+
+The records of a run share their field values, so the memory measured is
+that of the records themselves.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from ringling_lib.model_test import ModelTest
+from ringling_lib.trained_model import TrainedModel
+
+
+def dict_class(record_class):
+    """
+    Build a class that initializes like a record class but keeps its fields in a __dict__
+    :param record_class: the slotted record class
+    :return: the class
+    """
+    return type(f"{record_class.__name__}Dict", (),
+                {"__init__": record_class.__init__, "__doc__": record_class.__doc__})
+
+
+def measure(record_class, args, rows):
+    """
+    Build records and measure how fast they are built, then build them again
+    under tracemalloc to measure the memory they take
+    :param record_class: the class of the records
+    :param args: the arguments of each record
+    :param rows: the number of records
+    :return: the bytes per record and the records built per second
+    """
+    gc.collect()
+    start = time.perf_counter()
+    records = [record_class(*args) for _ in range(rows)]
+    elapsed = time.perf_counter() - start
+    del records
+
+    gc.collect()
+    tracemalloc.start()
+    records = [record_class(*args) for _ in range(rows)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / rows, rows / elapsed
+
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    now = datetime.now().isoformat()
+    records = [
+        (TrainedModel, (1, 1, now, now, "", now, "testing", now, {"accuracy": 0.9}, True, {})),
+        (ModelTest, (1, 1, 1, now, {"recall": 0.5}, True, {})),
+    ]
+    print(f"{args.rows:,} records of each type")
+    for record_class, record_args in records:
+        for cls in [dict_class(record_class), record_class]:
+            per_record, rate = measure(cls, record_args, args.rows)
+            print(f"{cls.__name__:<16} {per_record:8.0f} bytes/record {rate:12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ from .response_handling import handle_create
 from .response_handling import handle_get
 from .response_handling import perform_list
 from .response_handling import connection_error
+from .response_handling import handle_library_errors
 
 
 
@@ -34,6 +35,7 @@ def get_url(base_url):
     return base_url + "/v1/model_tests"
 
 
+@handle_library_errors
 def create_model_test(session, obj):
     """
     Create a model test on the Ringling service
@@ -45,6 +47,7 @@ def create_model_test(session, obj):
     print(f"Model Test created with ID {cur_id}")
 
 
+@handle_library_errors
 def get_model_test(session, model_test_id):
     """
     Get a model test given an ID
@@ -55,6 +58,7 @@ def get_model_test(session, model_test_id):
     pprint.pprint(session.get_model_test_json(model_test_id))
 
 
+@handle_library_errors
 def list_model_tests(session):
     """
     List all the model tests in the Ringling Service
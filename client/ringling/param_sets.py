@@ -24,6 +24,7 @@ from .response_handling import handle_get
 from .response_handling import handle_modify
 from .response_handling import perform_list
 from .response_handling import connection_error
+from .response_handling import handle_library_errors
 
 
 
@@ -35,6 +36,7 @@ def get_url(base_url):
     return base_url + "/v1/parameter_sets"
 
 
+@handle_library_errors
 def create_param_set(session, project_id, training_params, is_active, metadata):
     """
     Create a parameter set on the Ringling service
@@ -49,6 +51,7 @@ def create_param_set(session, project_id, training_params, is_active, metadata):
     print(f"Parameter Set created with ID {cur_id}")
 
 
+@handle_library_errors
 def get_param_set(session, param_set_id):
     """
     Get a parameter set given an ID
@@ -77,6 +80,24 @@ def modify_param_set(base_url, param_set_id, is_active):
         connection_error()
 
 
+@handle_library_errors
+def modify_param_sets(session, is_active, ids, dry_run, filters):
+    """
+    Modify the activity status of many parameter sets with one request
+    :param session: The Ringling session
+    :param is_active: The new activity status
+    :param ids: The IDs of the parameter sets, or None to select them by filters
+    :param dry_run: If the parameter sets should only be listed, not modified
+    :param filters: A dictionary of the filters the parameter sets must match
+    :return: None
+    """
+    result = session.modify_param_sets(is_active, ids, dry_run, **filters)
+    verb = "Would change" if dry_run else "Changed"
+    print(f"{verb} the active status of {result['count']} Parameter Sets to {is_active}:",
+          result["ids"])
+
+
+@handle_library_errors
 def list_param_sets(session):
     """
     List all the parameter sets in the Ringling Service
@@ -24,6 +24,7 @@ from .response_handling import handle_create
 from .response_handling import handle_get
 from .response_handling import perform_list
 from .response_handling import connection_error
+from .response_handling import handle_library_errors
 
 
 
@@ -35,6 +36,7 @@ def get_url(base_url):
     return base_url + "/v1/projects"
 
 
+@handle_library_errors
 def create_project(session, project_name, metadata):
     """
     Create a project on the Ringling service
@@ -52,6 +54,7 @@ def create_project(session, project_name, metadata):
         print(f"Project created with ID {cur_id}")
 
 
+@handle_library_errors
 def list_projects(session):
     """
     List all the projects in the Ringling Service
@@ -61,6 +64,7 @@ def list_projects(session):
     pprint.pprint(session.list_projects_json())
 
 
+@handle_library_errors
 def get_project(session, project_id):
     """
     Return information about a specific project in the Ringling Service by ID
@@ -14,10 +14,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 # pylint: disable=R0801
+import functools
 import sys
 import pprint
 import requests
 from requests.exceptions import ConnectionError as RequestsConnectionError
+from ringling_lib.exceptions import RinglingError
 
 
 def handle_create(response):
@@ -106,3 +108,19 @@ def connection_error():
     """
     print("Can not connect to model management service. Is Ringling running?", file=sys.stderr)
     sys.exit(1)
+
+
+def handle_library_errors(func):
+    """
+    Decorator for commands that use the library, printing its errors and exiting
+    :param func: the command to wrap
+    :return: the wrapped command
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except RinglingError as err:
+            print(err, file=sys.stderr)
+            sys.exit(1)
+    return wrapper
@@ -24,6 +24,7 @@ from .response_handling import handle_get
 from .response_handling import handle_modify
 from .response_handling import perform_list
 from .response_handling import connection_error
+from .response_handling import handle_library_errors
 
 
 
@@ -35,6 +36,7 @@ def get_url(base_url):
     return base_url + "/v1/trained_models"
 
 
+@handle_library_errors
 def create_trained_model(session, obj):
     """
     Create a trained model on the Ringling service
@@ -45,6 +47,7 @@ def create_trained_model(session, obj):
     cur_id = session.create_trained_model(obj)
     print(f"Trained Model created with ID {cur_id}")
 
+@handle_library_errors
 def get_trained_model(session, trained_model_id):
     """
     Get a trained model given an ID
@@ -73,6 +76,37 @@ def modify_trained_model(base_url, model_id, status):
         connection_error()
 
 
+@handle_library_errors
+def modify_trained_models(session, deployment_stage, ids, dry_run, filters):
+    """
+    Modify the deployment status of many trained models with one request
+    :param session: The Ringling session
+    :param deployment_stage: The new deployment status
+    :param ids: The IDs of the trained models, or None to select them by filters
+    :param dry_run: If the models should only be listed, not modified
+    :param filters: A dictionary of the filters the trained models must match
+    :return: None
+    """
+    result = session.modify_trained_models(deployment_stage, ids, dry_run, **filters)
+    verb = "Would change" if dry_run else "Changed"
+    print(f"{verb} the deployment status of {result['count']} Trained Models "
+          f"to {deployment_stage}:", result["ids"])
+
+
+@handle_library_errors
+def promote_trained_model(session, model_id):
+    """
+    Promote a trained model to production, retiring the other production models of its project
+    :param session: The Ringling session
+    :param model_id: The ID of the trained model
+    :return: None
+    """
+    promotion = session.promote_trained_model(model_id)
+    retired = [m["model_id"] for m in promotion["retired"]]
+    print("Trained Model", model_id, "promoted to production, retired", retired)
+
+
+@handle_library_errors
 def list_trained_models(session):
     """
     List all the trained models in the Ringling Service
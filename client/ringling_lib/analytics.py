@@ -0,0 +1,166 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Session methods that read model tests and trained models for analytics, as
+Arrow tables or files, NumPy columns, or DataFrames.
+"""
+
+import requests
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from .arrow_export import check_pyarrow
+from .arrow_export import read_table
+from .arrow_export import EXPORT_FORMATS
+from .frames import check_numpy
+from .frames import check_pandas
+from .frames import model_test_columns
+from .frames import trained_model_columns
+from .response_handling import connection_error
+from .response_handling import raise_for_status
+from .response_handling import DEFAULT_PAGE_SIZE
+from .response_handling import DOWNLOAD_CHUNK_SIZE
+
+
+class AnalyticsMixin:
+    """
+    Analytics methods of RinglingDBSession, which provides the resource urls
+    and _iter_pages they use
+    """
+
+    def _export(self, cur_url, destination, file_format, filters):
+        """
+        Export the objects of a resource type matching filters
+        :param cur_url: The url of the resource type
+        :param destination: A path to write the file to, or None to read it into a table
+        :param file_format: arrow for an Arrow IPC stream, or parquet
+        :param filters: A dictionary of field:value that the objects must match
+        :return: the pyarrow.Table, or the destination path
+        """
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"file_format must be one of {EXPORT_FORMATS}")
+        if destination is None:
+            check_pyarrow()
+        params = dict(filters)
+        params["format"] = file_format
+        try:
+            with requests.get(cur_url + "/export", params=params, stream=True,
+                              timeout=60) as response:
+                raise_for_status(response)
+                if destination is None:
+                    return read_table(response, file_format)
+                with open(destination, "wb") as file:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+                return destination
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def export_model_tests(self, destination=None, file_format="arrow", **filters):
+        """
+        Export model tests with the trained models they ran against, and a
+        typed column named test_metrics.<key> for each test metric.
+        session.export_model_tests(project_id=1).to_pandas() reads them into a DataFrame.
+        :param destination: a path to write the file to, or None to read it into a table,
+        which needs the pyarrow package
+        :param file_format: arrow for an Arrow IPC stream, or parquet
+        :param filters: project_id, parameter_set_id, model_id or passed_testing to
+        select tests, and test_timestamp_from and test_timestamp_until, ISO 8601
+        timestamps, to select a range of test times
+        :return: the pyarrow.Table, or the destination path
+        """
+        return self._export(self.model_test_url, destination, file_format, filters)
+
+    def export_trained_models(self, destination=None, file_format="arrow", **filters):
+        """
+        Export trained models without their model objects, with a typed column
+        named backtest_metrics.<key> for each backtest metric
+        :param destination: a path to write the file to, or None to read it into a table,
+        which needs the pyarrow package
+        :param file_format: arrow for an Arrow IPC stream, or parquet
+        :param filters: project_id, parameter_set_id, deployment_stage or
+        passed_backtesting to select trained models, and train_timestamp_from and
+        train_timestamp_until, ISO 8601 timestamps, to select a range of train times
+        :return: the pyarrow.Table, or the destination path
+        """
+        return self._export(self.trained_model_url, destination, file_format, filters)
+
+    def _columns(self, cur_url, key, builder, *, page_size, filters, timeout):
+        """
+        Collect the columns of a listing, one page at a time
+        :param cur_url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param builder: The ColumnBuilder of the resource type
+        :param page_size: The number of resources to retrieve per request
+        :param filters: A dictionary of field:value that the resources must match
+        :param timeout: The timeout in seconds of each request
+        :return: The ColumnBuilder holding the columns of every page
+        """
+        for page in self._iter_pages(cur_url, key, page_size=page_size, filters=filters,
+                                      timeout=timeout):
+            builder.add_page(page)
+        return builder
+
+    def model_test_columns(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Get the model tests in Ringling as NumPy arrays, one per field and one
+        named test_metrics.<key> per test metric, without building ModelTest objects
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: A dictionary of column name:array in test ID order; needs the numpy package
+        """
+        check_numpy()
+        return self._columns(self.model_test_url, "model_tests", model_test_columns(),
+                             page_size=page_size, filters=filters, timeout=5).to_columns()
+
+    def model_tests_dataframe(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Get the model tests in Ringling as a DataFrame of the columns of model_test_columns
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: A pandas.DataFrame in test ID order; needs the pandas package
+        """
+        check_pandas()
+        return self._columns(self.model_test_url, "model_tests", model_test_columns(),
+                             page_size=page_size, filters=filters, timeout=5).to_dataframe()
+
+    def trained_model_columns(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Get the trained models in Ringling as NumPy arrays, one per field and
+        one named backtest_metrics.<key> per backtest metric, without building
+        TrainedModel objects.  Model objects are downloaded with each page but
+        not kept; export_trained_models leaves them out altogether.
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: A dictionary of column name:array in model ID order; needs the numpy package
+        """
+        check_numpy()
+        return self._columns(self.trained_model_url, "trained_models", trained_model_columns(),
+                             page_size=page_size, filters=filters, timeout=60).to_columns()
+
+    def trained_models_dataframe(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Get the trained models in Ringling as a DataFrame of the columns of
+        trained_model_columns
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: A pandas.DataFrame in model ID order; needs the pandas package
+        """
+        check_pandas()
+        return self._columns(self.trained_model_url, "trained_models", trained_model_columns(),
+                             page_size=page_size, filters=filters, timeout=60).to_dataframe()
@@ -0,0 +1,56 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Reading exports of model tests and trained models, which the service sends
+as Apache Arrow IPC streams or Parquet files with a typed column for each metric.
+"""
+
+import io
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = ["arrow", "parquet"]
+
+
+def check_pyarrow():
+    """
+    Check that exports can be read into tables
+    :return: None
+    :raises ImportError: if the pyarrow package is not installed
+    """
+    if pyarrow is None:
+        raise ImportError("reading exports needs the pyarrow package: "
+                          "pip install ringling-cli[arrow]")
+
+
+def read_table(response, file_format):
+    """
+    Read the body of an export response into a table.  An Arrow IPC stream is
+    read as it arrives, while a Parquet file, whose footer comes last, is read
+    once it has all arrived.
+    :param response: the streamed response object
+    :param file_format: the format of the export, arrow or parquet
+    :return: the pyarrow.Table
+    """
+    if file_format == "parquet":
+        return pyarrow.parquet.read_table(io.BytesIO(response.content))
+    response.raw.decode_content = True
+    with pyarrow.ipc.open_stream(response.raw) as reader:
+        return reader.read_all()
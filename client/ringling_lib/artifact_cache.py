@@ -0,0 +1,276 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+import time
+
+from .exceptions import RinglingIntegrityError
+from .serialization import load_model_file
+from .serialization import write_model_file
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+DEFAULT_MAPPED_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_MAPPED_DIRECTORY = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "ringling", "models")
+TEMP_PREFIX = ".tmp-"
+STALE_TEMP_SECONDS = 60 * 60
+
+
+def cache_file_name(model_id, digest):
+    """
+    Get the name of the file a model object is cached in
+    :param model_id: the ID of the trained model
+    :param digest: the SHA-256 hex digest of the model object
+    :return: the file name
+    """
+    return f"{model_id}-{digest}"
+
+
+def remove_file(path):
+    """
+    Remove a file that another process may have removed already
+    :param path: the path of the file
+    :return: None
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def touch_file(path):
+    """
+    Mark a file as recently used
+    :param path: the path of the file
+    :return: None
+    """
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_files(directory, max_bytes):
+    """
+    Remove the least recently used files of a cache directory until it holds
+    at most max_bytes, along with temporary files left behind by failed writes
+    :param directory: the cache directory
+    :param max_bytes: the maximum total size of the files
+    :return: None
+    """
+    now = time.time()
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if name.startswith(TEMP_PREFIX):
+            if now - file_stat.st_mtime > STALE_TEMP_SECONDS:
+                remove_file(path)
+            continue
+        entries.append((file_stat.st_mtime, file_stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_file(path)
+        total -= size
+
+
+def private_directory(directory):
+    """
+    Create a directory that only the current user can access, or check that
+    an existing one is.  Files unpickled from a directory other users can
+    write to would let them run code as this user.
+    :param directory: the path of the directory
+    :return: None
+    :raises PermissionError: if the directory is a symbolic link, belongs to
+    another user, or can be accessed by other users
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    dir_stat = os.lstat(directory)
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid() \
+            or dir_stat.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory of the current user "
+                              "that other users cannot access")
+
+
+def file_digest(path):
+    """
+    Read a file and compute its digest
+    :param path: the path of the file
+    :return: the contents of the file and their SHA-256 hex digest
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+class ArtifactCache:
+    """
+    On-disk cache of trained model objects, keyed by model ID and digest
+
+    Files are written to a temporary file and atomically renamed into place,
+    so several processes can share one directory.  Every read is checked
+    against the digest in the file name.  The least recently used files are
+    removed once the directory holds more than max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+        :param directory: the directory to store model objects in, created if missing
+        :param max_bytes: the maximum total size of the cached model objects
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, model_id, digest):
+        """
+        Get the path a model object is cached at
+        :param model_id: the ID of the trained model
+        :param digest: the SHA-256 hex digest of the model object
+        :return: the path
+        """
+        return os.path.join(self.directory, cache_file_name(model_id, digest))
+
+    def find_digest(self, model_id):
+        """
+        Find the digest of the cached model object of a trained model
+        :param model_id: the ID of the trained model
+        :return: the digest, or None if the model object is not cached
+        """
+        prefix = cache_file_name(model_id, "")
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix):
+                return name[len(prefix):]
+        return None
+
+    def get(self, model_id, digest):
+        """
+        Read a model object from the cache.  A file that does not match
+        its digest is removed and treated as missing.
+        :param model_id: the ID of the trained model
+        :param digest: the SHA-256 hex digest of the model object
+        :return: the model object bytes, or None if it is not cached
+        """
+        path = self.path(model_id, digest)
+        try:
+            data, actual_digest = file_digest(path)
+        except FileNotFoundError:
+            return None
+
+        if actual_digest != digest:
+            remove_file(path)
+            return None
+
+        touch_file(path)
+        return data
+
+    def store(self, model_id, digest, chunks):
+        """
+        Write a model object to the cache while it is downloaded
+        :param model_id: the ID of the trained model
+        :param digest: the SHA-256 hex digest the model object should have
+        :param chunks: an iterable of the model object bytes
+        :return: the model object bytes
+        :raises RinglingIntegrityError: if the bytes do not match the digest
+        """
+        file_handle, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.directory)
+        try:
+            hasher = hashlib.sha256()
+            with os.fdopen(file_handle, "w+b") as file:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    file.write(chunk)
+                file.seek(0)
+                data = file.read()
+
+            if hasher.hexdigest() != digest:
+                raise RinglingIntegrityError(model_id, digest, hasher.hexdigest())
+
+            os.replace(temp_path, self.path(model_id, digest))
+        except BaseException:
+            remove_file(temp_path)
+            raise
+
+        self.evict()
+        return data
+
+    def evict(self):
+        """
+        Remove the least recently used model objects until the cache fits in
+        max_bytes, along with temporary files left behind by failed writes
+        :return: None
+        """
+        evict_files(self.directory, self.max_bytes)
+
+
+class MappedModelCache:
+    """
+    Model objects stored as files to be memory-mapped by load_model, keyed
+    by model ID and digest
+
+    The directory must be private to the current user, and every file is
+    checked against its digest before it is unpickled.  The least recently
+    loaded files are removed once the directory holds more than max_bytes;
+    processes that mapped a removed file keep their mapping.
+    """
+
+    def __init__(self, directory=DEFAULT_MAPPED_DIRECTORY, max_bytes=DEFAULT_MAPPED_MAX_BYTES):
+        """
+        Initialize the cache.  The directory is created or checked on first use.
+        :param directory: the directory to store model files in
+        :param max_bytes: the maximum total size of the model files
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def load(self, model_id, digest, get_model_object):
+        """
+        Memory-map and unpickle a model, writing its file first if no process
+        on the host has yet or the file does not match its digest
+        :param model_id: the ID of the trained model
+        :param digest: the SHA-256 hex digest of the model object
+        :param get_model_object: a function with no arguments that downloads the model object
+        :return: the unpickled model and the size of its part outside of the mapping
+        :raises PermissionError: if other users can access the directory
+        :raises RinglingIntegrityError: if the model object does not match its digest
+        """
+        private_directory(self.directory)
+        path = os.path.join(self.directory, f"{cache_file_name(model_id, digest)}.pkl")
+        loaded = load_model_file(path, digest)
+        if loaded is None:
+            model_object = get_model_object()
+            write_model_file(path, model_object)
+            loaded = load_model_file(path, digest)
+            if loaded is None:
+                remove_file(path)
+                raise RinglingIntegrityError(
+                    model_id, digest, hashlib.sha256(model_object.encode("utf-8")).hexdigest())
+            evict_files(self.directory, self.max_bytes)
+        touch_file(path)
+        return loaded
@@ -0,0 +1,551 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+# pylint: disable=R0904
+
+import asyncio
+
+from .ringling_db import json_to_project
+from .ringling_db import json_to_param_set
+from .ringling_db import json_to_trained_model
+from .ringling_db import json_to_model_test
+from .ringling_db import chunk_ids
+from .ringling_db import ids_url
+from .ringling_db import merge_many_json
+from .ringling_db import page_url
+from .ringling_db import many_json_to_objects
+from .ringling_db import DEFAULT_CHUNK_SIZE
+from .ringling_db import DEFAULT_PAGE_SIZE
+from .response_handling import handle_create
+from .response_handling import handle_get
+from .response_handling import handle_list
+from .response_handling import connection_error
+from .response_handling import decode_json
+from .msgpack_encoding import check_msgpack
+from .msgpack_encoding import encode
+from .msgpack_encoding import request_headers
+from .msgpack_encoding import MSGPACK_MIMETYPE
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+def check_httpx():
+    """
+    Check that asynchronous sessions can be opened
+    :return: None
+    :raises ImportError: if the httpx package is not installed
+    """
+    if httpx is None:
+        raise ImportError("AsyncRinglingDBSession needs the httpx package: "
+                          "pip install ringling-cli[async]")
+
+
+class AsyncRinglingDBSession:
+    """
+    Object to interact with Ringling from asyncio applications
+
+    All requests share one pool of keep-alive connections, and at most
+    max_concurrency requests are in flight at any time.  The session should
+    be closed with aclose() or used as an async context manager.
+    """
+
+    def __init__(self, url, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 chunk_size=DEFAULT_CHUNK_SIZE, use_msgpack=False):
+        """
+        Initialize ringling
+        :param url: the url for the main Ringling process
+        :param max_concurrency: the maximum number of requests in flight at once
+        :param chunk_size: the maximum number of IDs to retrieve per request in get_*_many
+        :param use_msgpack: if requests and responses are MessagePack instead of
+        JSON, which sends model objects as binary; needs the msgpack package
+        :raises ImportError: if the httpx package is not installed
+        """
+        check_httpx()
+        if use_msgpack:
+            check_msgpack()
+        self.url = url
+        self.use_msgpack = use_msgpack
+        self.chunk_size = chunk_size
+        self.project_url = url + "/v1/projects"
+        self.param_url = url + "/v1/parameter_sets"
+        self.trained_model_url = url + "/v1/trained_models"
+        self.model_test_url = url + "/v1/model_tests"
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        limits = httpx.Limits(max_connections=max_concurrency,
+                              max_keepalive_connections=max_concurrency)
+        self._client = httpx.AsyncClient(limits=limits)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close all pooled connections
+        :return: None
+        """
+        await self._client.aclose()
+
+    async def _request(self, method, url, timeout, **kwargs):
+        """
+        Perform a request, waiting for a free slot if too many are in flight,
+        and asking for a MessagePack response with use_msgpack
+        :param method: the HTTP method
+        :param url: the url to request
+        :param timeout: the timeout in seconds
+        :return: the response object
+        :raises RinglingConnectionError: if Ringling cannot be reached or the request
+        fails in transport, including timeouts
+        """
+        # created lazily so it binds to the running event loop on Python < 3.10
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        kwargs["headers"] = request_headers(self.use_msgpack, kwargs.get("headers"))
+        async with self._semaphore:
+            try:
+                return await self._client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError:
+                connection_error()
+        return None
+
+    async def perform_connect_check(self):
+        """
+        Check if healthcheck returns that Ringling is healthy
+        :return: If the database connection is healthy
+        """
+        try:
+            response = await self._client.get(self.url + "/healthcheck", timeout=0.5)
+            response_json = response.json()
+            return bool(response_json["database"]["connection"]["healthy"])
+        except httpx.TransportError:
+            return False
+
+    async def _create(self, url, obj, id_key, timeout):
+        """
+        General helper function for creating resources
+        :param url: The url to post to
+        :param obj: The dictionary to send
+        :param id_key: The key of the new ID in the response
+        :param timeout: The timeout in seconds
+        :return: The ID for the newly created resource
+        """
+        if self.use_msgpack:
+            response = await self._request("POST", url, timeout, content=encode(obj),
+                                           headers={"Content-Type": MSGPACK_MIMETYPE})
+        else:
+            response = await self._request("POST", url, timeout, json=obj)
+        if handle_create(response):
+            return decode_json(response)[id_key]
+        return None
+
+    async def _get(self, url, object_type, cur_id, timeout):
+        """
+        General helper function for getting a resource by ID
+        :param url: The url of the resource type
+        :param object_type: the object type (for displaying errors)
+        :param cur_id: the id to retrieve
+        :param timeout: The timeout in seconds
+        :return: The json of the resource
+        """
+        response = await self._request("GET", url + "/" + str(cur_id), timeout)
+        return handle_get(response, object_type, cur_id)
+
+    async def _list(self, url):
+        """
+        General helper function for listing resources
+        :param url: The url to list from
+        :return: The json of the list response
+        """
+        response = await self._request("GET", url, 5)
+        return handle_list(response)
+
+    async def _obj_list(self, url, obj_func):
+        """
+        General helper function for listing resources as objects
+        :param url: The url to list from
+        :param obj_func: The conversion function
+        :return: A dictionary of type id:object
+        """
+        object_json = next(iter((await self._list(url)).values()))
+        return dict(obj_func(obj, True) for obj in object_json)
+
+    async def create_project(self, project):
+        """
+        Create a new project in Ringling
+        :param project: The project to send to Ringling
+        :return: The ID for the newly created project
+        """
+        return await self._create(self.project_url, project.to_dict(), 'project_id', 5)
+
+    async def create_param_set(self, param_set):
+        """
+        Create a new parameter set in Ringling
+        :param param_set: The parameter set to send to Ringling
+        :return: The ID for the newly created parameter set
+        """
+        return await self._create(self.param_url, param_set.to_dict(), 'parameter_set_id', 60)
+
+    async def create_trained_model(self, trained_model):
+        """
+        Create a new trained model in Ringling
+        :param trained_model: The trained model to send to Ringling
+        :return: The ID for the newly created trained model
+        """
+        return await self._create(self.trained_model_url, trained_model.to_dict(),
+                                  'model_id', 60)
+
+    async def create_model_test(self, model_test):
+        """
+        Create a new model test in Ringling
+        :param model_test: The model test to send to Ringling
+        :return: The ID for the newly created model test
+        """
+        return await self._create(self.model_test_url, model_test.to_dict(), 'test_id', 5)
+
+    async def create_trained_models(self, batch):
+        """
+        Create the trained models of a TrainedModelBatch in Ringling concurrently
+        :param batch: The TrainedModelBatch, whose values were validated when it was built
+        :return: The list of IDs of the new trained models in record order,
+        with None for those the service rejected
+        """
+        return list(await asyncio.gather(*[self._create(self.trained_model_url, obj,
+                                                        'model_id', 60)
+                                           for obj in batch.to_records()]))
+
+    async def create_model_tests(self, batch):
+        """
+        Create the model tests of a ModelTestBatch in Ringling concurrently
+        :param batch: The ModelTestBatch, whose values were validated when it was built
+        :return: The list of IDs of the new model tests in record order,
+        with None for those the service rejected
+        """
+        return list(await asyncio.gather(*[self._create(self.model_test_url, obj, 'test_id', 5)
+                                           for obj in batch.to_records()]))
+
+    async def get_project(self, cur_id):
+        """
+        Get a project from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: The Project object
+        """
+        return json_to_project(await self.get_project_json(cur_id))
+
+    async def get_project_json(self, cur_id):
+        """
+        Get a project's json from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: The string with json Project information
+        """
+        return await self._get(self.project_url, "Project", cur_id, 5)
+
+    async def get_param_set(self, cur_id):
+        """
+        Get a parameter set from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: the ParameterSet object
+        """
+        return json_to_param_set(await self.get_param_set_json(cur_id))
+
+    async def get_param_set_json(self, cur_id):
+        """
+        Get a parameter set from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: The string with json ParameterSet information
+        """
+        return await self._get(self.param_url, "Parameter Set", cur_id, 60)
+
+    async def get_trained_model(self, cur_id):
+        """
+        Get a trained model from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: TrainedModel object
+        """
+        return json_to_trained_model(await self.get_trained_model_json(cur_id))
+
+    async def get_trained_model_json(self, cur_id):
+        """
+        Get a trained model from Ringling given an id
+        :param cur_id: the id to retrieve
+        :return: The string with json TrainedModel information
+        """
+        return await self._get(self.trained_model_url, "Trained Model", cur_id, 60)
+
+    async def get_model_test(self, cur_id):
+        """
+        Get a model test from Ringling given an ID
+        :param cur_id: the id to retrieve
+        :return: ModelTest object
+        """
+        return json_to_model_test(await self.get_model_test_json(cur_id))
+
+    async def get_model_test_json(self, cur_id):
+        """
+        Get a model test from Ringling given an ID
+        :param cur_id: the id to retrieve
+        :return: The string with json ModelTest information
+        """
+        return await self._get(self.model_test_url, "Model Test", cur_id, 5)
+
+    async def list_projects(self):
+        """
+        List all the projects in Ringling
+        :return: A dictionary of id:Project for all projects
+        """
+        return await self._obj_list(self.project_url, json_to_project)
+
+    async def list_projects_json(self):
+        """
+        List all the projects in Ringling
+        :return: A string with the exact contents of the list command
+        """
+        return await self._list(self.project_url)
+
+    async def list_param_sets(self):
+        """
+        List all the parameter sets in Ringling
+        :return: A dictionary of id:ParameterSet for all parameter sets
+        """
+        return await self._obj_list(self.param_url, json_to_param_set)
+
+    async def list_param_sets_json(self):
+        """
+        List all the parameter sets in Ringling
+        :return: A string with the exact contents of the list parameter sets command
+        """
+        return await self._list(self.param_url)
+
+    async def list_trained_models(self):
+        """
+        List all the trained models in Ringling
+        :return: A dictionary of id:TrainedModel for all trained models
+        """
+        return await self._obj_list(self.trained_model_url, json_to_trained_model)
+
+    async def list_trained_models_json(self):
+        """
+        List all the trained models in Ringling
+        :return: A string with the exact contents of the list trained models command
+        """
+        return await self._list(self.trained_model_url)
+
+    async def list_model_tests(self):
+        """
+        List all the model tests in Ringling
+        :return: A dictionary of id:ModelTest for all model tests
+        """
+        return await self._obj_list(self.model_test_url, json_to_model_test)
+
+    async def list_model_tests_json(self):
+        """
+        List all the model tests in Ringling
+        :return: A string with the exact contents of the list model tests command
+        """
+        return await self._list(self.model_test_url)
+
+    async def _get_many(self, url, key, ids, timeout):
+        """
+        Get several resources by ID, splitting the IDs into concurrent requests
+        :param url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param ids: The IDs to retrieve
+        :param timeout: The timeout in seconds of each request
+        :return: A dictionary with the resources under key and the missing IDs under missing_ids
+        """
+        async def get_chunk(chunk):
+            return handle_list(await self._request("GET", ids_url(url, chunk), timeout))
+
+        pages = await asyncio.gather(*[get_chunk(chunk)
+                                       for chunk in chunk_ids(ids, self.chunk_size)])
+        return merge_many_json(pages, key)
+
+    async def get_projects_many(self, ids):
+        """
+        Get several projects from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:Project and the list of ids that were not found
+        """
+        return many_json_to_objects(await self.get_projects_many_json(ids), "projects",
+                                    json_to_project)
+
+    async def get_projects_many_json(self, ids):
+        """
+        Get several projects from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the projects and the ids that were not found
+        """
+        return await self._get_many(self.project_url, "projects", ids, 5)
+
+    async def get_param_sets_many(self, ids):
+        """
+        Get several parameter sets from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:ParameterSet and the list of ids that were not found
+        """
+        return many_json_to_objects(await self.get_param_sets_many_json(ids), "parameter_sets",
+                                    json_to_param_set)
+
+    async def get_param_sets_many_json(self, ids):
+        """
+        Get several parameter sets from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the parameter sets and the ids that were not found
+        """
+        return await self._get_many(self.param_url, "parameter_sets", ids, 60)
+
+    async def get_trained_models_many(self, ids):
+        """
+        Get several trained models from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:TrainedModel and the list of ids that were not found
+        """
+        return many_json_to_objects(await self.get_trained_models_many_json(ids),
+                                    "trained_models", json_to_trained_model)
+
+    async def get_trained_models_many_json(self, ids):
+        """
+        Get several trained models from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the trained models and the ids that were not found
+        """
+        return await self._get_many(self.trained_model_url, "trained_models", ids, 60)
+
+    async def get_model_tests_many(self, ids):
+        """
+        Get several model tests from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:ModelTest and the list of ids that were not found
+        """
+        return many_json_to_objects(await self.get_model_tests_many_json(ids), "model_tests",
+                                    json_to_model_test)
+
+    async def get_model_tests_many_json(self, ids):
+        """
+        Get several model tests from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the model tests and the ids that were not found
+        """
+        return await self._get_many(self.model_test_url, "model_tests", ids, 5)
+
+    async def _iter_json(self, url, key, *, page_size, filters, timeout):
+        """
+        Walk through a listing one page at a time
+        :param url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param page_size: The number of resources to retrieve per request
+        :param filters: A dictionary of field:value that the resources must match
+        :param timeout: The timeout in seconds of each request
+        :return: An async generator of the json of each resource
+        """
+        after_id = None
+        while True:
+            response = await self._request("GET", page_url(url, page_size, after_id, filters),
+                                           timeout)
+            page = handle_list(response)
+            for obj in page[key]:
+                yield obj
+            after_id = page["next_after_id"]
+            if after_id is None:
+                return
+
+    async def iter_projects(self, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Walk through all the projects in Ringling, holding one page in memory at a time
+        :param page_size: The number of projects to retrieve per request
+        :return: An async generator of (id, Project) tuples in ID order
+        """
+        async for obj in self.iter_projects_json(page_size):
+            yield json_to_project(obj, True)
+
+    def iter_projects_json(self, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Walk through all the projects in Ringling, holding one page in memory at a time
+        :param page_size: The number of projects to retrieve per request
+        :return: An async generator of the json of each project in ID order
+        """
+        return self._iter_json(self.project_url, "projects", page_size=page_size,
+                               filters={}, timeout=5)
+
+    async def iter_param_sets(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the parameter sets in Ringling, holding one page in memory at a time
+        :param page_size: The number of parameter sets to retrieve per request
+        :param filters: Values that the parameter sets must match, any of project_id and is_active
+        :return: An async generator of (id, ParameterSet) tuples in ID order
+        """
+        async for obj in self.iter_param_sets_json(page_size, **filters):
+            yield json_to_param_set(obj, True)
+
+    def iter_param_sets_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the parameter sets in Ringling, holding one page in memory at a time
+        :param page_size: The number of parameter sets to retrieve per request
+        :param filters: Values that the parameter sets must match, any of project_id and is_active
+        :return: An async generator of the json of each parameter set in ID order
+        """
+        return self._iter_json(self.param_url, "parameter_sets", page_size=page_size,
+                               filters=filters, timeout=60)
+
+    async def iter_trained_models(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the trained models in Ringling, holding one page in memory at a time
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: An async generator of (id, TrainedModel) tuples in ID order
+        """
+        async for obj in self.iter_trained_models_json(page_size, **filters):
+            yield json_to_trained_model(obj, True)
+
+    def iter_trained_models_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the trained models in Ringling, holding one page in memory at a time
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: An async generator of the json of each trained model in ID order
+        """
+        return self._iter_json(self.trained_model_url, "trained_models", page_size=page_size,
+                               filters=filters, timeout=60)
+
+    async def iter_model_tests(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the model tests in Ringling, holding one page in memory at a time
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: An async generator of (id, ModelTest) tuples in ID order
+        """
+        async for obj in self.iter_model_tests_json(page_size, **filters):
+            yield json_to_model_test(obj, True)
+
+    def iter_model_tests_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the model tests in Ringling, holding one page in memory at a time
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: An async generator of the json of each model test in ID order
+        """
+        return self._iter_json(self.model_test_url, "model_tests", page_size=page_size,
+                               filters=filters, timeout=5)
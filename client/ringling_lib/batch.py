@@ -0,0 +1,150 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Batches of records validated a column at a time.  Building many ModelTest or
+TrainedModel objects checks every field of every record on its own; a batch
+checks the types of a whole column in one pass, parses a column of
+timestamps in one pass, and compares the distinct deployment stages at once.
+Every invalid value is reported in one RinglingValidationError.
+"""
+
+from .exceptions import RinglingValidationError
+from .utils import validate_choice_column
+from .utils import validate_column_types
+from .utils import validate_iso_column
+from .utils import DEPLOYMENT_STAGES
+
+TIMESTAMP = "timestamp"
+
+
+def as_column(value):
+    """
+    Get the list of values of a column
+    :param value: a list, tuple, NumPy array or pandas Series, or a single value
+    :return: the list of values, or None for a single value
+    """
+    if hasattr(value, "tolist"):
+        values = value.tolist()
+        return values if isinstance(values, list) else None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return None
+
+
+class RecordBatch:
+    """
+    Records of one type, stored and validated as columns
+    """
+    # field: type of its values, or TIMESTAMP for ISO 8601 strings
+    FIELDS = {}
+    # field: allowed values
+    CHOICES = {}
+
+    def __init__(self, **columns):
+        """
+        Build a batch from columns and validate every value
+        :param columns: field=values for each field, where values is a list, tuple,
+        NumPy array or pandas Series with one value per record, or a single value
+        shared by every record.  Timestamps may be ISO 8601 strings or datetimes.
+        metadata may be left out, and a null metadata is empty.
+        :raises ValueError: if fields are unknown or missing, or columns differ in length
+        :raises RinglingValidationError: listing every invalid value
+        """
+        columns.setdefault("metadata", None)
+        unknown = set(columns) - set(self.FIELDS)
+        missing = set(self.FIELDS) - set(columns)
+        if unknown or missing:
+            raise ValueError(f"Unknown fields {sorted(unknown)}, missing fields {sorted(missing)}")
+
+        lists = {field: as_column(value) for field, value in columns.items()}
+        lengths = {field: len(values) for field, values in lists.items() if values is not None}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Columns have different lengths: {lengths}")
+        self.rows = next(iter(lengths.values()), 1)
+
+        for field, values in lists.items():
+            if values is None:
+                lists[field] = [columns[field]] * self.rows
+        if None in lists["metadata"]:
+            lists["metadata"] = [{} if value is None else value for value in lists["metadata"]]
+
+        errors = []
+        for field, _type in self.FIELDS.items():
+            if _type == TIMESTAMP:
+                lists[field] = validate_iso_column(field, lists[field], errors)
+            elif validate_column_types(field, lists[field], _type, errors) \
+                    and field in self.CHOICES:
+                validate_choice_column(field, lists[field], self.CHOICES[field], errors)
+        if errors:
+            raise RinglingValidationError(errors, self.rows)
+
+        self.columns = {field: lists[field] for field in self.FIELDS}
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a batch from dictionaries of field:value, such as the to_dict of
+        records or rows read from a file
+        :param records: the list of dictionaries
+        :return: the batch, where a missing field is null and reported as invalid
+        :raises RinglingValidationError: listing every invalid value
+        """
+        return cls(**{field: [record.get(field) for record in records] for field in cls.FIELDS})
+
+    def __len__(self):
+        """
+        Get the number of records
+        :return: the number of records
+        """
+        return self.rows
+
+    def to_records(self):
+        """
+        Get the records as sent to Ringling
+        :return: a list of dictionaries of field:value, like the to_dict of each record
+        """
+        fields = list(self.columns)
+        return [dict(zip(fields, row)) for row in zip(*self.columns.values())]
+
+
+class ModelTestBatch(RecordBatch):
+    """
+    Model tests, stored and validated as columns
+    """
+    FIELDS = {"project_id": int,
+              "parameter_set_id": int,
+              "model_id": int,
+              "test_timestamp": TIMESTAMP,
+              "test_metrics": dict,
+              "passed_testing": bool,
+              "metadata": dict}
+
+
+class TrainedModelBatch(RecordBatch):
+    """
+    Trained models, stored and validated as columns
+    """
+    FIELDS = {"project_id": int,
+              "parameter_set_id": int,
+              "training_data_from": TIMESTAMP,
+              "training_data_until": TIMESTAMP,
+              "model_object": str,
+              "train_timestamp": TIMESTAMP,
+              "deployment_stage": str,
+              "backtest_timestamp": TIMESTAMP,
+              "backtest_metrics": dict,
+              "passed_backtesting": bool,
+              "metadata": dict}
+    CHOICES = {"deployment_stage": DEPLOYMENT_STAGES}
@@ -0,0 +1,187 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Session methods for the models deployed by each project: the current
+production and testing models, promotion, bulk stage updates, and aliases.
+"""
+
+import requests
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from .response_handling import connection_error
+from .response_handling import decode_json
+from .response_handling import handle_get
+from .response_handling import perform_list
+from .response_handling import raise_for_status
+
+
+class DeploymentMixin:
+    """
+    Deployment methods of RinglingDBSession, which provides the resource
+    urls, alias_etags, _headers and _body they use
+    """
+
+    def _get_deployed_model(self, project_id, deployment_stage):
+        """
+        Get the current trained model of a deployment stage of a project
+        :param project_id: the project id
+        :param deployment_stage: "production" or "testing"
+        :return: the json of the trained model, without its model object
+        """
+        url = f"{self.project_url}/{project_id}/{deployment_stage}_model"
+        try:
+            response = requests.get(url, headers=self._headers(), timeout=5)
+            return handle_get(response, f"Project with a {deployment_stage} model", project_id)
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def get_production_model_json(self, project_id):
+        """
+        Get the current production model of a project, the newest one in the production stage.
+        Use load_model or get_model_object with its model_id to get the model itself.
+        :param project_id: the project id
+        :return: the json of the trained model, without its model object
+        """
+        return self._get_deployed_model(project_id, "production")
+
+    def get_testing_model_json(self, project_id):
+        """
+        Get the current testing model of a project, the newest one in the testing stage
+        :param project_id: the project id
+        :return: the json of the trained model, without its model object
+        """
+        return self._get_deployed_model(project_id, "testing")
+
+    def _bulk_patch(self, cur_url, values, ids, dry_run, filters):
+        """
+        Update many resources selected by ID or by filter in one request
+        :param cur_url: The url of the resource type
+        :param values: A dictionary of the new values
+        :param ids: The IDs of the resources to update, or None to select them by filters
+        :param dry_run: If the service should only report what it would update
+        :param filters: A dictionary of field:value that the resources to update must match
+        :return: A dictionary of the dry_run flag, count, and ids of the resources updated
+        """
+        body = dict(values, dry_run=dry_run)
+        if ids is not None:
+            body["ids"] = list(ids)
+        else:
+            body["filter"] = filters
+        try:
+            response = requests.patch(cur_url, timeout=60, **self._body(body))
+            raise_for_status(response)
+            return decode_json(response)
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def modify_trained_models(self, deployment_stage, ids=None, dry_run=False, **filters):
+        """
+        Set the deployment stage of many trained models in one request, e.g.
+        modify_trained_models("retired", train_timestamp_before="2023-01-01T00:00:00").
+        Models already in the stage are not counted.
+        :param deployment_stage: The new deployment stage, testing or retired; use
+        promote_trained_model to move a model to production
+        :param ids: The IDs of the trained models to update, or None to select them by filters
+        :param dry_run: If the service should only report what it would update
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, passed_backtesting, and train_timestamp_before
+        :return: A dictionary of the dry_run flag, count, and ids of the trained models updated
+        """
+        return self._bulk_patch(self.trained_model_url, {"deployment_stage": deployment_stage},
+                                ids, dry_run, filters)
+
+    def modify_param_sets(self, is_active, ids=None, dry_run=False, **filters):
+        """
+        Set the activity status of many parameter sets in one request.
+        Parameter sets that already have the status are not counted.
+        :param is_active: The new activity status
+        :param ids: The IDs of the parameter sets to update, or None to select them by filters
+        :param dry_run: If the service should only report what it would update
+        :param filters: Values that the parameter sets must match, any of project_id and is_active
+        :return: A dictionary of the dry_run flag, count, and ids of the parameter sets updated
+        """
+        return self._bulk_patch(self.param_url, {"is_active": is_active}, ids, dry_run, filters)
+
+    def promote_trained_model(self, cur_id):
+        """
+        Move a trained model to production and retire the other production
+        models of its project, in one request and one transaction
+        :param cur_id: the id of the trained model to promote
+        :return: the json of the promotion, with the promoted and retired models
+        """
+        url = self.trained_model_url + "/" + str(cur_id) + "/promote"
+        try:
+            response = requests.post(url, headers=self._headers(), timeout=5)
+            return handle_get(response, "Trained Model", cur_id)
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def set_alias(self, project_id, alias, model_id, expected_change_id=None):
+        """
+        Point an alias of a project, e.g. champion, at one of its trained models
+        :param project_id: the project id
+        :param alias: the name of the alias
+        :param model_id: the trained model id
+        :param expected_change_id: if given, the alias is only set if its change_id
+        still equals this, otherwise a RinglingResponseError with status 412 is raised
+        :return: the json of the alias
+        """
+        url = f"{self.project_url}/{project_id}/aliases/{alias}"
+        headers = {}
+        if expected_change_id is not None:
+            headers["If-Match"] = f'"{expected_change_id}"'
+        try:
+            response = requests.put(url, timeout=5,
+                                    **self._body({"model_id": model_id}, headers))
+            raise_for_status(response)
+            alias_json = decode_json(response)
+            self.alias_etags[(project_id, alias)] = (response.headers["ETag"], alias_json)
+            return alias_json
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def get_alias_json(self, project_id, alias):
+        """
+        Get an alias of a project.  The session keeps the last response and
+        revalidates it, so an unchanged alias costs a bodiless 304 response.
+        :param project_id: the project id
+        :param alias: the name of the alias
+        :return: the json of the alias, holding the model_id it points at
+        """
+        url = f"{self.project_url}/{project_id}/aliases/{alias}"
+        cached = self.alias_etags.get((project_id, alias))
+        headers = {} if cached is None else {"If-None-Match": cached[0]}
+        try:
+            response = requests.get(url, headers=self._headers(headers), timeout=5)
+            if response.status_code == 304:
+                return cached[1]
+            alias_json = handle_get(response, f"Alias {alias} of Project", project_id)
+            self.alias_etags[(project_id, alias)] = (response.headers["ETag"], alias_json)
+            return alias_json
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def list_aliases_json(self, project_id):
+        """
+        Get all aliases of a project
+        :param project_id: the project id
+        :return: a list of the json of each alias
+        """
+        return perform_list(f"{self.project_url}/{project_id}/aliases",
+                            headers=self._headers())["aliases"]
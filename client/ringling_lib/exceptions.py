@@ -0,0 +1,110 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+class RinglingError(Exception):
+    """
+    Base class for all errors raised by the Ringling library
+    """
+
+
+class RinglingConnectionError(RinglingError):
+    """
+    Raised when the Ringling service can not be reached
+    """
+    def __init__(self):
+        super().__init__("Can not connect to model management service. Is Ringling running?")
+
+
+class RinglingForbiddenError(RinglingError):
+    """
+    Raised when the Ringling service refuses the connection
+    """
+    def __init__(self):
+        super().__init__("Connection forbidden. Is there another service "
+                         "such as a Jupyter Notebook running on this port?")
+
+
+class RinglingNotFoundError(RinglingError):
+    """
+    Raised when a requested object does not exist
+    """
+    def __init__(self, object_type, object_id):
+        """
+        Initialize the error
+        :param object_type: the object type, e.g. "Trained Model"
+        :param object_id: the ID that was not found
+        """
+        super().__init__(f"Invalid {object_type} ID {object_id}")
+        self.object_type = object_type
+        self.object_id = object_id
+
+
+class RinglingResponseError(RinglingError):
+    """
+    Raised when the Ringling service returns an unexpected status code
+    """
+    def __init__(self, status_code, message):
+        """
+        Initialize the error
+        :param status_code: the HTTP status code of the response
+        :param message: the error message returned by the service
+        """
+        super().__init__(f"Ringling returned status {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class RinglingIntegrityError(RinglingError):
+    """
+    Raised when a downloaded model object does not match its digest
+    """
+    def __init__(self, model_id, expected_digest, actual_digest):
+        """
+        Initialize the error
+        :param model_id: the ID of the trained model
+        :param expected_digest: the digest reported by the service
+        :param actual_digest: the digest of the bytes that were received
+        """
+        super().__init__(f"Model object of Trained Model ID {model_id} has digest "
+                         f"{actual_digest}, expected {expected_digest}")
+        self.model_id = model_id
+        self.expected_digest = expected_digest
+        self.actual_digest = actual_digest
+
+
+class RinglingValidationError(RinglingError, ValueError):
+    """
+    Raised when records built in a batch have invalid values, listing all of them
+    """
+    MAX_LISTED = 20
+
+    def __init__(self, errors, rows):
+        """
+        Initialize the error
+        :param errors: a list of (row, field, message) tuples, one per invalid value
+        :param rows: the number of records in the batch
+        """
+        errors = sorted(errors, key=lambda error: error[0])
+        lines = [f"  row {row} {field}: {message}"
+                 for row, field, message in errors[:self.MAX_LISTED]]
+        if len(errors) > self.MAX_LISTED:
+            lines.append(f"  ... and {len(errors) - self.MAX_LISTED} more")
+        invalid_rows = len({error[0] for error in errors})
+        super().__init__(f"{len(errors)} invalid values in {invalid_rows} of {rows} records:\n"
+                         + "\n".join(lines))
+        self.errors = errors
+        self.rows = rows
@@ -0,0 +1,162 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Columns of model tests and trained models for analytics.  Pages of decoded
+json are transposed into one list per field as they arrive, with a column
+named <metrics field>.<key> for each metric key, and each list becomes a
+NumPy array in one call, so no record object is built per row.
+"""
+
+from operator import itemgetter
+
+from .msgpack_encoding import TIMESTAMP_KEYS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+MODEL_TEST_COLUMNS = ["test_id", "project_id", "parameter_set_id", "model_id",
+                      "test_timestamp", "passed_testing"]
+TRAINED_MODEL_COLUMNS = ["model_id", "project_id", "parameter_set_id", "training_data_from",
+                         "training_data_until", "train_timestamp", "deployment_stage",
+                         "backtest_timestamp", "passed_backtesting", "model_digest"]
+
+
+def check_numpy():
+    """
+    Check that columns can be built
+    :return: None
+    :raises ImportError: if the numpy package is not installed
+    """
+    if numpy is None:
+        raise ImportError("columns need the numpy package: pip install ringling-cli[frames]")
+
+
+def check_pandas():
+    """
+    Check that DataFrames can be built
+    :return: None
+    :raises ImportError: if the numpy or pandas package is not installed
+    """
+    if numpy is None or pandas is None:
+        raise ImportError("DataFrames need the pandas package: pip install ringling-cli[frames]")
+
+
+def numpy_column(name, values):
+    """
+    Build the NumPy array of a column
+    :param name: the column name
+    :param values: the list of values
+    :return: a datetime64[us] array of a timestamp field, with NaT for null
+    timestamps; an int64 or bool array if every value is an integer or a boolean;
+    a float64 array, with NaN for null values, if every value is a number or
+    null; otherwise an object array
+    """
+    if name in TIMESTAMP_KEYS:
+        return numpy.array(values, dtype="datetime64[us]")
+    types = set(map(type, values))
+    try:
+        if types == {bool}:
+            return numpy.array(values, dtype=bool)
+        if types == {int}:
+            return numpy.array(values, dtype=numpy.int64)
+        if types <= {int, float, type(None)}:
+            return numpy.array(values, dtype=numpy.float64)
+    except OverflowError:
+        pass
+    # fromiter keeps list values as elements instead of a second dimension
+    return numpy.fromiter(values, dtype=object, count=len(values))
+
+
+class ColumnBuilder:
+    """
+    Collects the columns of decoded json objects one page at a time
+    """
+
+    def __init__(self, columns, metrics_key):
+        """
+        Start empty columns
+        :param columns: the fields of the objects to keep as columns
+        :param metrics_key: the field holding the dictionary of metrics to flatten
+        """
+        self.columns = columns
+        self.metrics_key = metrics_key
+        self.values = {column: [] for column in columns}
+        self.metrics = {}
+        self.rows = 0
+
+    def add_page(self, objects):
+        """
+        Add the objects of a page to the columns.  A metric key first seen on
+        this page has null values for the rows before it, and a key missing
+        from this page has null values for its rows.
+        :param objects: the list of decoded json objects
+        :return: None
+        """
+        for column in self.columns:
+            self.values[column].extend(map(itemgetter(column), objects))
+
+        metrics = list(map(itemgetter(self.metrics_key), objects))
+        keys = set().union(*metrics)
+        for key in keys:
+            values = self.metrics.setdefault(key, [None] * self.rows)
+            values.extend([metric.get(key) for metric in metrics])
+        for key, values in self.metrics.items():
+            if key not in keys:
+                values.extend([None] * len(objects))
+        self.rows += len(objects)
+
+    def to_columns(self):
+        """
+        Build the NumPy arrays of the columns
+        :return: a dictionary of column name:array, with the metric columns
+        after the fields in key order
+        """
+        check_numpy()
+        columns = {column: numpy_column(column, values) for column, values in self.values.items()}
+        for key in sorted(self.metrics):
+            name = f"{self.metrics_key}.{key}"
+            columns[name] = numpy_column(name, self.metrics[key])
+        return columns
+
+    def to_dataframe(self):
+        """
+        Build a DataFrame of the columns
+        :return: the pandas.DataFrame
+        """
+        check_pandas()
+        return pandas.DataFrame(self.to_columns(), copy=False)
+
+
+def model_test_columns():
+    """
+    Start the columns of model tests, which leave out metadata
+    :return: a ColumnBuilder of the model test fields and test_metrics
+    """
+    return ColumnBuilder(MODEL_TEST_COLUMNS, "test_metrics")
+
+
+def trained_model_columns():
+    """
+    Start the columns of trained models, which leave out the model object and metadata
+    :return: a ColumnBuilder of the trained model fields and backtest_metrics
+    """
+    return ColumnBuilder(TRAINED_MODEL_COLUMNS, "backtest_metrics")
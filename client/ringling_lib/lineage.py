@@ -0,0 +1,101 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Session methods that read a project overview or the lineage of an object
+in one request.
+"""
+
+import requests
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from .response_handling import connection_error
+from .response_handling import handle_get
+
+
+class LineageMixin:
+    """
+    Overview and lineage methods of RinglingDBSession, which provides the
+    resource urls and _headers they use
+    """
+
+    def get_project_overview_json(self, project_id, depth=2, limit=None):
+        """
+        Get a project with its newest parameter sets and trained models, and the
+        latest test of each trained model, in one request
+        :param project_id: the project id
+        :param depth: 0 for the project only, 1 to add its parameter sets and
+        trained models, 2 to also add the latest test of each trained model
+        :param limit: the maximum number of parameter sets and of trained models, or None for all
+        :return: the json of the overview, without training parameters or model objects
+        """
+        url = f"{self.project_url}/{project_id}/overview"
+        params = {"depth": depth}
+        if limit is not None:
+            params["limit"] = limit
+        try:
+            response = requests.get(url, params=params, headers=self._headers(), timeout=60)
+            return handle_get(response, "Project", project_id)
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def _get_lineage(self, cur_url, object_type, cur_id, flat, filters):
+        """
+        Get the lineage of an object
+        :param cur_url: The url of the object's resource type
+        :param object_type: The object type (for error messages)
+        :param cur_id: The id of the object
+        :param flat: If the objects are returned as lists by type instead of as a tree
+        :param filters: A dictionary of field:value that the models and tests must match
+        :return: the json of the lineage
+        """
+        url = f"{cur_url}/{cur_id}/lineage"
+        params = dict(filters)
+        params["format"] = "flat" if flat else "nested"
+        try:
+            response = requests.get(url, params=params, headers=self._headers(), timeout=60)
+            return handle_get(response, object_type, cur_id)
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def get_param_set_lineage_json(self, cur_id, flat=False, **filters):
+        """
+        Get the trained models trained with a parameter set and the tests run against them
+        :param cur_id: the parameter set id
+        :param flat: if the objects are returned as lists by type instead of as a tree
+        :param filters: deployment_stage or passed_backtesting to select trained
+        models, and passed_testing to select tests
+        :return: the json of the lineage, without training parameters or model objects
+        """
+        return self._get_lineage(self.param_url, "Parameter Set", cur_id, flat, filters)
+
+    def get_trained_model_lineage_json(self, cur_id, flat=False, **filters):
+        """
+        Get the parameter set a trained model was trained with and the tests run against it
+        :param cur_id: the trained model id
+        :param flat: if the objects are returned as lists by type instead of as a tree
+        :param filters: passed_testing to select tests
+        :return: the json of the lineage, without training parameters or model objects
+        """
+        return self._get_lineage(self.trained_model_url, "Trained Model", cur_id, flat, filters)
+
+    def get_model_test_lineage_json(self, cur_id, flat=False):
+        """
+        Get the trained model a test ran against and the parameter set it was trained with
+        :param cur_id: the model test id
+        :param flat: if the objects are returned as lists by type instead of as a tree
+        :return: the json of the lineage, without training parameters or model objects
+        """
+        return self._get_lineage(self.model_test_url, "Model Test", cur_id, flat, {})
@@ -0,0 +1,126 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+class ModelCache:
+    """
+    In-memory cache of deserialized model objects
+
+    Entries are evicted least recently used first once their estimated sizes
+    add up to more than max_bytes.  The size of an entry is estimated by the
+    length of the serialized bytes it was loaded from.  Threads that ask for
+    a key while it is being loaded wait for that load instead of repeating it.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+        :param max_bytes: the maximum total estimated size of the cached objects
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get_or_load(self, key, load):
+        """
+        Get an object from the cache, loading it if it is missing
+        :param key: the key of the object
+        :param load: a function with no arguments that returns the object and its estimated size
+        :return: the object
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            future = self._loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self._loading[key] = future
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            obj, size = load()
+        except BaseException as err:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(err)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            self._insert(key, obj, size)
+        future.set_result(obj)
+        return obj
+
+    def discard(self, key):
+        """
+        Remove an object from the cache if it is there
+        :param key: the key of the object
+        :return: None
+        """
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """
+        Remove all objects from the cache
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _insert(self, key, obj, size):
+        """
+        Add an object and evict the least recently used ones that no longer fit.
+        Objects larger than max_bytes are not cached.  Must hold the lock.
+        :param key: the key of the object
+        :param obj: the object
+        :param size: the estimated size of the object
+        :return: None
+        """
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (obj, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+
+default_model_cache = ModelCache()
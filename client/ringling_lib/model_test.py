@@ -21,6 +21,9 @@ class ModelTest:
     """
     Object for model test fields
     """
+    __slots__ = ("project_id", "parameter_set_id", "model_id", "test_timestamp", "test_metrics",
+                 "passed_testing", "metadata")
+
     def __init__(self, project_id, parameter_set_id, model_id, test_timestamp,
                  test_metrics, passed_testing, metadata=None):
         """
@@ -57,3 +60,16 @@ class ModelTest:
         self.test_metrics = test_metrics
         self.passed_testing = passed_testing
         self.metadata = metadata
+
+    def to_dict(self):
+        """
+        Get the fields of the model test as sent to Ringling
+        :return: a dictionary of field:value
+        """
+        return {"project_id": self.project_id,
+                "parameter_set_id": self.parameter_set_id,
+                "model_id": self.model_id,
+                "test_timestamp": self.test_timestamp,
+                "test_metrics": self.test_metrics,
+                "passed_testing": self.passed_testing,
+                "metadata": self.metadata}
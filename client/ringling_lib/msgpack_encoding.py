@@ -0,0 +1,130 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+MessagePack request and response bodies.  On the wire, timestamps are
+MessagePack timestamps and hex encoded model objects are binary; decoding
+turns them back into the ISO 8601 and hex strings of the JSON API, so the
+dictionaries and objects the sessions return are the same with either encoding.
+"""
+
+import re
+from datetime import datetime
+from datetime import timezone
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+MODEL_OBJECT_KEY = "model_object"
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMP_KEYS = {"training_data_from", "training_data_until", "train_timestamp",
+                  "backtest_timestamp", "test_timestamp"}
+
+# only lowercase hex survives the round trip through binary unchanged
+HEX_PATTERN = re.compile("(?:[0-9a-f]{2})*")
+
+
+def check_msgpack():
+    """
+    Check that MessagePack bodies can be encoded
+    :return: None
+    :raises ImportError: if the msgpack package is not installed
+    """
+    if msgpack is None:
+        raise ImportError("use_msgpack needs the msgpack package: "
+                          "pip install ringling-cli[msgpack]")
+
+
+def request_headers(use_msgpack, headers=None):
+    """
+    Build the headers of a request
+    :param use_msgpack: if the response should be MessagePack
+    :param headers: other headers of the request
+    :return: a dictionary of the headers
+    """
+    headers = dict(headers or {})
+    if use_msgpack:
+        headers["Accept"] = MSGPACK_MIMETYPE
+    return headers
+
+
+def to_wire(key, value):
+    """
+    Convert a field of a request body to its MessagePack value
+    :param key: the field name
+    :param value: the field value
+    :return: a timestamp for an ISO 8601 timestamp field, bytes for a hex
+    model object, or the value unchanged, which includes timestamps the
+    service will reject
+    """
+    if key in TIMESTAMP_KEYS and isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        # from the timedelta rather than a float timestamp, to keep every microsecond
+        delta = moment - EPOCH
+        return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+    if key == MODEL_OBJECT_KEY and isinstance(value, str) and HEX_PATTERN.fullmatch(value):
+        return bytes.fromhex(value)
+    return value
+
+
+def encode(obj):
+    """
+    Encode a request body as MessagePack
+    :param obj: the dictionary to send
+    :return: the MessagePack bytes
+    """
+    return msgpack.packb({key: to_wire(key, value) for key, value in obj.items()},
+                         use_bin_type=True)
+
+
+def from_wire(obj):
+    """
+    Convert the values of a decoded map to those of the JSON API
+    :param obj: the dictionary of the map
+    :return: the dictionary, with timestamps as ISO 8601 strings and a binary
+    model object as hex
+    """
+    for key, value in obj.items():
+        if isinstance(value, msgpack.Timestamp):
+            obj[key] = value.to_datetime().replace(tzinfo=None).isoformat()
+        elif key == MODEL_OBJECT_KEY and isinstance(value, bytes):
+            obj[key] = value.hex()
+    return obj
+
+
+def decode(content):
+    """
+    Decode a MessagePack response body
+    :param content: the body bytes
+    :return: the decoded body
+    """
+    return msgpack.unpackb(content, object_hook=from_wire)
+
+
+def is_msgpack(response):
+    """
+    Check if the body of a response is MessagePack
+    :param response: the response object
+    :return: True if its Content-Type is application/msgpack
+    """
+    content_type = response.headers.get("Content-Type", "")
+    return content_type.split(";")[0].strip() == MSGPACK_MIMETYPE
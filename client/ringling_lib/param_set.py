@@ -19,6 +19,8 @@ class ParameterSet:
     """
     Object for Parameter Set fields
     """
+    __slots__ = ("project_id", "training_parameters", "is_active", "metadata")
+
     def __init__(self, project_id, training_parameters, is_active, metadata=None):
         """
         Initialize the parameter set object
@@ -45,3 +47,13 @@ class ParameterSet:
         self.training_parameters = training_parameters
         self.is_active = is_active
         self.metadata = metadata
+
+    def to_dict(self):
+        """
+        Get the fields of the parameter set as sent to Ringling
+        :return: a dictionary of field:value
+        """
+        return {"project_id": self.project_id,
+                "training_parameters": self.training_parameters,
+                "is_active": self.is_active,
+                "metadata": self.metadata}
@@ -20,6 +20,8 @@ class Project:
     """
     Object for the project class
     """
+    __slots__ = ("project_name", "metadata")
+
     def __init__(self, project_name: str, metadata: dict = None):
         """
         Initialize the project
@@ -37,3 +39,11 @@ class Project:
 
         self.project_name = project_name
         self.metadata = metadata
+
+    def to_dict(self):
+        """
+        Get the fields of the project as sent to Ringling
+        :return: a dictionary of field:value
+        """
+        return {"project_name": self.project_name,
+                "metadata": self.metadata}
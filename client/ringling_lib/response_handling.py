@@ -14,63 +14,105 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import sys
-import pprint
+import json
 import requests
 from requests.exceptions import ConnectionError as RequestsConnectionError
+from .exceptions import RinglingConnectionError
+from .exceptions import RinglingForbiddenError
+from .exceptions import RinglingNotFoundError
+from .exceptions import RinglingResponseError
+from .msgpack_encoding import decode
+from .msgpack_encoding import is_msgpack
+
+DEFAULT_PAGE_SIZE = 1000
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def decode_json(response):
+    """
+    Decode the json body of a response straight from its bytes, or its
+    MessagePack body into the same json
+    :param response: the response object
+    :return: the decoded json
+    """
+    if is_msgpack(response):
+        return decode(response.content)
+    return json.loads(response.content)
+
+
+def error_message(response):
+    """
+    Get the error message the service returned
+    :param response: the response object
+    :return: the "error" field of the json body, or the whole body
+    """
+    try:
+        body = decode_json(response)
+    except ValueError:
+        return response.text
+    if isinstance(body, dict) and "error" in body:
+        return body["error"]
+    return body
+
+
+def raise_for_status(response):
+    """
+    Raise the matching error for an unsuccessful response
+    :param response: the response object
+    :return: None
+    """
+    if response.status_code == 403:
+        raise RinglingForbiddenError()
+    if not 200 <= response.status_code < 300:
+        raise RinglingResponseError(response.status_code, error_message(response))
 
 
 def handle_create(response):
     """
     Handle the response from create commands
     :param response: the response object
-    :return: if the response was a success
+    :return: if the response was a success, False if the service rejected the object
     """
-    if 200 <= response.status_code < 300:
-        return True
     if response.status_code == 400:
         return False
-    if response.status_code == 403:
-        print("Connection forbidden. "
-              "Is there another service such as a Jupyter Notebook running on this port?")
-        sys.exit(1)
-    return False
+    raise_for_status(response)
+    return True
 
 def handle_get(response, object_type, cur_id):
     """
     Handle the response from get commands
     :param response: the response object
-    :param object_type: the object type (for displaying errors)
+    :param object_type: the object type (for error messages)
     :param cur_id: the id of the object
-    :return: if the response was a success
+    :return: the json of the response
     """
-    if 200 <= response.status_code < 300:
-        response_json = response.json()
-        return response_json
     if response.status_code == 404:
-        print(f"Invalid {object_type} ID {cur_id}", file=sys.stderr)
-        sys.exit(1)
-    if response.status_code == 403:
-        print("Connection forbidden. "
-              "Is there another service such as a Jupyter Notebook running on this port?")
-        sys.exit(1)
-    return None
+        raise RinglingNotFoundError(object_type, cur_id)
+    raise_for_status(response)
+    return decode_json(response)
 
 
-def perform_list(rest_url):
+def handle_list(response):
+    """
+    Handle the response from list commands
+    :param response: the response object
+    :return: the json of the response
+    """
+    raise_for_status(response)
+    return decode_json(response)
+
+
+def perform_list(rest_url, timeout=5, headers=None):
     """
     Get the list from the REST url
     :param rest_url: The url to perform get on
-    :return: None
+    :param timeout: The timeout in seconds
+    :param headers: The headers of the request
+    :return: the json of the response
     """
     try:
-        response = requests.get(rest_url, timeout=5)
-        if response.status_code == 403:
-            print("Connection forbidden. "
-                  "Is there another service such as a Jupyter Notebook running on this port?")
-            sys.exit(1)
-        response_json = response.json()
-        return response_json
+        response = requests.get(rest_url, headers=headers, timeout=timeout)
+        return handle_list(response)
     except RequestsConnectionError:
         connection_error()
     return None
@@ -80,6 +122,6 @@ def connection_error():
     """
     To be called when there is any type of connection error
     :return: None
+    :raises RinglingConnectionError: always
     """
-    print("Can not connect to model management service. Is Ringling running?", file=sys.stderr)
-    sys.exit(1)
+    raise RinglingConnectionError()
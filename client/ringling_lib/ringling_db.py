@@ -15,6 +15,10 @@ limitations under the License.
 """
 # pylint: disable=R0904
 
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
 import requests
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from .project import Project
@@ -23,8 +27,32 @@ from .trained_model import TrainedModel
 from .model_test import ModelTest
 from .response_handling import handle_create
 from .response_handling import handle_get
+from .response_handling import raise_for_status
 from .response_handling import perform_list
 from .response_handling import connection_error
+from .response_handling import decode_json
+from .response_handling import DEFAULT_PAGE_SIZE
+from .response_handling import DOWNLOAD_CHUNK_SIZE
+from .analytics import AnalyticsMixin
+from .deployment import DeploymentMixin
+from .lineage import LineageMixin
+from .artifact_cache import MappedModelCache
+from .artifact_cache import DEFAULT_MAPPED_DIRECTORY
+from .artifact_cache import DEFAULT_MAPPED_MAX_BYTES
+from .exceptions import RinglingNotFoundError
+from .model_cache import default_model_cache
+from .msgpack_encoding import check_msgpack
+from .msgpack_encoding import encode
+from .msgpack_encoding import request_headers
+from .msgpack_encoding import MSGPACK_MIMETYPE
+from .serialization import deserialize_model
+from .upload import multipart_body
+from .upload import read_chunks
+from .upload import UPLOAD_CHUNK_SIZE
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+MMAP_MODES = ["r"]
 
 
 def json_to_project(project_json, id_tuple=False):
@@ -107,32 +135,143 @@ def json_to_model_test(model_test_json, id_tuple=False):
     return model_test_obj
 
 
-def obj_list(cur_url, obj_func):
+def obj_list(cur_url, obj_func, headers=None):
     """
     General helper function for listing resources
     :param cur_url: The url to list from
     :param obj_func: The conversion function
+    :param headers: The headers of the request
     :return: A dictionary of type id:object
     """
-    object_json = next(iter(perform_list(cur_url).values()))
+    object_json = next(iter(perform_list(cur_url, headers=headers).values()))
     object_list = [obj_func(obj, True) for obj in object_json]
     return dict(object_list)
 
-class RinglingDBSession:
+def chunk_ids(ids, chunk_size):
+    """
+    Split a list of IDs into chunks, dropping duplicates
+    :param ids: The IDs to split
+    :param chunk_size: The maximum number of IDs per chunk
+    :return: A list of lists of IDs
+    """
+    ids = list(dict.fromkeys(ids))
+    return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+
+def ids_url(cur_url, ids):
+    """
+    Build the url that retrieves several resources by ID
+    :param cur_url: The url of the resource type
+    :param ids: The IDs to retrieve
+    :return: The url with an ids query argument
+    """
+    return cur_url + "?ids=" + ",".join(str(cur_id) for cur_id in ids)
+
+
+def page_url(cur_url, page_size, after_id, filters):
+    """
+    Build the url that retrieves one page of a listing
+    :param cur_url: The url of the resource type
+    :param page_size: The maximum number of resources in the page
+    :param after_id: The ID after which the page starts, or None for the first page
+    :param filters: A dictionary of field:value that the resources must match
+    :return: The url with limit, after_id, and filter query arguments
+    """
+    params = dict(filters)
+    params["limit"] = page_size
+    if after_id is not None:
+        params["after_id"] = after_id
+    return cur_url + "?" + urlencode(params)
+
+
+def merge_many_json(pages, key):
+    """
+    Merge the responses of several multi-get requests into one
+    :param pages: The json responses
+    :param key: The key holding the list of resources
+    :return: A dictionary with the resources under key and the missing IDs under missing_ids
+    """
+    merged = {key: [], "missing_ids": []}
+    for page in pages:
+        merged[key].extend(page[key])
+        merged["missing_ids"].extend(page["missing_ids"])
+    return merged
+
+
+def many_json_to_objects(many_json, key, obj_func):
+    """
+    Convert a merged multi-get response to objects
+    :param many_json: The merged json response
+    :param key: The key holding the list of resources
+    :param obj_func: The conversion function
+    :return: A tuple of a dictionary of type id:object and the list of missing IDs
+    """
+    objects = dict(obj_func(obj, True) for obj in many_json[key])
+    return objects, many_json["missing_ids"]
+
+
+class RinglingDBSession(DeploymentMixin, LineageMixin, AnalyticsMixin):
     """
     Main object to interact with Ringling
+
+    Methods never print or exit.  Failures are raised as subclasses of
+    ringling_lib.exceptions.RinglingError.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, *, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                 artifact_cache=None, model_cache=None, mmap_directory=DEFAULT_MAPPED_DIRECTORY,
+                 use_msgpack=False, mmap_max_bytes=DEFAULT_MAPPED_MAX_BYTES):
         """
-        Initialize ringling
+        Initialize ringling.  Every option after url is keyword-only.
         :param url: the url for the main Ringling process
-        """
+        :param chunk_size: the maximum number of IDs to retrieve per request in get_*_many
+        :param max_workers: the maximum number of parallel requests in get_*_many
+        :param artifact_cache: an optional ArtifactCache that get_trained_model and
+        get_model_object read model objects from instead of downloading them again
+        :param model_cache: the ModelCache load_model keeps deserialized models in,
+        by default one shared by the whole process
+        :param mmap_directory: the directory load_model writes memory-mapped models to,
+        which must be private to the current user
+        :param use_msgpack: if requests and responses are MessagePack instead of
+        JSON, which sends model objects as binary; needs the msgpack package
+        :param mmap_max_bytes: the maximum total size of the files in mmap_directory
+        """
+        if use_msgpack:
+            check_msgpack()
         self.url = url
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.artifact_cache = artifact_cache
+        self.model_cache = default_model_cache if model_cache is None else model_cache
+        self.mapped_models = MappedModelCache(mmap_directory, mmap_max_bytes)
         self.project_url = url + "/v1/projects"
         self.param_url = url + "/v1/parameter_sets"
         self.trained_model_url = url + "/v1/trained_models"
         self.model_test_url = url + "/v1/model_tests"
+        self.change_url = url + "/v1/changes"
+        self.alias_etags = {}
+        self.use_msgpack = use_msgpack
+
+    def _headers(self, headers=None):
+        """
+        Build the headers of a request
+        :param headers: other headers of the request
+        :return: a dictionary of the headers, which ask for MessagePack with use_msgpack
+        """
+        return request_headers(self.use_msgpack, headers)
+
+    def _body(self, obj, headers=None):
+        """
+        Build the body and headers of a request
+        :param obj: the dictionary to send
+        :param headers: other headers of the request
+        :return: the keyword arguments of the request
+        """
+        headers = self._headers(headers)
+        if self.use_msgpack:
+            headers["Content-Type"] = MSGPACK_MIMETYPE
+            return {"data": encode(obj), "headers": headers}
+        return {"json": obj, "headers": headers}
 
     def perform_connect_check(self):
         """
@@ -143,7 +282,7 @@ class RinglingDBSession:
             response = requests.get(self.url + "/healthcheck", timeout=0.5)
             response_json = response.json()
             return bool(response_json["database"]["connection"]["healthy"])
-        except requests.exceptions.ConnectTimeout:
+        except (RequestsConnectionError, requests.exceptions.Timeout):
             return False
 
     def create_project(self, project):
@@ -152,12 +291,11 @@ class RinglingDBSession:
         :param project: The project to send to Ringling
         :return: The ID for the newly created project
         """
-        obj = project.__dict__
+        obj = project.to_dict()
         try:
-            response = requests.post(self.project_url,
-                                     json=obj, timeout=5)
+            response = requests.post(self.project_url, timeout=5, **self._body(obj))
             if handle_create(response):
-                return response.json()['project_id']
+                return decode_json(response)['project_id']
         except RequestsConnectionError:
             connection_error()
         return None
@@ -168,16 +306,12 @@ class RinglingDBSession:
         :param param_set: The parameter set to send to Ringling
         :return: The ID for the newly created parameter set
         """
-        obj = {"project_id": param_set.project_id,
-               "training_parameters": param_set.training_parameters,
-               "is_active": param_set.is_active,
-               "metadata": param_set.metadata}
+        obj = param_set.to_dict()
 
         try:
-            response = requests.post(self.param_url,
-                                     json=obj, timeout=60)
+            response = requests.post(self.param_url, timeout=60, **self._body(obj))
             if handle_create(response):
-                return response.json()['parameter_set_id']
+                return decode_json(response)['parameter_set_id']
             return None
         except RequestsConnectionError:
             connection_error()
@@ -189,13 +323,42 @@ class RinglingDBSession:
         :param trained_model: The trained model to send to Ringling
         :return: The ID for the newly created trained model
         """
-        obj = trained_model.__dict__
+        obj = trained_model.to_dict()
+
+        try:
+            response = requests.post(self.trained_model_url, timeout=60, **self._body(obj))
+            if handle_create(response):
+                return decode_json(response)['model_id']
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def upload_trained_model(self, trained_model, source, chunk_size=UPLOAD_CHUNK_SIZE,
+                             compress=True):
+        """
+        Create a new trained model in Ringling, streaming its model object from
+        a file or iterator instead of holding it in memory.  The serialized
+        bytes are hex encoded on the way, as model_object is stored as hex, and
+        gzip compressed if compress is set.  Memory use is bounded by chunk_size.
+        :param trained_model: The trained model to send to Ringling; its model_object is ignored,
+        so it can be created with model_object=""
+        :param source: The serialized model as a file path, a binary file object,
+        or an iterable of bytes
+        :param chunk_size: The number of bytes to read at once from a path or file
+        :param compress: If the model object should be gzip compressed for the upload
+        :return: The ID for the newly created trained model
+        """
+        obj = {key: value for key, value in trained_model.to_dict().items()
+               if key != "model_object"}
+        boundary = uuid.uuid4().hex
+        headers = self._headers({"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        body = multipart_body(boundary, obj, read_chunks(source, chunk_size), compress)
 
         try:
-            response = requests.post(self.trained_model_url,
-                                     json=obj, timeout=60)
+            response = requests.post(self.trained_model_url, data=body,
+                                     headers=headers, timeout=60)
             if handle_create(response):
-                return response.json()['model_id']
+                return decode_json(response)['model_id']
         except RequestsConnectionError:
             connection_error()
         return None
@@ -206,16 +369,58 @@ class RinglingDBSession:
         :param model_test: The model test to send to Ringling
         :return: The ID for the newly created model test
         """
-        obj = model_test.__dict__
+        obj = model_test.to_dict()
         try:
-            response = requests.post(self.model_test_url,
-                                     json=obj, timeout=5)
+            response = requests.post(self.model_test_url, timeout=5, **self._body(obj))
             if handle_create(response):
-                return response.json()['test_id']
+                return decode_json(response)['test_id']
         except RequestsConnectionError:
             connection_error()
         return None
 
+    def _create_many(self, cur_url, batch, id_key, timeout):
+        """
+        Create the records of a batch, sending up to max_workers requests at once
+        :param cur_url: The url of the resource type
+        :param batch: The RecordBatch to send
+        :param id_key: The key of the new ID in each response
+        :param timeout: The timeout in seconds of each request
+        :return: The list of new IDs in record order, with None for records
+        the service rejected
+        """
+        def create(obj):
+            try:
+                response = requests.post(cur_url, timeout=timeout, **self._body(obj))
+                if handle_create(response):
+                    return decode_json(response)[id_key]
+            except RequestsConnectionError:
+                connection_error()
+            return None
+
+        records = batch.to_records()
+        if not records:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(records), self.max_workers)) as pool:
+            return list(pool.map(create, records))
+
+    def create_trained_models(self, batch):
+        """
+        Create the trained models of a TrainedModelBatch in Ringling
+        :param batch: The TrainedModelBatch, whose values were validated when it was built
+        :return: The list of IDs of the new trained models in record order,
+        with None for those the service rejected
+        """
+        return self._create_many(self.trained_model_url, batch, "model_id", 60)
+
+    def create_model_tests(self, batch):
+        """
+        Create the model tests of a ModelTestBatch in Ringling
+        :param batch: The ModelTestBatch, whose values were validated when it was built
+        :return: The list of IDs of the new model tests in record order,
+        with None for those the service rejected
+        """
+        return self._create_many(self.model_test_url, batch, "test_id", 5)
+
     def _get_project(self, cur_id):
         """
         Get a project from Ringling given an id
@@ -224,7 +429,7 @@ class RinglingDBSession:
         """
         url = self.project_url + "/" + str(cur_id)
         try:
-            response = requests.get(url, timeout=5)
+            response = requests.get(url, headers=self._headers(), timeout=5)
             return handle_get(response, "Project", cur_id)
         except RequestsConnectionError:
             connection_error()
@@ -254,7 +459,7 @@ class RinglingDBSession:
         """
         url = self.param_url + "/" + str(cur_id)
         try:
-            response = requests.get(url, timeout=60)
+            response = requests.get(url, headers=self._headers(), timeout=60)
             return handle_get(response, "Parameter Set", cur_id)
         except RequestsConnectionError:
             connection_error()
@@ -282,14 +487,133 @@ class RinglingDBSession:
         :param cur_id: the id to retrieve
         :return: TrainedModel object
         """
+        if self.artifact_cache is not None:
+            return self._get_trained_model_cached(cur_id)
+
         url = self.trained_model_url + "/" + str(cur_id)
         try:
-            response = requests.get(url, timeout=60)
+            response = requests.get(url, headers=self._headers(), timeout=60)
             return handle_get(response, "Trained Model", cur_id)
         except RequestsConnectionError:
             connection_error()
         return None
 
+    def _get_trained_model_cached(self, cur_id):
+        """
+        Get a trained model from Ringling given an id, reading the model
+        object from the artifact cache when it holds the current digest
+        :param cur_id: the id to retrieve
+        :return: TrainedModel object
+        """
+        url = self.trained_model_url + "/" + str(cur_id)
+        try:
+            response = requests.get(url, params={"include_model_object": "false"},
+                                    headers=self._headers(), timeout=60)
+            trained_model_json = handle_get(response, "Trained Model", cur_id)
+        except RequestsConnectionError:
+            connection_error()
+            return None
+
+        digest = trained_model_json["model_digest"]
+        model_object = self.artifact_cache.get(cur_id, digest)
+        if model_object is None:
+            model_object = self._download_model_object(cur_id)
+        trained_model_json["model_object"] = model_object.decode("utf-8")
+        return trained_model_json
+
+    def _download_model_object(self, cur_id, cached_digest=None):
+        """
+        Download the model object of a trained model, streaming it into the
+        artifact cache if there is one
+        :param cur_id: the id to retrieve
+        :param cached_digest: the digest of the cached copy to revalidate
+        :return: the model object bytes, or None if the cached copy is current
+        """
+        url = self.trained_model_url + "/" + str(cur_id) + "/model_object"
+        headers = {}
+        if cached_digest is not None:
+            headers["If-None-Match"] = f'"{cached_digest}"'
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+                if response.status_code == 304:
+                    return None
+                if response.status_code == 404:
+                    raise RinglingNotFoundError("Trained Model", cur_id)
+                raise_for_status(response)
+                if self.artifact_cache is None:
+                    return response.content
+                digest = response.headers["ETag"].strip('"')
+                return self.artifact_cache.store(
+                    cur_id, digest, response.iter_content(DOWNLOAD_CHUNK_SIZE))
+        except RequestsConnectionError:
+            connection_error()
+        return None
+
+    def get_model_object(self, cur_id):
+        """
+        Get the serialized model object of a trained model given an id.  With
+        an artifact cache, a cached copy is revalidated with a conditional
+        request instead of being downloaded again.
+        :param cur_id: the id of the trained model
+        :return: the model object string
+        """
+        if self.artifact_cache is not None:
+            digest = self.artifact_cache.find_digest(cur_id)
+            if digest is not None:
+                model_object = self._download_model_object(cur_id, digest)
+                if model_object is None:
+                    model_object = self.artifact_cache.get(cur_id, digest)
+                if model_object is not None:
+                    return model_object.decode("utf-8")
+        return self._download_model_object(cur_id).decode("utf-8")
+
+    def load_model(self, cur_id, mmap_mode=None):
+        """
+        Get the deserialized model object of a trained model given an id.
+        Models are unpickled once and kept in the model cache, so repeated
+        calls return the same object; do not modify it.  Model objects written
+        with serialization.serialize_model are loaded without copying their buffers.
+
+        With mmap_mode="r" the model is written once to a file in mmap_directory
+        and its buffers are memory-mapped read-only from that file, so every
+        process on the host that loads the model shares one copy of its arrays.
+        The file is checked against the digest of the model object every time
+        it is loaded.
+        :param cur_id: the id of the trained model
+        :param mmap_mode: None to load into memory, or "r" to memory-map read-only
+        :return: the unpickled model
+        """
+        if mmap_mode is None:
+            def load():
+                model_object = self.get_model_object(cur_id)
+                return deserialize_model(model_object), len(model_object) // 2
+
+            return self.model_cache.get_or_load((self.url, cur_id), load)
+
+        if mmap_mode not in MMAP_MODES:
+            raise ValueError(f"mmap_mode with value \"{mmap_mode}\" must be one of: {MMAP_MODES}")
+
+        return self.model_cache.get_or_load((self.url, cur_id, mmap_mode),
+                                            lambda: self._load_mapped_model(cur_id))
+
+    def _load_mapped_model(self, cur_id):
+        """
+        Memory-map a model from mmap_directory, writing it there first if
+        no process on the host has yet
+        :param cur_id: the id of the trained model
+        :return: the unpickled model and the size of its part outside of the mapping
+        """
+        url = self.trained_model_url + "/" + str(cur_id)
+        try:
+            response = requests.get(url, params={"include_model_object": "false"},
+                                    headers=self._headers(), timeout=60)
+            digest = handle_get(response, "Trained Model", cur_id)["model_digest"]
+        except RequestsConnectionError:
+            connection_error()
+            return None
+
+        return self.mapped_models.load(cur_id, digest, lambda: self.get_model_object(cur_id))
+
     def get_trained_model(self, cur_id):
         """
         Get a trained model from Ringling given an id
@@ -306,7 +630,6 @@ class RinglingDBSession:
         """
         return self._get_trained_model(cur_id)
 
-
     def _get_model_test(self, cur_id):
         """
         Get a model test from Ringling given an ID
@@ -315,7 +638,7 @@ class RinglingDBSession:
         """
         url = self.model_test_url + "/" + str(cur_id)
         try:
-            response = requests.get(url, timeout=5)
+            response = requests.get(url, headers=self._headers(), timeout=5)
             return handle_get(response, "Model Test", cur_id)
         except RequestsConnectionError:
             connection_error()
@@ -342,53 +665,268 @@ class RinglingDBSession:
         List all the projects in Ringling
         :return: A dictionary of id:Project for all projects
         """
-        return obj_list(self.project_url, json_to_project)
+        return obj_list(self.project_url, json_to_project, self._headers())
 
     def list_projects_json(self):
         """
         List all the projects in Ringling
         :return: A string with the exact contents of the list command
         """
-        return perform_list(self.project_url)
+        return perform_list(self.project_url, headers=self._headers())
 
     def list_param_sets(self):
         """
         List all the parameter sets in Ringling
         :return: A dictionary of id:ParameterSet for all parameter sets
         """
-        return obj_list(self.param_url, json_to_param_set)
+        return obj_list(self.param_url, json_to_param_set, self._headers())
 
     def list_param_sets_json(self):
         """
         List all the projects in Ringling
         :return: A string with the exact contents of the list parameter sets command
         """
-        return perform_list(self.param_url)
+        return perform_list(self.param_url, headers=self._headers())
 
     def list_trained_models(self):
         """
         List all the trained models in Ringling
         :return: A dictionary of id:TrainedModel for all trained models
         """
-        return obj_list(self.trained_model_url, json_to_trained_model)
+        return obj_list(self.trained_model_url, json_to_trained_model, self._headers())
 
     def list_trained_models_json(self):
         """
         List all the trained models in Ringling
         :return: A string with the exact contents of the list trained models command
         """
-        return perform_list(self.trained_model_url)
+        return perform_list(self.trained_model_url, headers=self._headers())
 
     def list_model_tests(self):
         """
         List all the model tests in Ringling
         :return: A dictionary of id:ModelTest for all model tests
         """
-        return obj_list(self.model_test_url, json_to_model_test)
+        return obj_list(self.model_test_url, json_to_model_test, self._headers())
 
     def list_model_tests_json(self):
         """
         List all the model tests in Ringling
         :return: A string with the exact contents of the list model tests command
         """
-        return perform_list(self.model_test_url)
+        return perform_list(self.model_test_url, headers=self._headers())
+
+    def _get_many(self, cur_url, key, ids, timeout):
+        """
+        Get several resources by ID, splitting the IDs into parallel requests
+        :param cur_url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param ids: The IDs to retrieve
+        :param timeout: The timeout in seconds of each request
+        :return: A dictionary with the resources under key and the missing IDs under missing_ids
+        """
+        chunks = chunk_ids(ids, self.chunk_size)
+        if not chunks:
+            return merge_many_json([], key)
+        headers = self._headers()
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.max_workers)) as pool:
+            pages = list(pool.map(lambda chunk: perform_list(ids_url(cur_url, chunk), timeout,
+                                                               headers),
+                                  chunks))
+        return merge_many_json(pages, key)
+
+    def get_projects_many(self, ids):
+        """
+        Get several projects from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:Project and the list of ids that were not found
+        """
+        return many_json_to_objects(self.get_projects_many_json(ids), "projects",
+                                    json_to_project)
+
+    def get_projects_many_json(self, ids):
+        """
+        Get several projects from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the projects and the ids that were not found
+        """
+        return self._get_many(self.project_url, "projects", ids, 5)
+
+    def get_param_sets_many(self, ids):
+        """
+        Get several parameter sets from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:ParameterSet and the list of ids that were not found
+        """
+        return many_json_to_objects(self.get_param_sets_many_json(ids), "parameter_sets",
+                                    json_to_param_set)
+
+    def get_param_sets_many_json(self, ids):
+        """
+        Get several parameter sets from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the parameter sets and the ids that were not found
+        """
+        return self._get_many(self.param_url, "parameter_sets", ids, 60)
+
+    def get_trained_models_many(self, ids):
+        """
+        Get several trained models from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:TrainedModel and the list of ids that were not found
+        """
+        return many_json_to_objects(self.get_trained_models_many_json(ids), "trained_models",
+                                    json_to_trained_model)
+
+    def get_trained_models_many_json(self, ids):
+        """
+        Get several trained models from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the trained models and the ids that were not found
+        """
+        return self._get_many(self.trained_model_url, "trained_models", ids, 60)
+
+    def get_model_tests_many(self, ids):
+        """
+        Get several model tests from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A tuple of a dictionary of id:ModelTest and the list of ids that were not found
+        """
+        return many_json_to_objects(self.get_model_tests_many_json(ids), "model_tests",
+                                    json_to_model_test)
+
+    def get_model_tests_many_json(self, ids):
+        """
+        Get several model tests from Ringling given their ids
+        :param ids: the ids to retrieve
+        :return: A dictionary with the model tests and the ids that were not found
+        """
+        return self._get_many(self.model_test_url, "model_tests", ids, 5)
+
+    def _iter_pages(self, cur_url, key, *, page_size, filters, timeout, after_id=None):
+        """
+        Walk through a listing one page at a time
+        :param cur_url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param page_size: The number of resources to retrieve per request
+        :param filters: A dictionary of field:value that the resources must match
+        :param timeout: The timeout in seconds of each request
+        :param after_id: Only walk through resources with a higher ID
+        :return: A generator of the list of the json of the resources of each page
+        """
+        while True:
+            page = perform_list(page_url(cur_url, page_size, after_id, filters), timeout,
+                                self._headers())
+            yield page[key]
+            after_id = page["next_after_id"]
+            if after_id is None:
+                return
+
+    def _iter_json(self, cur_url, key, *, page_size, filters, timeout, after_id=None):
+        """
+        Walk through a listing one page at a time
+        :param cur_url: The url of the resource type
+        :param key: The key holding the list of resources
+        :param page_size: The number of resources to retrieve per request
+        :param filters: A dictionary of field:value that the resources must match
+        :param timeout: The timeout in seconds of each request
+        :param after_id: Only walk through resources with a higher ID
+        :return: A generator of the json of each resource
+        """
+        for page in self._iter_pages(cur_url, key, page_size=page_size, filters=filters,
+                                      timeout=timeout, after_id=after_id):
+            yield from page
+
+    def iter_projects(self, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Walk through all the projects in Ringling, holding one page in memory at a time
+        :param page_size: The number of projects to retrieve per request
+        :return: A generator of (id, Project) tuples in ID order
+        """
+        for obj in self.iter_projects_json(page_size):
+            yield json_to_project(obj, True)
+
+    def iter_projects_json(self, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Walk through all the projects in Ringling, holding one page in memory at a time
+        :param page_size: The number of projects to retrieve per request
+        :return: A generator of the json of each project in ID order
+        """
+        return self._iter_json(self.project_url, "projects", page_size=page_size,
+                               filters={}, timeout=5)
+
+    def iter_param_sets(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the parameter sets in Ringling, holding one page in memory at a time
+        :param page_size: The number of parameter sets to retrieve per request
+        :param filters: Values that the parameter sets must match, any of project_id and is_active
+        :return: A generator of (id, ParameterSet) tuples in ID order
+        """
+        for obj in self.iter_param_sets_json(page_size, **filters):
+            yield json_to_param_set(obj, True)
+
+    def iter_param_sets_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the parameter sets in Ringling, holding one page in memory at a time
+        :param page_size: The number of parameter sets to retrieve per request
+        :param filters: Values that the parameter sets must match, any of project_id and is_active
+        :return: A generator of the json of each parameter set in ID order
+        """
+        return self._iter_json(self.param_url, "parameter_sets", page_size=page_size,
+                               filters=filters, timeout=60)
+
+    def iter_trained_models(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the trained models in Ringling, holding one page in memory at a time
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: A generator of (id, TrainedModel) tuples in ID order
+        """
+        for obj in self.iter_trained_models_json(page_size, **filters):
+            yield json_to_trained_model(obj, True)
+
+    def iter_trained_models_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the trained models in Ringling, holding one page in memory at a time
+        :param page_size: The number of trained models to retrieve per request
+        :param filters: Values that the trained models must match, any of project_id,
+        parameter_set_id, deployment_stage, and passed_backtesting
+        :return: A generator of the json of each trained model in ID order
+        """
+        return self._iter_json(self.trained_model_url, "trained_models", page_size=page_size,
+                               filters=filters, timeout=60)
+
+    def iter_model_tests(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the model tests in Ringling, holding one page in memory at a time
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: A generator of (id, ModelTest) tuples in ID order
+        """
+        for obj in self.iter_model_tests_json(page_size, **filters):
+            yield json_to_model_test(obj, True)
+
+    def iter_model_tests_json(self, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the model tests in Ringling, holding one page in memory at a time
+        :param page_size: The number of model tests to retrieve per request
+        :param filters: Values that the model tests must match, any of project_id,
+        parameter_set_id, model_id, and passed_testing
+        :return: A generator of the json of each model test in ID order
+        """
+        return self._iter_json(self.model_test_url, "model_tests", page_size=page_size,
+                               filters=filters, timeout=5)
+
+    def iter_changes_json(self, after_id=None, page_size=DEFAULT_PAGE_SIZE, **filters):
+        """
+        Walk through the change feed in order.  To poll for new changes, call
+        again with after_id set to the change_id of the last change seen.
+        :param after_id: Only return changes with a higher change_id
+        :param page_size: The number of changes to retrieve per request
+        :param filters: Values that the changes must match, any of project_id and change_type
+        :return: A generator of the json of each change in change_id order
+        """
+        return self._iter_json(self.change_url, "changes", page_size=page_size, filters=filters,
+                               timeout=5, after_id=after_id)
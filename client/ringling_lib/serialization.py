@@ -0,0 +1,187 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+
+MAGIC = b"RNGLOOB5"
+ALIGNMENT = 64
+HEX_CHUNK_SIZE = 2 * 1024 * 1024
+HEADER = struct.Struct("<QQ")
+PART = struct.Struct("<QQ")
+
+
+def align(offset):
+    """
+    Round an offset up to the next multiple of ALIGNMENT
+    :param offset: the offset in bytes
+    :return: the aligned offset
+    """
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def dumps_out_of_band(obj):
+    """
+    Pickle an object with protocol 5, storing its out-of-band buffers
+    (e.g. the data of numpy arrays) as separate parts after the pickle stream
+
+    The layout is MAGIC, the number of buffers and the length of the pickle
+    stream, the offset and length of each buffer, the pickle stream, and then
+    each buffer aligned to ALIGNMENT bytes.  Each buffer is copied exactly once.
+    :param obj: the object to pickle
+    :return: a bytearray holding the whole artifact
+    """
+    buffers = []
+    stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    offset = len(MAGIC) + HEADER.size + PART.size * len(raws)
+    stream_offset = offset
+    offset += len(stream)
+    parts = []
+    for raw in raws:
+        offset = align(offset)
+        parts.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    data = bytearray(offset)
+    data[:len(MAGIC)] = MAGIC
+    HEADER.pack_into(data, len(MAGIC), len(raws), len(stream))
+    for i, part in enumerate(parts):
+        PART.pack_into(data, len(MAGIC) + HEADER.size + PART.size * i, *part)
+    data[stream_offset:stream_offset + len(stream)] = stream
+    for raw, (part_offset, length) in zip(raws, parts):
+        data[part_offset:part_offset + length] = raw
+        raw.release()
+    return data
+
+
+def loads_out_of_band(data):
+    """
+    Unpickle an artifact written by dumps_out_of_band.  The buffers are
+    views of data rather than copies, so data must stay alive and unchanged
+    while the object is in use; pass a bytearray to get writable arrays.
+    :param data: the artifact as a bytes-like object
+    :return: the unpickled object
+    """
+    view = memoryview(data)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not an out-of-band pickle artifact")
+
+    buffer_count, pickle_length = HEADER.unpack_from(view, len(MAGIC))
+    stream_offset = len(MAGIC) + HEADER.size + PART.size * buffer_count
+    buffers = []
+    for i in range(buffer_count):
+        offset, length = PART.unpack_from(view, len(MAGIC) + HEADER.size + PART.size * i)
+        buffers.append(view[offset:offset + length])
+
+    return pickle.loads(view[stream_offset:stream_offset + pickle_length], buffers=buffers)
+
+
+def serialize_model(obj):
+    """
+    Serialize a model into a model object string for a TrainedModel, with
+    its large buffers stored out-of-band
+    :param obj: the model to serialize
+    :return: the hex encoded artifact
+    """
+    return dumps_out_of_band(obj).hex()
+
+
+def deserialize_model(model_object):
+    """
+    Deserialize a model object string.  Artifacts written by serialize_model
+    are decoded into one contiguous block that the model's buffers point
+    into; any other model object is treated as a hex encoded pickle.
+    :param model_object: the model object string of a trained model
+    :return: the deserialized model
+    """
+    if model_object.startswith(MAGIC.hex()):
+        return loads_out_of_band(bytearray.fromhex(model_object))
+    return pickle.loads(bytes.fromhex(model_object))
+
+
+def stream_length(data):
+    """
+    Get the length of the pickle stream of an out-of-band artifact, which
+    is roughly the memory its object uses outside of the buffers
+    :param data: the artifact as a bytes-like object
+    :return: the length in bytes
+    """
+    return HEADER.unpack_from(data, len(MAGIC))[1]
+
+
+def hex_digest(data):
+    """
+    Compute the digest of the hex encoding of binary data, which is the
+    digest of the model object string it was decoded from
+    :param data: the bytes-like data
+    :return: the SHA-256 hex digest
+    """
+    hasher = hashlib.sha256()
+    for start in range(0, len(data), HEX_CHUNK_SIZE // 2):
+        hasher.update(data[start:start + HEX_CHUNK_SIZE // 2].hex().encode("ascii"))
+    return hasher.hexdigest()
+
+
+def write_model_file(path, model_object):
+    """
+    Write the bytes of a model object to a file, a chunk at a time.  The
+    file is written under a temporary name and renamed into place.
+    :param path: the path of the file
+    :param model_object: the model object string of a trained model
+    :return: None
+    """
+    file_handle, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(file_handle, "wb") as file:
+            for start in range(0, len(model_object), HEX_CHUNK_SIZE):
+                file.write(bytes.fromhex(model_object[start:start + HEX_CHUNK_SIZE]))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_model_file(path, digest):
+    """
+    Memory-map a file written by write_model_file read-only, check it
+    against the digest of its model object, and unpickle it.  The buffers of
+    an artifact written by serialize_model point into the mapping, so
+    processes loading the same file share its pages, and arrays are
+    read-only; any other pickle is loaded into memory.
+    :param path: the path of the file
+    :param digest: the SHA-256 hex digest of the model object
+    :return: the unpickled object and the length of its part outside of the
+    mapping, or None if the file is missing, empty or does not match the digest
+    """
+    try:
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if hex_digest(mapping) != digest:
+        mapping.close()
+        return None
+    if mapping[:len(MAGIC)] == MAGIC:
+        return loads_out_of_band(mapping), stream_length(mapping)
+    with mapping:
+        return pickle.loads(mapping), len(mapping)
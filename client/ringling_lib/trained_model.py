@@ -18,10 +18,15 @@ limitations under the License.
 
 from .utils import validate_types
 from .utils import validate_iso
+from .utils import DEPLOYMENT_STAGES
 class TrainedModel:
     """
     Object for trained models fields
     """
+    __slots__ = ("project_id", "parameter_set_id", "training_data_from", "training_data_until",
+                 "model_object", "train_timestamp", "deployment_stage", "backtest_timestamp",
+                 "backtest_metrics", "passed_backtesting", "metadata")
+
     def __init__(self, project_id, parameter_set_id, training_data_from,
                  training_data_until, model_object,
                  train_timestamp, deployment_stage, backtest_timestamp,
@@ -68,9 +73,9 @@ class TrainedModel:
             if not validate_iso(value):
                 raise ValueError(f'{key} with value of {value} is not in ISO-8601 format')
 
-        if deployment_stage not in ["testing", "production", "retired"]:
+        if deployment_stage not in DEPLOYMENT_STAGES:
             raise ValueError(f'deployment_stage with value \"{deployment_stage}\" must be one of: '
-                             f'["testing", "production", "retired"]')
+                             f'{DEPLOYMENT_STAGES}')
         self.project_id = project_id
         self.parameter_set_id = parameter_set_id
         self.training_data_from = training_data_from
@@ -82,3 +87,20 @@ class TrainedModel:
         self.backtest_metrics = backtest_metrics
         self.passed_backtesting = passed_backtesting
         self.metadata = metadata
+
+    def to_dict(self):
+        """
+        Get the fields of the trained model as sent to Ringling
+        :return: a dictionary of field:value
+        """
+        return {"project_id": self.project_id,
+                "parameter_set_id": self.parameter_set_id,
+                "training_data_from": self.training_data_from,
+                "training_data_until": self.training_data_until,
+                "model_object": self.model_object,
+                "train_timestamp": self.train_timestamp,
+                "deployment_stage": self.deployment_stage,
+                "backtest_timestamp": self.backtest_timestamp,
+                "backtest_metrics": self.backtest_metrics,
+                "passed_backtesting": self.passed_backtesting,
+                "metadata": self.metadata}
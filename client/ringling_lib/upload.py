@@ -0,0 +1,73 @@
+"""
+Copyright 2023 MSOE DISE Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+import zlib
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+TRAINED_MODEL_PART = "trained_model"
+MODEL_OBJECT_PART = "model_object"
+
+
+def read_chunks(source, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Read serialized model bytes a chunk at a time
+    :param source: a file path, a binary file object, or an iterable of bytes
+    :param chunk_size: the number of bytes to read at once from a path or file
+    :return: a generator of bytes
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from iter(lambda: file.read(chunk_size), b"")
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), b"")
+    else:
+        yield from source
+
+
+def multipart_body(boundary, trained_model_json, chunks, compress):
+    """
+    Generate a multipart/form-data body with the fields of a trained model
+    and its model object.  The model object is hex encoded, and optionally gzip
+    compressed, one chunk at a time.
+    :param boundary: the multipart boundary
+    :param trained_model_json: a dictionary of the fields other than model_object
+    :param chunks: an iterable of the serialized model bytes
+    :param compress: if the model object part should be gzip compressed
+    :return: a generator of bytes
+    """
+    content_type = "application/gzip" if compress else "application/octet-stream"
+    yield (f"--{boundary}\r\n"
+           f"Content-Disposition: form-data; name=\"{TRAINED_MODEL_PART}\"\r\n"
+           "Content-Type: application/json\r\n\r\n"
+           f"{json.dumps(trained_model_json)}\r\n"
+           f"--{boundary}\r\n"
+           f"Content-Disposition: form-data; name=\"{MODEL_OBJECT_PART}\"; "
+           f"filename=\"{MODEL_OBJECT_PART}\"\r\n"
+           f"Content-Type: {content_type}\r\n\r\n").encode("utf-8")
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    for chunk in chunks:
+        data = chunk.hex().encode("ascii")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
+
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
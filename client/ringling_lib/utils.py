@@ -14,8 +14,11 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections import deque
 from datetime import datetime
 
+DEPLOYMENT_STAGES = ["testing", "production", "retired"]
+
 def validate_types(params):
     """
     Validate types as a list of tuples
@@ -31,10 +34,80 @@ def validate_iso(test_string):
     Validate if a string is valid iso format
     """
     try:
-        print(test_string)
-        print(datetime.now().isoformat())
-        datetime.fromisoformat(datetime.now().isoformat())
-        print(datetime.now().isoformat())
-    except ValueError:
+        datetime.fromisoformat(test_string)
+    except (TypeError, ValueError):
         return False
     return True
+
+
+def validate_column_types(name, values, _type, errors):
+    """
+    Validate the types of a column at once.  The types of all the values are
+    compared in one pass, and the rows are only walked to report the values
+    of the wrong type.
+    :param name: the field name
+    :param values: the list of values
+    :param _type: the type every value should be an instance of
+    :param errors: the list to add (row, field, message) tuples to
+    :return: True if every value is of the type
+    """
+    if set(map(type, values)) <= {_type}:
+        return True
+    valid = True
+    for row, value in enumerate(values):
+        if not isinstance(value, _type):
+            errors.append((row, name, f'{value!r} should be of type {_type.__name__} '
+                                      f'but is instead {type(value).__name__}'))
+            valid = False
+    return valid
+
+
+def validate_iso_column(name, values, errors):
+    """
+    Validate a column of timestamps at once.  All the strings are parsed in
+    one pass, and the rows are only walked to convert datetimes to ISO 8601
+    strings or to report the values that are not timestamps.
+    :param name: the field name
+    :param values: the list of ISO 8601 strings or datetimes
+    :param errors: the list to add (row, field, message) tuples to
+    :return: the list of ISO 8601 strings
+    """
+    if set(map(type, values)) <= {str}:
+        try:
+            deque(map(datetime.fromisoformat, values), maxlen=0)
+            return values
+        except ValueError:
+            pass
+
+    converted = []
+    for row, value in enumerate(values):
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif not isinstance(value, str):
+            errors.append((row, name, f'{value!r} should be of type str or datetime '
+                                      f'but is instead {type(value).__name__}'))
+        elif not validate_iso(value):
+            errors.append((row, name, f'{value!r} is not in ISO-8601 format'))
+        converted.append(value)
+    return converted
+
+
+def validate_choice_column(name, values, choices, errors):
+    """
+    Validate that every value of a column is one of a few choices, comparing
+    the distinct values of the column at once
+    :param name: the field name
+    :param values: the list of values
+    :param choices: the list of allowed values
+    :param errors: the list to add (row, field, message) tuples to
+    :return: True if every value is allowed
+    """
+    try:
+        if set(values) <= set(choices):
+            return True
+    except TypeError:
+        pass
+    for row, value in enumerate(values):
+        if value not in choices:
+            errors.append((row, name, f'{value!r} must be one of: {choices}'))
+    return False
@@ -26,4 +26,6 @@ setup(name="ringling-cli",
       packages=["ringling", "ringling_lib"],
       python_requires=">=3.8, <3.12",
       install_requires=["requests"],
+      extras_require={"arrow": ["pyarrow"], "async": ["httpx"],
+                      "frames": ["numpy", "pandas"], "msgpack": ["msgpack"]},
       scripts=["bin/ringling-cli"])
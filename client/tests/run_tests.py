@@ -16,6 +16,14 @@ from tests.test_projects import TestProjects
 from tests.test_parameter_sets import TestParameterSets
 from tests.test_trained_models import TestTrainedModels
 from tests.test_model_tests import TestModelTests
+from tests.test_async_session import TestAsyncSession
+from tests.test_artifact_cache import TestArtifactCache
+from tests.test_model_cache import TestModelCache
+from tests.test_aliases import TestAliases
+from tests.test_msgpack import TestMessagePack
+from tests.test_exports import TestExports
+from tests.test_frames import TestFrames
+from tests.test_batch import TestBatch
 
 test_suite = unittest.TestSuite()
 
@@ -25,6 +33,14 @@ test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestProject
 test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestParameterSets))
 test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestTrainedModels))
 test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestModelTests))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestAsyncSession))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestArtifactCache))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestModelCache))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestAliases))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestMessagePack))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestExports))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestFrames))
+test_suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(TestBatch))
 
 if __name__ == '__main__':
     runner = unittest.TextTestRunner()
@@ -0,0 +1,65 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import os
+import unittest
+from datetime import datetime
+
+from ringling_lib.exceptions import RinglingNotFoundError
+from ringling_lib.exceptions import RinglingResponseError
+from ringling_lib.project import Project
+from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+NOW = datetime.now().isoformat()
+
+
+class TestAliases(unittest.TestCase):
+    """
+    Test interacting with model aliases and the change feed
+    """
+    def test_alias_set_get(self):
+        """
+        Test setting an alias, reading it back, and seeing the change in the feed
+        :return: If the alias follows each set, a stale expected_change_id is rejected,
+        and the feed holds every set
+        """
+        session = RinglingDBSession(base_url)
+        project_id = session.create_project(Project(f"aliases{datetime.now()}", {}))
+        model_ids = [session.create_trained_model(TrainedModel(
+            project_id, 1, NOW, NOW, "abcdef", NOW, "testing", NOW, {}, True))
+            for _ in range(2)]
+
+        with self.assertRaises(RinglingNotFoundError):
+            session.get_alias_json(project_id, "champion")
+
+        first = session.set_alias(project_id, "champion", model_ids[0])
+        self.assertEqual(session.get_alias_json(project_id, "champion"), first)
+        second = session.set_alias(project_id, "champion", model_ids[1],
+                                   expected_change_id=first["change_id"])
+        self.assertEqual(session.get_alias_json(project_id, "champion")["model_id"],
+                         model_ids[1])
+        with self.assertRaises(RinglingResponseError) as context:
+            session.set_alias(project_id, "champion", model_ids[0],
+                              expected_change_id=first["change_id"])
+        self.assertEqual(context.exception.status_code, 412)
+
+        self.assertEqual(session.list_aliases_json(project_id), [second])
+        changes = list(session.iter_changes_json(page_size=1, project_id=project_id))
+        self.assertEqual([c["body"]["model_id"] for c in changes], model_ids)
+        self.assertEqual(list(session.iter_changes_json(changes[0]["change_id"],
+                                                        project_id=project_id)),
+                         changes[1:])
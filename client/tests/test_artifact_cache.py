@@ -0,0 +1,117 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from ringling_lib.artifact_cache import ArtifactCache
+from ringling_lib.exceptions import RinglingIntegrityError
+from ringling_lib.trained_model import TrainedModel
+from ringling_lib.ringling_db import RinglingDBSession
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+
+class TestArtifactCache(unittest.TestCase):
+    """
+    Test caching trained model objects on disk
+    """
+    def create_trained_model(self, model_object):
+        """
+        Create a trained model to cache
+        :param model_object: the model object of the trained model
+        :return: the ID of the trained model
+        """
+        session = RinglingDBSession(base_url)
+        test_trained_model = TrainedModel(
+            1, 7, "1998-01-01T00:00:00.000000", "2005-12-31T23:59:59.999999",
+            model_object, datetime.now().isoformat(), "testing",
+            datetime.now().isoformat(), {"precision": 0.85, "recall": 0.75},
+            True, {"Additional data":"Cached"}
+        )
+        return session.create_trained_model(test_trained_model)
+
+    def test_cache_shared_across_sessions(self):
+        """
+        Get a trained model twice with different sessions sharing a cache directory
+        :return: If the second session reads the model object from the cache
+        """
+        model_object = "0x00a5234f6123371cache"
+        digest = hashlib.sha256(model_object.encode("utf-8")).hexdigest()
+        trained_model_id = self.create_trained_model(model_object)
+
+        with tempfile.TemporaryDirectory() as directory:
+            session = RinglingDBSession(base_url, artifact_cache=ArtifactCache(directory))
+            self.assertEqual(session.get_trained_model(trained_model_id).model_object,
+                             model_object)
+            self.assertEqual(session.artifact_cache.find_digest(trained_model_id), digest)
+
+            other_session = RinglingDBSession(base_url, artifact_cache=ArtifactCache(directory))
+            self.assertEqual(other_session.get_model_object(trained_model_id), model_object)
+            self.assertEqual(os.listdir(directory), [f"{trained_model_id}-{digest}"])
+
+    def test_cache_corrupted_file(self):
+        """
+        Get a model object whose cached copy was corrupted
+        :return: If the model object is downloaded again
+        """
+        model_object = "0x00a5234f6123371corrupt"
+        trained_model_id = self.create_trained_model(model_object)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ArtifactCache(directory)
+            session = RinglingDBSession(base_url, artifact_cache=cache)
+            session.get_model_object(trained_model_id)
+
+            digest = cache.find_digest(trained_model_id)
+            with open(cache.path(trained_model_id, digest), "w", encoding="utf-8") as file:
+                file.write("not the model")
+
+            self.assertEqual(session.get_trained_model(trained_model_id).model_object,
+                             model_object)
+            self.assertEqual(session.get_model_object(trained_model_id), model_object)
+
+    def test_cache_eviction(self):
+        """
+        Store more model objects than fit in the cache
+        :return: If the least recently used model objects are evicted
+        """
+        contents = [bytes([i]) * 100 for i in range(3)]
+        digests = [hashlib.sha256(data).hexdigest() for data in contents]
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ArtifactCache(directory, max_bytes=250)
+            cache.store(0, digests[0], [contents[0]])
+            cache.store(1, digests[1], [contents[1]])
+            os.utime(cache.path(0, digests[0]), (0, 0))
+            os.utime(cache.path(1, digests[1]), (1, 1))
+            self.assertEqual(cache.get(0, digests[0]), contents[0])
+            cache.store(2, digests[2], [contents[2]])
+
+            self.assertIsNone(cache.get(1, digests[1]))
+            self.assertEqual(cache.get(0, digests[0]), contents[0])
+            self.assertEqual(cache.get(2, digests[2]), contents[2])
+
+    def test_cache_bad_digest(self):
+        """
+        Store a model object that does not match its digest
+        :return: If an integrity error is raised and nothing is cached
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ArtifactCache(directory)
+            with self.assertRaises(RinglingIntegrityError):
+                cache.store(1, "0" * 64, [b"model"])
+            self.assertEqual(os.listdir(directory), [])
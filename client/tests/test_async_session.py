@@ -0,0 +1,135 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import os
+import socket
+import unittest
+from datetime import datetime
+
+from ringling_lib.model_test import ModelTest
+from ringling_lib.project import Project
+from ringling_lib.async_ringling_db import AsyncRinglingDBSession
+from ringling_lib.async_ringling_db import httpx
+from ringling_lib.exceptions import RinglingConnectionError
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncSession(unittest.TestCase):
+    """
+    Test interacting with Ringling through the asyncio session
+    """
+    def test_async_connection(self):
+        """
+        Test if the connection works with the correct URL
+        :return: If the connection is healthy
+        """
+        async def check():
+            async with AsyncRinglingDBSession(base_url) as session:
+                return await session.perform_connect_check()
+
+        self.assertTrue(asyncio.run(check()))
+
+    def test_async_timeout_raises(self):
+        """
+        Test if a request to a server that never answers raises instead of
+        passing the httpx exception on
+        :return: If the timeout raised a connection error
+        """
+        async def get():
+            async with AsyncRinglingDBSession(f"http://127.0.0.1:{port}") as session:
+                return await session.get_project(1)
+
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            port = server.getsockname()[1]
+            with self.assertRaises(RinglingConnectionError):
+                asyncio.run(get())
+
+    def test_async_project_get(self):
+        """
+        Test creating and getting a project
+        :return: If the retrieved project name matches the one sent
+        """
+        test_project = Project("test_async1", {"val1": 1})
+
+        async def create_and_get():
+            async with AsyncRinglingDBSession(base_url) as session:
+                project_id = await session.create_project(test_project)
+                return project_id, await session.get_project(project_id)
+
+        project_id, returned_project = asyncio.run(create_and_get())
+        self.assertIsInstance(project_id, int)
+        self.assertEqual(test_project.project_name, returned_project.project_name)
+
+    def test_async_model_test_get_concurrent(self):
+        """
+        Test getting many model tests concurrently with a small concurrency limit
+        :return: If every retrieved model test matches the one sent
+        """
+        test_model_tests = [
+            ModelTest(1, 2, 3, datetime.now().isoformat(), {"precision": i / 10}, True)
+            for i in range(10)
+        ]
+
+        async def create_and_get():
+            async with AsyncRinglingDBSession(base_url, max_concurrency=3) as session:
+                test_ids = await asyncio.gather(*[session.create_model_test(test)
+                                                  for test in test_model_tests])
+                return await asyncio.gather(*[session.get_model_test(test_id)
+                                              for test_id in test_ids])
+
+        returned_tests = asyncio.run(create_and_get())
+        for sent, returned in zip(test_model_tests, returned_tests):
+            self.assertEqual(sent.test_metrics, returned.test_metrics)
+
+    def test_async_model_test_list(self):
+        """
+        Test listing model tests
+        :return: If the returned model tests contain the newly created one
+        """
+        test_model_test = ModelTest(1, 2, 3, datetime.now().isoformat(), {"recall": 0.5}, False)
+
+        async def create_and_list():
+            async with AsyncRinglingDBSession(base_url) as session:
+                test_id = await session.create_model_test(test_model_test)
+                return test_id, await session.list_model_tests()
+
+        test_id, model_tests = asyncio.run(create_and_list())
+        self.assertTrue(test_id in model_tests)
+
+    def test_async_model_test_iter(self):
+        """
+        Test walking through filtered model tests one small page at a time
+        :return: If the matching model tests are returned in ID order, ending
+        with the ones created here since earlier runs leave theirs behind
+        """
+        test_model_tests = [
+            ModelTest(1, 2, 4321, datetime.now().isoformat(), {"recall": i / 10}, True)
+            for i in range(5)
+        ]
+
+        async def create_and_iter():
+            async with AsyncRinglingDBSession(base_url) as session:
+                test_ids = [await session.create_model_test(test) for test in test_model_tests]
+                returned_ids = [test_id async for test_id, _
+                                in session.iter_model_tests(page_size=2, model_id=4321)]
+                return test_ids, returned_ids
+
+        test_ids, returned_ids = asyncio.run(create_and_iter())
+        self.assertEqual(returned_ids, sorted(set(returned_ids)))
+        self.assertEqual(test_ids, returned_ids[-len(test_ids):])
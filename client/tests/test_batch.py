@@ -0,0 +1,114 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import os
+import unittest
+from datetime import datetime
+
+from ringling_lib.async_ringling_db import AsyncRinglingDBSession
+from ringling_lib.batch import ModelTestBatch
+from ringling_lib.batch import TrainedModelBatch
+from ringling_lib.exceptions import RinglingValidationError
+from ringling_lib.model_test import ModelTest
+from ringling_lib.ringling_db import RinglingDBSession
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+NOW = datetime.now().isoformat()
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Test building, validating, and creating batches of records
+    """
+    def test_invalid_timestamp_record(self):
+        """
+        Test building a single model test with a timestamp that is not ISO 8601
+        :return: If a ValueError is raised
+        """
+        with self.assertRaises(ValueError):
+            ModelTest(1, 2, 3, "yesterday", {}, True)
+
+    def test_batch_records(self):
+        """
+        Test building a batch from columns and single values
+        :return: If the records match the to_dict of the same model tests
+        """
+        batch = ModelTestBatch(project_id=1, parameter_set_id=2, model_id=[3, 4],
+                               test_timestamp=[NOW, datetime(2023, 5, 1)],
+                               test_metrics=[{"recall": 0.5}, {"recall": 0.75}],
+                               passed_testing=(True, False))
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.to_records(), [
+            ModelTest(1, 2, 3, NOW, {"recall": 0.5}, True).to_dict(),
+            ModelTest(1, 2, 4, "2023-05-01T00:00:00", {"recall": 0.75}, False).to_dict()])
+
+    def test_batch_errors(self):
+        """
+        Test building a batch with several invalid values
+        :return: If one error lists every invalid value by row and field
+        """
+        record = {"project_id": 1, "parameter_set_id": 2, "training_data_from": NOW,
+                  "training_data_until": NOW, "model_object": "00", "train_timestamp": NOW,
+                  "deployment_stage": "testing", "backtest_timestamp": NOW,
+                  "backtest_metrics": {}, "passed_backtesting": True}
+        records = [record, dict(record, deployment_stage="staging"),
+                   dict(record, project_id="1", train_timestamp="2023-13-01")]
+
+        with self.assertRaises(RinglingValidationError) as context:
+            TrainedModelBatch.from_records(records)
+        self.assertEqual(context.exception.rows, 3)
+        self.assertEqual([error[:2] for error in context.exception.errors],
+                         [(1, "deployment_stage"), (2, "project_id"), (2, "train_timestamp")])
+        self.assertIn("3 invalid values in 2 of 3 records", str(context.exception))
+
+    def test_batch_lengths(self):
+        """
+        Test building a batch from columns of different lengths
+        :return: If a ValueError is raised
+        """
+        with self.assertRaises(ValueError):
+            ModelTestBatch(project_id=[1, 2, 3], parameter_set_id=2, model_id=[3, 4],
+                           test_timestamp=NOW, test_metrics={}, passed_testing=True)
+
+    def test_create_model_tests(self):
+        """
+        Test creating the model tests of a batch
+        :return: If each model test is created in record order
+        """
+        session = RinglingDBSession(base_url)
+        batch = ModelTestBatch(project_id=1, parameter_set_id=2, model_id=3, test_timestamp=NOW,
+                               test_metrics=[{"recall": i / 10} for i in range(5)],
+                               passed_testing=True)
+        test_ids = session.create_model_tests(batch)
+        self.assertEqual(len(test_ids), 5)
+        for i, test_id in enumerate(test_ids):
+            self.assertEqual(session.get_model_test(test_id).test_metrics, {"recall": i / 10})
+
+    def test_async_create_model_tests(self):
+        """
+        Test creating the model tests of a batch from the asyncio session
+        :return: If each model test is created in record order
+        """
+        batch = ModelTestBatch(project_id=1, parameter_set_id=2, model_id=3, test_timestamp=NOW,
+                               test_metrics=[{"recall": i / 10} for i in range(3)],
+                               passed_testing=False)
+
+        async def create_and_get():
+            async with AsyncRinglingDBSession(base_url) as session:
+                test_ids = await session.create_model_tests(batch)
+                return [await session.get_model_test(test_id) for test_id in test_ids]
+
+        model_tests = asyncio.run(create_and_get())
+        self.assertEqual([test.test_metrics["recall"] for test in model_tests], [0, 0.1, 0.2])
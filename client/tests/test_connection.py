@@ -14,6 +14,7 @@ limitations under the License.
 import os
 import unittest
 from requests.exceptions import ConnectTimeout
+from ringling_lib.exceptions import RinglingConnectionError
 from ringling_lib.ringling_db import RinglingDBSession
 
 BASE_URL_KEY = "RINGLING_BASE_URL"
@@ -37,3 +38,14 @@ class TestConnection(unittest.TestCase):
         """
         test_session = RinglingDBSession("http://localhost:80")
         self.assertFalse(test_session.perform_connect_check())
+
+    def test_session_bad_url_raises(self):
+        """
+        Test if requests through a bad url raise instead of exiting
+        :return: If the bad url raised a connection error
+        """
+        test_session = RinglingDBSession("http://localhost:80")
+        with self.assertRaises(RinglingConnectionError):
+            test_session.get_project(1)
+        with self.assertRaises(RinglingConnectionError):
+            test_session.list_projects()
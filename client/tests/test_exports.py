@@ -0,0 +1,102 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from ringling_lib.arrow_export import pyarrow
+from ringling_lib.model_test import ModelTest
+from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+NOW = datetime.now().isoformat()
+
+
+class TestExports(unittest.TestCase):
+    """
+    Test exporting model tests and trained models
+    """
+    def test_invalid_format(self):
+        """
+        Test exporting in a format the service does not offer
+        :return: If the session raises a ValueError
+        """
+        with self.assertRaises(ValueError):
+            RinglingDBSession(base_url).export_model_tests(file_format="csv")
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_pyarrow_missing(self):
+        """
+        Test reading an export into a table without the pyarrow package
+        :return: If the session raises an ImportError
+        """
+        with self.assertRaises(ImportError):
+            RinglingDBSession(base_url).export_model_tests()
+
+    def create_model_and_tests(self, session):
+        """
+        Create a trained model and two tests of it
+        :param session: the session
+        :return: the trained model id
+        """
+        model_id = session.create_trained_model(TrainedModel(
+            1, 5, "2010-01-01T00:00:00", NOW, "00", NOW, "testing", NOW,
+            {"export_precision": 0.95}, True, {}))
+        session.create_model_test(ModelTest(1, 5, model_id, "2020-01-01T00:00:00",
+                                            {"recall": 0.5, "rows": 10}, True, {}))
+        session.create_model_test(ModelTest(1, 5, model_id, "2021-01-01T00:00:00",
+                                            {"recall": 0.75, "rows": 20}, False, {}))
+        return model_id
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_export_model_tests(self):
+        """
+        Test exporting model tests into a table
+        :return: If the metrics are typed columns and the filters select the tests
+        """
+        session = RinglingDBSession(base_url)
+        model_id = self.create_model_and_tests(session)
+
+        table = session.export_model_tests(model_id=model_id)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.schema.field("test_metrics.recall").type, pyarrow.float64())
+        self.assertEqual(table.schema.field("test_metrics.rows").type, pyarrow.int64())
+        self.assertEqual(table.column("test_metrics.rows").to_pylist(), [10, 20])
+        self.assertEqual(table.column("deployment_stage").to_pylist(), ["testing", "testing"])
+
+        table = session.export_model_tests(model_id=model_id,
+                                           test_timestamp_from="2020-06-01T00:00:00")
+        self.assertEqual(table.column("test_metrics.recall").to_pylist(), [0.75])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_export_parquet_file(self):
+        """
+        Test exporting trained models to a Parquet file
+        :return: If the file holds the trained model and its backtest metrics
+        """
+        session = RinglingDBSession(base_url)
+        model_id = self.create_model_and_tests(session)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trained_models.parquet")
+            self.assertEqual(session.export_trained_models(path, "parquet", project_id=1), path)
+            table = pyarrow.parquet.read_table(path)
+
+        model_ids = table.column("model_id").to_pylist()
+        self.assertIn(model_id, model_ids)
+        precision = table.column("backtest_metrics.export_precision").to_pylist()
+        self.assertEqual(precision[model_ids.index(model_id)], 0.95)
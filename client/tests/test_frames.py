@@ -0,0 +1,102 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import unittest
+
+from ringling_lib.frames import model_test_columns
+from ringling_lib.frames import numpy
+from ringling_lib.frames import pandas
+from ringling_lib.model_test import ModelTest
+from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+TIMESTAMP = "2023-05-01T12:30:15.123456"
+
+
+def model_test_json(test_id, test_metrics):
+    """
+    Build the json of a model test as listed by Ringling
+    :param test_id: the model test id
+    :param test_metrics: the test metrics
+    :return: the dictionary
+    """
+    return {"test_id": test_id, "project_id": 1, "parameter_set_id": 2, "model_id": 3,
+            "test_timestamp": TIMESTAMP, "test_metrics": test_metrics,
+            "passed_testing": True, "metadata": {}}
+
+
+class TestFrames(unittest.TestCase):
+    """
+    Test building columns and DataFrames of model tests and trained models
+    """
+    def test_columns_across_pages(self):
+        """
+        Test flattening metric keys that only some pages have
+        :return: If the rows without a key have null values for it
+        """
+        builder = model_test_columns()
+        builder.add_page([model_test_json(1, {"recall": 0.5})])
+        builder.add_page([model_test_json(2, {"rows": 10}), model_test_json(3, {})])
+        self.assertEqual(builder.values["test_id"], [1, 2, 3])
+        self.assertEqual(builder.metrics, {"recall": [0.5, None, None],
+                                           "rows": [None, 10, None]})
+
+    @unittest.skipIf(numpy is not None, "numpy is installed")
+    def test_numpy_missing(self):
+        """
+        Test building columns without the numpy package
+        :return: If an ImportError is raised
+        """
+        with self.assertRaises(ImportError):
+            model_test_columns().to_columns()
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_column_types(self):
+        """
+        Test the types of the columns
+        :return: If timestamps are parsed and metrics are typed from their values
+        """
+        builder = model_test_columns()
+        builder.add_page([model_test_json(1, {"recall": 0.5, "rows": 10, "note": [1]}),
+                          model_test_json(2, {"recall": 1, "rows": 20})])
+        columns = builder.to_columns()
+        self.assertEqual(columns["test_timestamp"].dtype, numpy.dtype("datetime64[us]"))
+        self.assertEqual(columns["test_timestamp"][0], numpy.datetime64(TIMESTAMP))
+        self.assertEqual(columns["passed_testing"].dtype, numpy.dtype(bool))
+        self.assertEqual(columns["test_metrics.rows"].dtype, numpy.dtype(numpy.int64))
+        self.assertEqual(columns["test_metrics.recall"].tolist(), [0.5, 1.0])
+        self.assertEqual(columns["test_metrics.note"].tolist(), [[1], None])
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_model_tests_dataframe(self):
+        """
+        Test getting the model tests of a trained model as a DataFrame
+        :return: If each test is a row with its metrics as columns
+        """
+        session = RinglingDBSession(base_url)
+        model_id = session.create_trained_model(TrainedModel(
+            1, 5, TIMESTAMP, TIMESTAMP, "00", TIMESTAMP, "testing", TIMESTAMP,
+            {"frame_auc": 0.5}, True, {}))
+        session.create_model_test(ModelTest(1, 5, model_id, TIMESTAMP, {"recall": 0.5}, True))
+        session.create_model_test(ModelTest(1, 5, model_id, TIMESTAMP, {"recall": 0.75}, False))
+
+        frame = session.model_tests_dataframe(page_size=1, model_id=model_id)
+        self.assertEqual(frame["test_metrics.recall"].tolist(), [0.5, 0.75])
+        self.assertEqual(frame["passed_testing"].tolist(), [True, False])
+
+        frame = session.trained_models_dataframe(project_id=1)
+        self.assertIn("backtest_metrics.frame_auc", frame.columns)
+        self.assertNotIn("model_object", frame.columns)
@@ -0,0 +1,204 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from ringling_lib.artifact_cache import MappedModelCache
+from ringling_lib.exceptions import RinglingIntegrityError
+from ringling_lib.model_cache import ModelCache
+from ringling_lib.serialization import deserialize_model
+from ringling_lib.serialization import serialize_model
+from ringling_lib.trained_model import TrainedModel
+from ringling_lib.ringling_db import RinglingDBSession
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+
+class TestModelCache(unittest.TestCase):
+    """
+    Test keeping deserialized models in memory
+    """
+    def test_load_model(self):
+        """
+        Load a trained model twice
+        :return: If the model is unpickled once and the same object is returned
+        """
+        session = RinglingDBSession(base_url, model_cache=ModelCache())
+        model = {"weights": [0.5, 0.25], "bias": 1.0}
+        test_trained_model = TrainedModel(
+            1, 8, "1998-01-01T00:00:00.000000", "2005-12-31T23:59:59.999999",
+            pickle.dumps(model).hex(), datetime.now().isoformat(), "testing",
+            datetime.now().isoformat(), {"precision": 0.85, "recall": 0.75},
+            True, {"Additional data":"Loaded"}
+        )
+        trained_model_id = session.create_trained_model(test_trained_model)
+
+        loaded = session.load_model(trained_model_id)
+        self.assertEqual(loaded, model)
+        self.assertIs(session.load_model(trained_model_id), loaded)
+        self.assertIn((base_url, trained_model_id), session.model_cache)
+
+    def test_concurrent_loads(self):
+        """
+        Ask for one key from several threads at once
+        :return: If the object is loaded only once
+        """
+        cache = ModelCache()
+        calls = []
+        lock = threading.Lock()
+
+        def load():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return object(), 10
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: cache.get_or_load("model", load), range(8)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_eviction(self):
+        """
+        Load more objects than fit in the memory budget
+        :return: If the least recently used objects are evicted
+        """
+        cache = ModelCache(max_bytes=250)
+        cache.get_or_load(0, lambda: ("zero", 100))
+        cache.get_or_load(1, lambda: ("one", 100))
+        cache.get_or_load(0, lambda: ("reloaded", 100))
+        cache.get_or_load(2, lambda: ("two", 100))
+        cache.get_or_load(3, lambda: ("too big", 300))
+
+        self.assertIn(0, cache)
+        self.assertNotIn(1, cache)
+        self.assertIn(2, cache)
+        self.assertNotIn(3, cache)
+        self.assertEqual(cache.total_bytes, 200)
+
+    def test_load_out_of_band_model(self):
+        """
+        Load a trained model serialized with out-of-band buffers
+        :return: If the buffers are views of one contiguous block
+        """
+        session = RinglingDBSession(base_url, model_cache=ModelCache())
+        weights = bytearray(range(256)) * 64
+        model = {"weights": pickle.PickleBuffer(weights), "bias": 1.0}
+        test_trained_model = TrainedModel(
+            1, 8, "1998-01-01T00:00:00.000000", "2005-12-31T23:59:59.999999",
+            serialize_model(model), datetime.now().isoformat(), "testing",
+            datetime.now().isoformat(), {"precision": 0.85, "recall": 0.75},
+            True, {"Additional data":"Out-of-band"}
+        )
+        trained_model_id = session.create_trained_model(test_trained_model)
+
+        loaded = session.load_model(trained_model_id)
+        self.assertEqual(loaded["bias"], 1.0)
+        self.assertEqual(loaded["weights"].tobytes(), bytes(weights))
+        self.assertIsInstance(loaded["weights"].obj, bytearray)
+        self.assertEqual(deserialize_model(pickle.dumps(model["bias"]).hex()), 1.0)
+
+    def test_load_mapped_model(self):
+        """
+        Load trained models memory-mapped from a shared directory
+        :return: If the buffers are read-only views of one file per model
+        """
+        weights = bytearray(range(256)) * 64
+        model_objects = [(serialize_model({"weights": pickle.PickleBuffer(weights)}), True),
+                         (pickle.dumps({"weights": weights}).hex(), False)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            for model_object, is_mapped in model_objects:
+                session = RinglingDBSession(base_url, model_cache=ModelCache(),
+                                            mmap_directory=directory)
+                test_trained_model = TrainedModel(
+                    1, 8, "1998-01-01T00:00:00.000000", "2005-12-31T23:59:59.999999",
+                    model_object, datetime.now().isoformat(), "testing",
+                    datetime.now().isoformat(), {"precision": 0.85, "recall": 0.75},
+                    True, {"Additional data":"Memory-mapped"}
+                )
+                trained_model_id = session.create_trained_model(test_trained_model)
+
+                loaded = session.load_model(trained_model_id, mmap_mode="r")
+                other = RinglingDBSession(base_url, model_cache=ModelCache(),
+                                          mmap_directory=directory)
+                other_loaded = other.load_model(trained_model_id, mmap_mode="r")
+
+                for weights_view in [loaded["weights"], other_loaded["weights"]]:
+                    self.assertEqual(bytes(weights_view), bytes(weights))
+                    if is_mapped:
+                        self.assertIsInstance(weights_view.obj, mmap.mmap)
+                        self.assertTrue(weights_view.readonly)
+
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+            with self.assertRaises(ValueError):
+                session.load_model(trained_model_id, mmap_mode="r+")
+
+    def test_mapped_model_checked(self):
+        """
+        Load a memory-mapped model whose file was replaced, then one whose
+        model object does not match its digest
+        :return: If the file is written again from the model object, and an
+        integrity error is raised for the model object that does not match
+        """
+        model_object = serialize_model({"weights": pickle.PickleBuffer(bytearray(64))})
+        digest = hashlib.sha256(model_object.encode("utf-8")).hexdigest()
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = MappedModelCache(directory)
+            with open(os.path.join(directory, f"1-{digest}.pkl"), "wb") as file:
+                file.write(pickle.dumps("planted"))
+            loaded, _ = cache.load(1, digest, lambda: model_object)
+            self.assertEqual(bytes(loaded["weights"]), bytes(64))
+
+            with self.assertRaises(RinglingIntegrityError):
+                cache.load(2, "0" * 64, lambda: model_object)
+            self.assertEqual(os.listdir(directory), [f"1-{digest}.pkl"])
+
+    @unittest.skipIf(not hasattr(os, "getuid"), "no file ownership")
+    def test_mapped_model_shared_directory(self):
+        """
+        Load a memory-mapped model from a directory other users can write to
+        :return: If a PermissionError is raised
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            os.chmod(directory, 0o777)
+            with self.assertRaises(PermissionError):
+                MappedModelCache(directory).load(1, "0" * 64, lambda: "00")
+
+    def test_mapped_model_eviction(self):
+        """
+        Load more memory-mapped models than fit in the directory
+        :return: If the least recently loaded files are removed
+        """
+        model_objects = [serialize_model([i] * 100) for i in range(3)]
+        digests = [hashlib.sha256(model_object.encode("utf-8")).hexdigest()
+                   for model_object in model_objects]
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = MappedModelCache(directory, max_bytes=len(model_objects[0]) // 2)
+            for i, (model_object, digest) in enumerate(zip(model_objects, digests)):
+                loaded, _ = cache.load(i, digest, lambda model_object=model_object: model_object)
+                self.assertEqual(loaded, [i] * 100)
+            self.assertEqual(os.listdir(directory), [f"2-{digests[2]}.pkl"])
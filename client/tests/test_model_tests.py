@@ -16,7 +16,10 @@ import unittest
 from datetime import datetime
 
 from ringling_lib.model_test import ModelTest
+from ringling_lib.param_set import ParameterSet
+from ringling_lib.project import Project
 from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
 
 BASE_URL_KEY = "RINGLING_BASE_URL"
 base_url = os.environ.get(BASE_URL_KEY)
@@ -105,3 +108,73 @@ class TestModelTests(unittest.TestCase):
         self.assertTrue(model_test_id in model_tests)
         self.assertTrue(model_test_id_2 in model_tests)
         self.assertTrue(model_test_id_3 in model_tests)
+
+    def test_model_test_get_many(self):
+        """
+        Test getting several model tests by ID in more than one chunk
+        :return: If the returned model tests match the ones sent, and missing IDs are reported
+        """
+        session = RinglingDBSession(base_url, chunk_size=2)
+        test_model_tests = [
+            ModelTest(5, 5, 7, datetime.now().isoformat(), {"AUROC": i / 10}, True)
+            for i in range(5)
+        ]
+        model_test_ids = [session.create_model_test(test) for test in test_model_tests]
+
+        model_tests, missing_ids = session.get_model_tests_many(model_test_ids + [0])
+
+        self.assertEqual(missing_ids, [0])
+        for model_test_id, test_model_test in zip(model_test_ids, test_model_tests):
+            self.assertEqual(test_model_test.test_metrics,
+                             model_tests[model_test_id].test_metrics)
+
+    def test_model_test_iter(self):
+        """
+        Test walking through filtered model tests one small page at a time
+        :return: If the matching model tests are returned in ID order, ending
+        with the ones created here since earlier runs leave theirs behind
+        """
+        session = RinglingDBSession(base_url)
+        test_model_tests = [
+            ModelTest(5, 5, 1234, datetime.now().isoformat(), {"AUROC": i / 10}, i % 2 == 0)
+            for i in range(5)
+        ]
+        model_test_ids = [session.create_model_test(test) for test in test_model_tests]
+        passed_ids = [model_test_id for model_test_id, test
+                      in zip(model_test_ids, test_model_tests) if test.passed_testing]
+
+        returned = list(session.iter_model_tests(page_size=2, model_id=1234, passed_testing=True))
+
+        returned_ids = [model_test_id for model_test_id, _ in returned]
+        self.assertEqual(returned_ids, sorted(set(returned_ids)))
+        self.assertEqual(returned_ids[-len(passed_ids):], passed_ids)
+        for _, model_test in returned:
+            self.assertTrue(model_test.passed_testing)
+
+    def test_model_test_lineage(self):
+        """
+        Test walking between a parameter set, its trained model, and the model's tests
+        :return: If each lineage links the same objects, and the filters apply
+        """
+        session = RinglingDBSession(base_url)
+        now = datetime.now().isoformat()
+        project_id = session.create_project(Project(f"lineage{datetime.now()}", {}))
+        param_set_id = session.create_param_set(ParameterSet(project_id, {}, True))
+        model_id = session.create_trained_model(TrainedModel(
+            project_id, param_set_id, now, now, "abcdef", now, "testing", now, {}, True))
+        model_test_ids = [session.create_model_test(ModelTest(
+            project_id, param_set_id, model_id, now, {}, passed_testing))
+            for passed_testing in [True, False]]
+
+        lineage = session.get_model_test_lineage_json(model_test_ids[1])
+        self.assertEqual(lineage["trained_model"]["model_id"], model_id)
+        self.assertEqual(lineage["parameter_set"]["parameter_set_id"], param_set_id)
+
+        lineage = session.get_trained_model_lineage_json(model_id, passed_testing=False)
+        self.assertEqual([test["test_id"] for test in lineage["model_tests"]],
+                         model_test_ids[1:])
+
+        lineage = session.get_param_set_lineage_json(param_set_id, flat=True)
+        self.assertEqual([test["test_id"] for test in lineage["model_tests"]], model_test_ids)
+        lineage = session.get_param_set_lineage_json(param_set_id, deployment_stage="production")
+        self.assertEqual(lineage["trained_models"], [])
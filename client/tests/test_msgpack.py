@@ -0,0 +1,83 @@
+"""
+Copyright 2023 MSOE DISE Project
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+    http://www.apache.org/licenses/LICENSE-2.0
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import os
+import pickle
+import unittest
+from datetime import datetime
+
+from ringling_lib.async_ringling_db import AsyncRinglingDBSession
+from ringling_lib.model_test import ModelTest
+from ringling_lib.msgpack_encoding import msgpack
+from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
+
+BASE_URL_KEY = "RINGLING_BASE_URL"
+base_url = os.environ.get(BASE_URL_KEY)
+NOW = datetime.now().isoformat()
+
+
+class TestMessagePack(unittest.TestCase):
+    """
+    Test interacting with Ringling with MessagePack bodies
+    """
+    @unittest.skipIf(msgpack is not None, "msgpack is installed")
+    def test_msgpack_missing(self):
+        """
+        Test opting in to MessagePack without the msgpack package
+        :return: If the session raises an ImportError
+        """
+        with self.assertRaises(ImportError):
+            RinglingDBSession(base_url, use_msgpack=True)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_matches_json(self):
+        """
+        Test creating and getting objects with MessagePack
+        :return: If the objects equal those returned as JSON and the model loads
+        """
+        session = RinglingDBSession(base_url, use_msgpack=True)
+        json_session = RinglingDBSession(base_url)
+        test_trained_model = TrainedModel(
+            1, 5, "2010-01-01T00:00:00", NOW, pickle.dumps({"weights": [1, 2]}).hex(), NOW,
+            "testing", NOW, {"precision": 0.95}, True, {"data": "data2"}
+        )
+        model_id = session.create_trained_model(test_trained_model)
+        test_id = session.create_model_test(ModelTest(1, 5, model_id, NOW, {"recall": 0.5},
+                                                      True, {}))
+
+        self.assertEqual(session.get_trained_model_json(model_id),
+                         json_session.get_trained_model_json(model_id))
+        self.assertEqual(session.get_trained_model(model_id).train_timestamp, NOW)
+        self.assertEqual(session.get_model_test_json(test_id),
+                         json_session.get_model_test_json(test_id))
+        self.assertEqual(session.get_trained_model_lineage_json(model_id),
+                         json_session.get_trained_model_lineage_json(model_id))
+        self.assertEqual(session.load_model(model_id), {"weights": [1, 2]})
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_async_msgpack(self):
+        """
+        Test creating and getting a model test with MessagePack from the asyncio session
+        :return: If the retrieved model test matches the one sent
+        """
+        async def create_and_get():
+            async with AsyncRinglingDBSession(base_url, use_msgpack=True) as session:
+                test_id = await session.create_model_test(
+                    ModelTest(1, 5, 5, NOW, {"recall": 0.5}, False, {}))
+                return await session.get_model_test(test_id)
+
+        model_test = asyncio.run(create_and_get())
+        self.assertEqual(model_test.test_timestamp, NOW)
+        self.assertEqual(model_test.test_metrics, {"recall": 0.5})
@@ -99,3 +99,17 @@ class TestParameterSets(unittest.TestCase):
         self.assertTrue(param_set_id in param_sets)
         self.assertTrue(param_set_id_2 in param_sets)
         self.assertTrue(param_set_id_3 in param_sets)
+
+    def test_param_modify_many(self):
+        """
+        Test setting the activity status of many parameter sets at once
+        :return: If only the parameter sets whose status changes are reported
+        """
+        session = RinglingDBSession(base_url)
+        param_set_ids = [session.create_param_set(ParameterSet(6, {}, is_active, {}))
+                         for is_active in [True, False, True]]
+
+        result = session.modify_param_sets(False, ids=param_set_ids)
+        self.assertEqual(result, {"dry_run": False, "count": 2,
+                                  "ids": [param_set_ids[0], param_set_ids[2]]})
+        self.assertFalse(session.get_param_set(param_set_ids[0]).is_active)
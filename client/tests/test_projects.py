@@ -13,9 +13,12 @@ limitations under the License.
 
 import os
 import unittest
+from datetime import datetime
 
+from ringling_lib.exceptions import RinglingNotFoundError
 from ringling_lib.project import Project
 from ringling_lib.ringling_db import RinglingDBSession
+from ringling_lib.trained_model import TrainedModel
 
 BASE_URL_KEY = "RINGLING_BASE_URL"
 base_url = os.environ.get(BASE_URL_KEY)
@@ -86,3 +89,26 @@ class TestProjects(unittest.TestCase):
         self.assertTrue(project_id in projects)
         self.assertTrue(project_id_2 in projects)
         self.assertTrue(project_id_3 in projects)
+
+    def test_project_overview(self):
+        """
+        Test getting a project with its children in one request
+        :return: If the overview holds the newest trained models of the project,
+        and a missing project raises a not found error
+        """
+        session = RinglingDBSession(base_url)
+        now = datetime.now().isoformat()
+        project_id = session.create_project(Project(f"overview{datetime.now()}", {}))
+        model_ids = [session.create_trained_model(TrainedModel(
+            project_id, 1, now, now, "abcdef", now, "testing", now, {}, True))
+            for _ in range(3)]
+
+        overview = session.get_project_overview_json(project_id, limit=2)
+        self.assertEqual(overview["project"]["project_id"], project_id)
+        self.assertEqual([model["trained_model"]["model_id"]
+                          for model in overview["trained_models"]], model_ids[1:])
+        self.assertIsNone(overview["trained_models"][0]["latest_test"])
+        self.assertEqual(list(session.get_project_overview_json(project_id, depth=0)),
+                         ["project"])
+        with self.assertRaises(RinglingNotFoundError):
+            session.get_project_overview_json(0)
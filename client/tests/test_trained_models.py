@@ -12,14 +12,19 @@ limitations under the License.
 """
 
 import os
+import tempfile
 import unittest
 from datetime import datetime
 
+from ringling_lib.exceptions import RinglingNotFoundError
+from ringling_lib.exceptions import RinglingResponseError
+from ringling_lib.project import Project
 from ringling_lib.trained_model import TrainedModel
 from ringling_lib.ringling_db import RinglingDBSession
 
 BASE_URL_KEY = "RINGLING_BASE_URL"
 base_url = os.environ.get(BASE_URL_KEY)
+NOW = datetime.now().isoformat()
 
 class TestTrainedModels(unittest.TestCase):
     """
@@ -74,6 +79,21 @@ class TestTrainedModels(unittest.TestCase):
         trained_model_id = session.create_trained_model(test_trained_model)
         self.assertIsInstance(trained_model_id, int)
 
+    def test_trained_model_to_dict(self):
+        """
+        Convert a trained model to the dictionary sent to the service
+        :return: If the dictionary holds the fields and the model has no __dict__
+        """
+        test_trained_model = TrainedModel(
+            1, 5, NOW, NOW, "0x00a5234f61634236", NOW, "testing", NOW,
+            {"precision": 0.85}, True, {}
+        )
+        obj = test_trained_model.to_dict()
+        self.assertEqual(obj["parameter_set_id"], 5)
+        self.assertEqual(obj["backtest_metrics"], {"precision": 0.85})
+        self.assertEqual(set(obj), set(TrainedModel.__slots__))
+        self.assertFalse(hasattr(test_trained_model, "__dict__"))
+
     def test_trained_model_get(self):
         """
         Get a trained model given an ID
@@ -125,3 +145,122 @@ class TestTrainedModels(unittest.TestCase):
         self.assertTrue(trained_model_id in trained_models)
         self.assertTrue(trained_model_id_2 in trained_models)
         self.assertTrue(trained_model_id_3 in trained_models)
+
+    def test_trained_model_get_many(self):
+        """
+        Test getting several trained models by ID
+        :return: If the returned trained models match the ones sent, and missing IDs are reported
+        """
+        session = RinglingDBSession(base_url)
+        test_trained_model = TrainedModel(
+            1,5, "2010-01-01T00:00:00.000000", "2015-12-31T23:59:59.999999",
+            "0x00a5234f6733135", datetime.now().isoformat(), "testing",
+            datetime.now().isoformat(), {"precision": 0.95, "recall": 0.75},
+            True, {"data":"data2"}
+        )
+        trained_model_id = session.create_trained_model(test_trained_model)
+        trained_model_id_2 = session.create_trained_model(test_trained_model)
+
+        trained_models, missing_ids = session.get_trained_models_many(
+            [trained_model_id, trained_model_id_2, 0])
+
+        self.assertEqual(missing_ids, [0])
+        self.assertTrue(trained_model_id in trained_models)
+        self.assertTrue(trained_model_id_2 in trained_models)
+        self.assertEqual(test_trained_model.model_object,
+                         trained_models[trained_model_id].model_object)
+
+    def test_trained_model_get_bad_id(self):
+        """
+        Test getting a trained model that does not exist
+        :return: If a not found error carrying the ID was raised
+        """
+        session = RinglingDBSession(base_url)
+        with self.assertRaises(RinglingNotFoundError) as context:
+            session.get_trained_model(0)
+        self.assertEqual(context.exception.object_id, 0)
+
+    def test_trained_model_deployed(self):
+        """
+        Test getting the current production and testing models of a project
+        :return: If the newest production model is returned, and a project without
+        a testing model raises a not found error
+        """
+        session = RinglingDBSession(base_url)
+        project_id = session.create_project(Project(f"deployed{datetime.now()}", {}))
+        model_ids = [session.create_trained_model(TrainedModel(
+            project_id, 1, NOW, NOW, "abcdef", NOW, "production", NOW, {}, True))
+            for _ in range(2)]
+
+        production_model = session.get_production_model_json(project_id)
+        self.assertEqual(production_model["model_id"], model_ids[-1])
+        self.assertIsNone(production_model["model_object"])
+        with self.assertRaises(RinglingNotFoundError):
+            session.get_testing_model_json(project_id)
+
+    def test_trained_model_promote(self):
+        """
+        Test promoting a trained model
+        :return: If the promoted model becomes the production model of its project
+        and the previous production model is retired
+        """
+        session = RinglingDBSession(base_url)
+        project_id = session.create_project(Project(f"promote{datetime.now()}", {}))
+        old_id, new_id = [session.create_trained_model(TrainedModel(
+            project_id, 1, NOW, NOW, "abcdef", NOW, stage, NOW, {}, True))
+            for stage in ["production", "testing"]]
+
+        promotion = session.promote_trained_model(new_id)
+        self.assertEqual(promotion["retired"],
+                         [{"model_id": old_id, "deployment_stage": "retired"}])
+        self.assertEqual(session.get_production_model_json(project_id)["model_id"], new_id)
+        with self.assertRaises(RinglingNotFoundError):
+            session.promote_trained_model(0)
+
+    def test_trained_model_modify_many(self):
+        """
+        Test setting the deployment stage of many trained models at once
+        :return: If a dry run and the update report the same models, and a bad stage
+        raises an error
+        """
+        session = RinglingDBSession(base_url)
+        project_id = session.create_project(Project(f"modify{datetime.now()}", {}))
+        model_ids = [session.create_trained_model(TrainedModel(
+            project_id, 1, NOW, NOW, "abcdef", NOW, "testing", NOW, {}, True))
+            for _ in range(3)]
+
+        dry_run = session.modify_trained_models("retired", dry_run=True, project_id=project_id)
+        self.assertEqual(dry_run, {"dry_run": True, "count": 3, "ids": model_ids})
+        result = session.modify_trained_models("retired", ids=model_ids[1:])
+        self.assertEqual(result, {"dry_run": False, "count": 2, "ids": model_ids[1:]})
+        with self.assertRaises(RinglingResponseError):
+            session.modify_trained_models("archived", ids=model_ids)
+
+    def test_trained_model_upload(self):
+        """
+        Test creating trained models by streaming their model objects
+        :return: If model objects uploaded from a file and an iterator are stored hex encoded
+        """
+        session = RinglingDBSession(base_url)
+        test_trained_model = TrainedModel(
+            1,5, "2010-01-01T00:00:00.000000", "2015-12-31T23:59:59.999999",
+            "", datetime.now().isoformat(), "testing",
+            datetime.now().isoformat(), {"precision": 0.95, "recall": 0.75},
+            True, {"data":"uploaded"}
+        )
+        model_bytes = bytes(range(256)) * 4096
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.pkl")
+            with open(path, "wb") as file:
+                file.write(model_bytes)
+            trained_model_id = session.upload_trained_model(test_trained_model, path,
+                                                            chunk_size=1000)
+        self.assertEqual(session.get_model_object(trained_model_id), model_bytes.hex())
+
+        chunks = (model_bytes[i:i + 5000] for i in range(0, len(model_bytes), 5000))
+        trained_model_id = session.upload_trained_model(test_trained_model, chunks,
+                                                        compress=False)
+        trained_model = session.get_trained_model(trained_model_id)
+        self.assertEqual(trained_model.model_object, model_bytes.hex())
+        self.assertEqual(trained_model.metadata, {"data":"uploaded"})
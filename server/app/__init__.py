@@ -3,7 +3,12 @@
 """
 The Application Module
 Contains the following submodules:
+aliases
+changes
+exports
 healthcheck
+lineage
+metrics
 model_tests
 parameter_sets
 projects
@@ -15,6 +20,7 @@ import os
 import sys
 
 from flask import Flask
+from flask import current_app
 from flask import request
 from flask.json import jsonify
 
@@ -22,7 +28,14 @@ import psycopg2
 from psycopg2.extras import Json
 
 import app.database as db
+from app.aliases import blueprint as aliases_blueprint
+from app.artifact_cache import configure_artifact_cache
+from app.changes import blueprint as changes_blueprint
+from app.exports import blueprint as exports_blueprint
 from app.healthcheck import blueprint as healthcheck_blueprint
+from app.json_sql import configure_database_json
+from app.lineage import blueprint as lineage_blueprint
+from app.metrics import blueprint as metrics_blueprint
 from app.model_tests import blueprint as model_tests_blueprint
 from app.parameter_sets import blueprint as parameter_sets_blueprint
 from app.projects import blueprint as projects_blueprint
@@ -30,6 +43,20 @@ from app.schemas import CustomJSONProvider
 from app.trained_models import blueprint as trained_models_blueprint
 
 
+MAX_CONTENT_LENGTH_KEY = "RINGLING_MAX_CONTENT_LENGTH"
+DEFAULT_MAX_CONTENT_LENGTH = 2 * 1024 ** 3
+
+def request_too_large(err):
+    """
+    Reject a request body larger than MAX_CONTENT_LENGTH.  Bodies with a
+    Content-Length over the limit are rejected before any of them is read,
+    and gzip compressed model objects once more than the limit is decompressed.
+    :param err: The RequestEntityTooLarge error
+    :return: The error as a JSON object, status code
+    """
+    return jsonify({"error": f"Request body is larger than "
+                             f"{current_app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+
 def create_app():
     """
     This is effectively the main method
@@ -37,10 +64,20 @@ def create_app():
     """
     app = Flask(__name__)
     app.json = CustomJSONProvider(app)
+    app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get(MAX_CONTENT_LENGTH_KEY,
+                                                          DEFAULT_MAX_CONTENT_LENGTH))
+    app.register_error_handler(413, request_too_large)
+    configure_artifact_cache(app)
+    configure_database_json(app)
 
     db.check_environment_parameters()
 
+    app.register_blueprint(aliases_blueprint)
+    app.register_blueprint(changes_blueprint)
+    app.register_blueprint(exports_blueprint)
     app.register_blueprint(healthcheck_blueprint)
+    app.register_blueprint(lineage_blueprint)
+    app.register_blueprint(metrics_blueprint)
     app.register_blueprint(model_tests_blueprint)
     app.register_blueprint(parameter_sets_blueprint)
     app.register_blueprint(projects_blueprint)
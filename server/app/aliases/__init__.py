@@ -0,0 +1,169 @@
+"""
+The aliases module
+Used to set and read named pointers from a project to its trained models
+"""
+import re
+
+from flask import Blueprint
+
+from flask import make_response
+from flask import request
+from flask.json import jsonify
+
+import psycopg2
+
+from app.changes import record_change
+from app.coalescing import coalesce_response
+from app.coalescing import SingleFlight
+from app.database import get_database_uri
+from app.msgpack_encoding import request_body
+from app.schemas import ModelAlias
+from app.schemas import ModelAliasSchema
+from app.schemas import ValidationError
+
+blueprint = Blueprint("aliases", __name__)
+
+alias_flight = SingleFlight("alias")
+
+ALIAS_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+ALIAS_CHANGE_TYPE = "alias"
+
+def alias_response(alias):
+    """
+    Build the response for an alias, with the ID of the change that set it as
+    the ETag.  A request whose If-None-Match holds that ETag gets a 304.
+    :param alias: The ModelAlias
+    :return: The response
+    """
+    etag = str(alias.change_id)
+    if request.method == "GET" and request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = jsonify(alias)
+    response.set_etag(etag)
+    return response
+
+def parse_etags(etags):
+    """
+    Parse the change IDs of an If-Match header
+    :param etags: The ETags of the header
+    :return: The list of change IDs, leaving out ETags that are not change IDs
+    """
+    return [int(etag) for etag in etags.as_set() if etag.isdigit()]
+
+@blueprint.route('/v1/projects/<int:project_id>/aliases', methods=["GET"])
+def list_aliases(project_id):
+    """
+    Retrieve all aliases of a project.  The ETag is a hash of the response, so
+    a request whose If-None-Match holds it gets a 304.
+    :param project_id: The project ID
+    :return: The aliases as a JSON object
+    """
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT alias, model_id, change_id, updated_at FROM model_aliases "
+                        "WHERE project_id = %s ORDER BY alias",
+                        (project_id,))
+            aliases = [
+                ModelAlias(model_id, project_id, alias, change_id, updated_at)
+                for alias, model_id, change_id, updated_at in cur
+            ]
+
+    conn.close()
+
+    response = jsonify({"aliases" : aliases})
+    response.add_etag()
+    return response.make_conditional(request)
+
+@blueprint.route('/v1/projects/<int:project_id>/aliases/<alias>', methods=["GET"])
+@coalesce_response(alias_flight)
+def get_alias(project_id, alias):
+    """
+    Retrieve an alias of a project.  Identical concurrent requests share one query.
+    :param project_id: The project ID
+    :param alias: The name of the alias
+    :return: The alias as a JSON object
+    """
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT model_id, change_id, updated_at FROM model_aliases "
+                        "WHERE project_id = %s AND alias = %s",
+                        (project_id, alias))
+            result = cur.fetchone()
+
+    conn.close()
+
+    if result is None:
+        return jsonify({"error": f"Alias {alias} of project ID {project_id} not found"}), 404
+
+    model_id, change_id, updated_at = result
+    return alias_response(ModelAlias(model_id, project_id, alias, change_id, updated_at))
+
+@blueprint.route('/v1/projects/<int:project_id>/aliases/<alias>', methods=["PUT"])
+def set_alias(project_id, alias):
+    """
+    Point an alias of a project at a trained model of the project, creating
+    the alias if needed.  The alias is one row, so a swap is one update, and
+    the change is added to the change feed in the same transaction.  With an
+    If-Match header the alias is only changed if its ETag matches.
+    :param project_id: The project ID
+    :param alias: The name of the alias
+    :return: The alias as a JSON object
+    """
+    if not ALIAS_PATTERN.fullmatch(alias):
+        return jsonify({"error": "Aliases must be 1 to 64 letters, digits, '_', '.' or '-', "
+                                 "starting with a letter or digit"}), 400
+
+    try:
+        model_alias = ModelAliasSchema().load(request_body())
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    conditional = bool(request.if_match) and not request.if_match.star_tag
+
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT model_id FROM trained_models "
+                        "WHERE model_id = %s AND project_id = %s",
+                        (model_alias.model_id, project_id))
+            if cur.fetchone() is None:
+                return jsonify({"error": f"Trained model ID {model_alias.model_id} "
+                                         f"not found in project ID {project_id}"}), 400
+
+            change_id, updated_at = record_change(cur, project_id, ALIAS_CHANGE_TYPE,
+                                                  {"alias" : alias,
+                                                   "model_id" : model_alias.model_id})
+
+            if conditional:
+                cur.execute("UPDATE model_aliases "
+                            "SET model_id = %s, change_id = %s, updated_at = %s "
+                            "WHERE project_id = %s AND alias = %s AND change_id = ANY(%s) "
+                            "RETURNING alias",
+                            (model_alias.model_id, change_id, updated_at,
+                             project_id, alias, parse_etags(request.if_match)))
+            else:
+                cur.execute("INSERT INTO model_aliases "
+                            "(project_id, alias, model_id, change_id, updated_at) "
+                            "VALUES (%s, %s, %s, %s, %s) "
+                            "ON CONFLICT (project_id, alias) DO UPDATE "
+                            "SET model_id = EXCLUDED.model_id, change_id = EXCLUDED.change_id, "
+                            "updated_at = EXCLUDED.updated_at "
+                            "RETURNING alias",
+                            (project_id, alias, model_alias.model_id, change_id, updated_at))
+
+            if cur.fetchone() is None:
+                conn.rollback()
+                return jsonify({"error": f"Alias {alias} of project ID {project_id} "
+                                         f"does not match If-Match"}), 412
+
+    conn.commit()
+    conn.close()
+
+    model_alias.project_id = project_id
+    model_alias.alias = alias
+    model_alias.change_id = change_id
+    model_alias.updated_at = updated_at
+    return alias_response(model_alias)
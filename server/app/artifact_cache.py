@@ -0,0 +1,250 @@
+"""
+Local disk read-through cache of model objects
+Hits are served from the file, by the WSGI server's sendfile support or by
+a front-end server through X-Sendfile or X-Accel-Redirect
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+import time
+
+from flask import make_response
+from flask import send_file
+
+CACHE_DIR_KEY = "RINGLING_ARTIFACT_CACHE_DIR"
+CACHE_MAX_BYTES_KEY = "RINGLING_ARTIFACT_CACHE_MAX_BYTES"
+SENDFILE_KEY = "RINGLING_SENDFILE"
+ACCEL_REDIRECT_PREFIX_KEY = "RINGLING_ACCEL_REDIRECT_PREFIX"
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ringling-artifacts")
+DEFAULT_CACHE_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_ACCEL_REDIRECT_PREFIX = "/ringling-artifacts"
+SENDFILE_MODES = ["", "x-sendfile", "x-accel-redirect"]
+OCTET_STREAM = "application/octet-stream"
+TEMP_PREFIX = ".tmp-"
+STALE_TEMP_SECONDS = 60 * 60
+
+# app.config key holding the ArtifactCache, or None when caching is disabled
+ARTIFACT_CACHE_CONFIG = "ARTIFACT_CACHE"
+
+class HashingWriter:
+    """
+    A binary file wrapper that computes the SHA-256 digest of what is written
+    """
+    def __init__(self, file):
+        """
+        Initialize the writer
+        :param file: The binary file to write to
+        """
+        self.file = file
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        """
+        Write bytes to the file
+        :param data: The bytes
+        :return: None
+        """
+        self.hasher.update(data)
+        self.file.write(data)
+        self.size += len(data)
+
+class ArtifactCache:
+    """
+    Model objects stored as files named by model ID and digest.  Files are
+    written under a temporary name and renamed into place, so the workers of
+    a host can share one directory.  The least recently served files are
+    removed once the directory holds more than max_bytes.
+    """
+    def __init__(self, directory, max_bytes, sendfile_mode="",
+                 accel_redirect_prefix=DEFAULT_ACCEL_REDIRECT_PREFIX):
+        """
+        Initialize the cache
+        :param directory: The directory to store model objects in, created if missing.
+        It must belong to the server user and other users must not be able to write to it.
+        :param max_bytes: The maximum total size of the cached model objects
+        :param sendfile_mode: "" to send files from the worker, "x-sendfile" or
+        "x-accel-redirect" to have the front-end server send them
+        :param accel_redirect_prefix: The internal location of the directory for X-Accel-Redirect
+        :raises PermissionError: If the directory is not one only the server user can write to
+        """
+        if sendfile_mode not in SENDFILE_MODES:
+            raise ValueError(f"{SENDFILE_KEY} must be one of {SENDFILE_MODES}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sendfile_mode = sendfile_mode
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/")
+        private_directory(directory)
+
+    def file_name(self, model_id, digest):
+        """
+        Get the name of the file a model object is cached in
+        :param model_id: The trained model ID
+        :param digest: The digest of the model object
+        :return: The file name
+        """
+        return f"{model_id}-{digest}"
+
+    def path(self, model_id, digest):
+        """
+        Get the path a model object is cached at
+        :param model_id: The trained model ID
+        :param digest: The digest of the model object
+        :return: The path
+        """
+        return os.path.join(self.directory, self.file_name(model_id, digest))
+
+    def open(self, model_id, digest):
+        """
+        Open a cached model object and mark it as recently used.  The open
+        file can still be sent if another worker evicts it.
+        :param model_id: The trained model ID
+        :param digest: The digest of the model object
+        :return: The binary file, or None on a miss
+        """
+        path = self.path(model_id, digest)
+        try:
+            file = open(path, "rb")  # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return file
+
+    def fits(self, size):
+        """
+        Check if a model object can be cached at all
+        :param size: The size of the model object in bytes
+        :return: If the model object is no larger than max_bytes
+        """
+        return size <= self.max_bytes
+
+    def fill(self, model_id, digest, write):
+        """
+        Add a model object to the cache.  A model object larger than max_bytes
+        is not kept, since it would be evicted as soon as it was added.
+        :param model_id: The trained model ID
+        :param digest: The digest the model object must have
+        :param write: A function that writes the model object to the binary file it is passed
+        :return: None
+        """
+        file_handle, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.directory)
+        try:
+            with os.fdopen(file_handle, "wb") as file:
+                writer = HashingWriter(file)
+                write(writer)
+            if writer.hasher.hexdigest() != digest:
+                raise ValueError(f"Model object of ID {model_id} does not match its digest")
+            if not self.fits(writer.size):
+                remove_file(temp_path)
+                return
+            os.replace(temp_path, self.path(model_id, digest))
+        except BaseException:
+            remove_file(temp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """
+        List the cached model objects, removing temporary files left behind
+        by failed writes along the way
+        :return: A list of (last served time, size, path) of each cached model object
+        """
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                file_stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not name.startswith(TEMP_PREFIX):
+                entries.append((file_stat.st_mtime, file_stat.st_size, path))
+            elif file_stat.st_mtime < stale_before:
+                remove_file(path)
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently served model objects until the cache fits in max_bytes
+        :return: None
+        """
+        entries = sorted(self.entries(), reverse=True)
+        total = sum(size for _, size, _ in entries)
+        while total > self.max_bytes:
+            _, size, path = entries.pop()
+            remove_file(path)
+            total -= size
+
+    def send(self, model_id, digest, file):
+        """
+        Build the response for a cached model object
+        :param model_id: The trained model ID
+        :param digest: The digest of the model object
+        :param file: The file returned by open
+        :return: The response
+        """
+        if self.sendfile_mode == "x-accel-redirect":
+            file.close()
+            response = make_response(b"")
+            response.mimetype = OCTET_STREAM
+            response.headers["X-Accel-Redirect"] = \
+                f"{self.accel_redirect_prefix}/{self.file_name(model_id, digest)}"
+            return response
+        if self.sendfile_mode == "x-sendfile":
+            file.close()
+            return send_file(self.path(model_id, digest), mimetype=OCTET_STREAM,
+                             conditional=False, etag=False)
+        response = send_file(file, mimetype=OCTET_STREAM, conditional=False, etag=False)
+        response.content_length = os.fstat(file.fileno()).st_size
+        return response
+
+def remove_file(path):
+    """
+    Remove a file that another worker may have removed already
+    :param path: The path of the file
+    :return: None
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def private_directory(directory):
+    """
+    Create a directory only the server user can access, or check that an
+    existing one cannot be written by other users.  Hits are served by file
+    name, so a file planted by another user would be sent as a model object.
+    :param directory: The path of the directory
+    :return: None
+    :raises PermissionError: If the directory is a symbolic link, belongs to
+    another user, or is writable by its group or other users
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    dir_stat = os.lstat(directory)
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid() \
+            or dir_stat.st_mode & 0o022:
+        raise PermissionError(f"{CACHE_DIR_KEY} {directory} must be a directory of the "
+                              "server user that other users cannot write to")
+
+def configure_artifact_cache(app):
+    """
+    Set up the artifact cache of the app from the environment.  Setting
+    RINGLING_ARTIFACT_CACHE_MAX_BYTES to 0 disables the cache.
+    :param app: The flask app
+    :return: None
+    """
+    max_bytes = int(os.environ.get(CACHE_MAX_BYTES_KEY, DEFAULT_CACHE_MAX_BYTES))
+    sendfile_mode = os.environ.get(SENDFILE_KEY, "").lower()
+    app.config["USE_X_SENDFILE"] = sendfile_mode == "x-sendfile"
+    app.config[ARTIFACT_CACHE_CONFIG] = None
+    if max_bytes > 0:
+        app.config[ARTIFACT_CACHE_CONFIG] = ArtifactCache(
+            os.environ.get(CACHE_DIR_KEY, DEFAULT_CACHE_DIR), max_bytes, sendfile_mode,
+            os.environ.get(ACCEL_REDIRECT_PREFIX_KEY, DEFAULT_ACCEL_REDIRECT_PREFIX))
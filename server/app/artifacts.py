@@ -0,0 +1,175 @@
+"""
+Streaming helpers for model objects and other text values too large to hold in memory
+"""
+
+import codecs
+import gzip
+import hashlib
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 1024 * 1024
+GZIP_MIMETYPE = "application/gzip"
+UPLOAD_TABLE = "text_upload"
+
+# backslash must be escaped first
+COPY_ESCAPES = [(b"\\", b"\\\\"), (b"\n", b"\\n"), (b"\r", b"\\r"), (b"\t", b"\\t")]
+
+class LimitedReader:
+    """
+    A binary file wrapper that raises RequestEntityTooLarge once more than a
+    maximum number of bytes has been read, so a small gzip upload cannot
+    decompress into an unbounded model object
+    """
+    def __init__(self, reader, max_size):
+        """
+        Initialize the reader
+        :param reader: The binary file to read from
+        :param max_size: The maximum number of bytes to read
+        """
+        self.reader = reader
+        self.max_size = max_size
+        self.size = 0
+
+    def read(self, size=-1):
+        """
+        Read bytes, never more than one past the maximum at a time
+        :param size: The number of bytes to read, or -1 to read to the end
+        :return: The bytes
+        """
+        remaining = self.max_size - self.size + 1
+        data = self.reader.read(remaining if size is None or size < 0 else min(size, remaining))
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise RequestEntityTooLarge()
+        return data
+
+def open_model_object(stream, compressed, max_size):
+    """
+    Rewind a spooled model object and open it for reading
+    :param stream: The seekable binary file holding the model object
+    :param compressed: If the file is gzip compressed
+    :param max_size: The maximum size of the uncompressed model object
+    :return: A binary file of the uncompressed model object
+    """
+    stream.seek(0)
+    if compressed:
+        return LimitedReader(gzip.GzipFile(fileobj=stream, mode="rb"), max_size)
+    return stream
+
+def digest_text(reader):
+    """
+    Check that a value can be stored as text and compute its digest,
+    one chunk at a time
+    :param reader: A binary file of the value
+    :return: The SHA-256 hex digest of the value
+    """
+    hasher = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+            if b"\x00" in chunk:
+                raise ValueError("must not contain NUL characters")
+            decoder.decode(chunk)
+            hasher.update(chunk)
+        decoder.decode(b"", final=True)
+    except (UnicodeDecodeError, gzip.BadGzipFile, EOFError) as err:
+        raise ValueError(f"is not valid UTF-8 text: {err}") from err
+    return hasher.hexdigest()
+
+class CopyTextStream:
+    """
+    A file-like view of a binary file as a one column row of COPY text format
+    """
+    def __init__(self, reader):
+        """
+        Initialize the stream
+        :param reader: A binary file of the field value
+        """
+        self.reader = reader
+        self.done = False
+
+    def read(self, size=CHUNK_SIZE):
+        """
+        Read the next escaped chunk of the row
+        :param size: The number of bytes to read from the underlying file
+        :return: The escaped bytes, ending with a newline, then b"" at the end
+        """
+        if self.done:
+            return b""
+        chunk = self.reader.read(max(size, CHUNK_SIZE))
+        if chunk == b"":
+            self.done = True
+            return b"\n"
+        for char, escaped in COPY_ESCAPES:
+            chunk = chunk.replace(char, escaped)
+        return chunk
+
+def copy_text(cur, reader):
+    """
+    Stream a text value into the value column of the temporary table
+    UPLOAD_TABLE, so it can be inserted with INSERT ... SELECT without passing
+    through Python as one string.  The table is dropped when the transaction commits.
+    :param cur: The database cursor
+    :param reader: A binary file of the value
+    :return: None
+    """
+    cur.execute(f"CREATE TEMPORARY TABLE {UPLOAD_TABLE} (value text NOT NULL) "
+                "ON COMMIT DROP")
+    cur.execute("SET LOCAL client_encoding TO 'UTF8'")
+    cur.copy_expert(f"COPY {UPLOAD_TABLE} (value) FROM STDIN", CopyTextStream(reader),
+                    size=CHUNK_SIZE)
+
+class CopyBinaryFieldWriter:
+    """
+    A file-like sink for COPY ... TO STDOUT (FORMAT binary) output of one row
+    with one column, which writes the raw bytes of the field to a file
+    """
+    # signature, flags, and header extension length, then the field count and length
+    PREFIX_SIZE = 11 + 4 + 4 + 2 + 4
+
+    def __init__(self, file):
+        """
+        Initialize the writer
+        :param file: The binary file to write the field to
+        """
+        self.file = file
+        self.prefix = b""
+        self.remaining = None
+
+    def write(self, data):
+        """
+        Consume the next block of COPY output
+        :param data: The bytes
+        :return: None
+        """
+        if self.remaining is None:
+            self.prefix += data
+            if len(self.prefix) < self.PREFIX_SIZE:
+                return
+            self.remaining = int.from_bytes(self.prefix[self.PREFIX_SIZE - 4:self.PREFIX_SIZE],
+                                            "big", signed=True)
+            if self.remaining < 0:
+                raise ValueError("Unexpected NULL field")
+            data = self.prefix[self.PREFIX_SIZE:]
+            self.prefix = None
+
+        # anything after the field is the end of data marker
+        data = data[:self.remaining]
+        self.file.write(data)
+        self.remaining -= len(data)
+
+def copy_text_out(cur, query, params, file):
+    """
+    Stream one text value out of the database to a file, without building
+    it as a Python string
+    :param cur: The database cursor
+    :param query: A SELECT returning one row with one text column
+    :param params: The query parameters
+    :param file: The binary file to write the UTF-8 value to
+    :return: None
+    """
+    cur.execute("SET LOCAL client_encoding TO 'UTF8'")
+    select = cur.mogrify(query, params).decode("utf-8")
+    cur.copy_expert(f"COPY ({select}) TO STDOUT (FORMAT binary)",
+                    CopyBinaryFieldWriter(file), size=CHUNK_SIZE)
@@ -0,0 +1,83 @@
+"""
+Updates of many rows selected by ID or by a filter
+Each update is one UPDATE ... WHERE statement
+"""
+
+import psycopg2
+
+from app.database import get_database_uri
+
+class BulkUpdate:
+    """
+    An update of one table whose rows are selected by ID or filter
+    """
+    def __init__(self, table, id_column, filter_clauses):
+        """
+        Initialize the update
+        :param table: The table to update
+        :param id_column: The primary key column of the table
+        :param filter_clauses: A dictionary of filter name:SQL condition with one parameter
+        """
+        self.table = table
+        self.id_column = id_column
+        self.filter_clauses = filter_clauses
+
+    def where(self, patch):
+        """
+        Build the WHERE clause that selects the rows of a bulk patch that would change
+        :param patch: The BulkPatch
+        :return: The clause and its parameters
+        """
+        clauses = []
+        params = []
+        if patch.ids is not None:
+            clauses.append(f"{self.id_column} = ANY(%s)")
+            params.append(patch.ids)
+        for name, value in (patch.filters or {}).items():
+            clauses.append(self.filter_clauses[name])
+            params.append(value)
+        # rows that already have the new values are not updated or counted
+        for column, value in patch.values.items():
+            clauses.append(f"{column} IS DISTINCT FROM %s")
+            params.append(value)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def apply(self, patch):
+        """
+        Update the rows of a bulk patch in one statement, or only find them for a dry run
+        :param patch: The BulkPatch
+        :return: A list of (ID, project ID) tuples of the rows, in ID order
+        """
+        where, where_params = self.where(patch)
+        if patch.dry_run:
+            query = f"SELECT {self.id_column}, project_id FROM {self.table}" + where
+            params = where_params
+        else:
+            assignments = ", ".join(f"{column} = %s" for column in patch.values)
+            query = f"UPDATE {self.table} SET {assignments}" + where + \
+                    f" RETURNING {self.id_column}, project_id"
+            params = list(patch.values.values()) + where_params
+
+        uri = get_database_uri()
+        with psycopg2.connect(uri) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = sorted(cur.fetchall())
+
+        conn.commit()
+        conn.close()
+
+        return rows
+
+def bulk_response(patch, rows):
+    """
+    Build the response of a bulk update
+    :param patch: The BulkPatch
+    :param rows: The (ID, project ID) tuples returned by BulkUpdate.apply
+    :return: A dictionary of the count and IDs of the rows updated, or that would be
+    """
+    return {
+        "dry_run" : patch.dry_run,
+        "count" : len(rows),
+        "ids" : [_id for _id, _ in rows],
+    }
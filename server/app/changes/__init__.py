@@ -0,0 +1,71 @@
+"""
+The changes module
+Used to record changes and read them back as a feed
+"""
+from flask import Blueprint
+
+from flask.json import jsonify
+
+import psycopg2
+from psycopg2.extras import Json
+
+from app.database import get_database_uri
+from app.query_params import ListQuery
+from app.schemas import Change
+
+blueprint = Blueprint("changes", __name__)
+
+# taken by every transaction that records a change, so change IDs commit in order
+CHANGE_LOCK_KEY = 0x52494E47
+
+FILTER_TYPES = {
+    "project_id" : int,
+    "change_type" : str,
+}
+
+def record_change(cur, project_id, change_type, body):
+    """
+    Add an entry to the change feed in the current transaction.  Transactions
+    that record changes are serialized until they commit, so a reader paging
+    by change ID never skips a change that commits later with a lower ID.
+    :param cur: The database cursor
+    :param project_id: The project ID the change belongs to
+    :param change_type: What was changed, e.g. alias
+    :param body: A dictionary of the new values
+    :return: The change ID and timestamp
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (CHANGE_LOCK_KEY,))
+    cur.execute("INSERT INTO changes (project_id, change_type, body) "
+                "VALUES (%s, %s, %s) RETURNING change_id, changed_at",
+                (project_id, change_type, Json(body)))
+    return cur.fetchone()
+
+@blueprint.route('/v1/changes', methods=["GET"])
+def list_changes():
+    """
+    Retrieve the change feed in change ID order, optionally filtered by project or
+    change type.  Readers poll with after_id set to the last change ID they saw.
+    :return: The changes as a JSON object
+    """
+    try:
+        list_query = ListQuery("change_id", FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    where, params = list_query.sql()
+    if list_query.limit is None:
+        where += " ORDER BY change_id"
+    query = "SELECT change_id, changed_at, project_id, change_type, body FROM changes" + where
+
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            changes = [Change(*row) for row in cur]
+
+    conn.close()
+
+    response = list_query.update_response({"changes" : changes},
+                                          [c.change_id for c in changes])
+
+    return jsonify(response)
@@ -0,0 +1,103 @@
+"""
+Single-flight coalescing of identical concurrent requests
+While a fetch for a key is in flight, other requests for the same key wait
+for it and share its result instead of querying the database again.
+Coalescing is per worker process.
+"""
+
+import functools
+import threading
+from concurrent.futures import Future
+
+from flask import current_app
+from flask import request
+
+# SingleFlight objects by name, reported by the metrics endpoint
+single_flights = {}
+
+class SingleFlight:
+    """
+    Runs at most one fetch at a time for each key, sharing its result with
+    the callers that ask for the same key while it runs
+    """
+    def __init__(self, name):
+        """
+        Initialize the single flight and register it for the metrics endpoint
+        :param name: The name the counts are reported under
+        """
+        self.name = name
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.fetches = 0
+        self.coalesced = 0
+        single_flights[name] = self
+
+    def do(self, key, fetch):
+        """
+        Run fetch, or wait for the fetch already running for key
+        :param key: A hashable key identifying the fetch
+        :param fetch: A function with no arguments that returns the result
+        :return: The result of the fetch.  Errors of the fetch are raised to
+        every caller that shared it.
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+                self.fetches += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+        future.set_result(result)
+        return result
+
+    def counts(self):
+        """
+        Get the coalescing counts
+        :return: A dictionary of the fetches run, the requests that shared a
+        fetch instead of running one, and the fetches running now
+        """
+        with self.lock:
+            return {
+                "fetches" : self.fetches,
+                "coalesced" : self.coalesced,
+                "in_flight" : len(self.in_flight),
+            }
+
+def coalesce_response(flight):
+    """
+    Decorate a GET view so that identical concurrent requests share one call
+    of the view and one serialized response.  Requests are identical when
+    their path, query string and conditional and content negotiation
+    headers match.  Responses must be small enough to buffer.
+    :param flight: The SingleFlight to run the view in
+    :return: The decorator
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.full_path,
+                   request.headers.get("If-None-Match"),
+                   request.headers.get("Accept"))
+
+            def fetch():
+                response = current_app.make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers)
+
+            body, status, headers = flight.do(key, fetch)
+            return current_app.response_class(body, status, headers)
+        return wrapper
+    return decorator
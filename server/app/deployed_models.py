@@ -0,0 +1,74 @@
+"""
+Resolution of the current production and testing models of a project
+Each worker caches the answers.  Changes made through the worker drop its
+entries at once, and entries expire so changes made through other workers
+are seen within RINGLING_DEPLOYED_MODEL_TTL seconds.
+"""
+
+import os
+import threading
+import time
+
+DEPLOYED_MODEL_TTL_KEY = "RINGLING_DEPLOYED_MODEL_TTL"
+DEFAULT_DEPLOYED_MODEL_TTL = 1.0
+DEPLOYED_STAGES = ["production", "testing"]
+
+class DeployedModelCache:
+    """
+    Serialized responses by project ID, deployment stage and response
+    mimetype.  A generation counter per project ID and deployment stage keeps
+    a fetch that started before an invalidation from storing its stale result.
+    """
+    def __init__(self, ttl):
+        """
+        Initialize the cache
+        :param ttl: The number of seconds an entry is used for, 0 to disable caching
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.generations = {}
+
+    def get(self, key):
+        """
+        Get a cached entry
+        :param key: The (project ID, deployment stage, mimetype) tuple
+        :return: A tuple of the entry and the generation to pass to put.
+        The entry is None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self.entries[key]
+                entry = None
+            return (None if entry is None else entry[1]), self.generations.get(key[:2], 0)
+
+    def put(self, key, generation, value):
+        """
+        Store an entry unless the key was invalidated since generation was read
+        :param key: The (project ID, deployment stage, mimetype) tuple
+        :param generation: The generation returned by get before the value was fetched
+        :param value: The entry
+        :return: None
+        """
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            if self.generations.get(key[:2], 0) == generation:
+                self.entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, project_id):
+        """
+        Drop the entries of a project
+        :param project_id: The project ID
+        :return: None
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == project_id]:
+                del self.entries[key]
+            for stage in DEPLOYED_STAGES:
+                key = (project_id, stage)
+                self.generations[key] = self.generations.get(key, 0) + 1
+
+deployed_model_cache = DeployedModelCache(
+    float(os.environ.get(DEPLOYED_MODEL_TTL_KEY, DEFAULT_DEPLOYED_MODEL_TTL)))
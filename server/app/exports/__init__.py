@@ -0,0 +1,377 @@
+"""
+The exports module
+Used to stream model tests and trained models to analytics tools as Apache
+Arrow IPC streams or Parquet files.  Each metric key becomes a typed column,
+so a DataFrame of the export is read in one call instead of being built from
+JSON objects one row at a time.  Without the pyarrow package, exports are
+not available.
+"""
+from flask import Blueprint
+
+from flask import current_app
+from flask import request
+from flask.json import jsonify
+
+import psycopg2
+
+from app.database import get_database_uri
+from app.model_tests import FILTER_TYPES as TEST_FILTER_TYPES
+from app.query_params import parse_filters
+from app.query_params import parse_timestamp
+from app.trained_models import FILTER_TYPES as MODEL_FILTER_TYPES
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+blueprint = Blueprint("exports", __name__)
+
+FORMAT_KEY = "format"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+
+# format name: mimetype, file extension
+FORMATS = {
+    "arrow" : (ARROW_MIMETYPE, ".arrows"),
+    "parquet" : (PARQUET_MIMETYPE, ".parquet"),
+}
+
+# each batch of rows is one Arrow record batch or one Parquet row group
+BATCH_ROWS = 65536
+
+# integers with more digits may not fit in a bigint
+INTEGER_PATTERN = "^-?[0-9]{1,18}$"
+
+# Arrow type of a metric column: SQL cast, JSON type of the values it keeps
+METRIC_CASTS = {
+    "int64" : ("bigint", "number"),
+    "float64" : ("float8", "number"),
+    "bool_" : ("boolean", "boolean"),
+}
+
+def arrow_type(type_name):
+    """
+    Build the Arrow type of a column
+    :param type_name: The name of the type, timestamp, json, or a pyarrow type factory
+    :return: The Arrow type, where timestamps have microseconds and JSON is a string
+    """
+    if type_name == "timestamp":
+        return pyarrow.timestamp("us")
+    if type_name == "json":
+        return pyarrow.string()
+    return getattr(pyarrow, type_name)()
+
+def metric_type(json_types, integral):
+    """
+    Choose the type of a metric column from the JSON types of its values
+    :param json_types: The JSON types of the values of the metric
+    :param integral: If every number is an integer that fits in a bigint
+    :return: The name of the Arrow type, json if the values are of mixed
+    types or are objects or arrays
+    """
+    json_types = set(json_types) - {"null"}
+    if json_types == {"number"}:
+        return "int64" if integral else "float64"
+    if json_types == {"boolean"}:
+        return "bool_"
+    if json_types == {"string"}:
+        return "string"
+    return "json"
+
+def metric_sql(column, type_name):
+    """
+    Build the expression of a metric column.  Values that are not of the
+    column type, such as ones added after the types were chosen, are null.
+    :param column: The qualified JSONB column of the metrics
+    :param type_name: The name of the Arrow type of the metric
+    :return: The SQL expression, and one parameter for each %s in it, all the metric key
+    """
+    if type_name == "string":
+        return f"{column} ->> %s", 1
+    if type_name == "json":
+        return f"NULLIF(({column} -> %s)::text, 'null')", 1
+    cast, json_type = METRIC_CASTS[type_name]
+    return f"CASE WHEN jsonb_typeof({column} -> %s) = '{json_type}' " \
+           f"THEN ({column} ->> %s)::{cast} END", 2
+
+class Export:
+    """
+    The rows, columns, and filters of an export
+    """
+    def __init__(self, name, from_sql, alias, columns, filter_types):
+        """
+        Describe an export
+        :param name: The name of the exported table, which is also the file name
+        :param from_sql: The FROM clause of the export
+        :param alias: The alias of the exported table in the FROM clause
+        :param columns: A list of column name, SQL expression, Arrow type name
+        :param filter_types: A dictionary of column name:parsing function of the allowed filters
+        """
+        self.name = name
+        self.from_sql = from_sql
+        self.alias = alias
+        self.columns = columns
+        self.filter_types = filter_types
+
+    def where_sql(self, timestamp_column):
+        """
+        Build the WHERE clause of the filters in the query string.  A range of
+        timestamps is selected with <timestamp_column>_from, inclusive, and
+        <timestamp_column>_until, exclusive.
+        :param timestamp_column: The timestamp column of the range filters
+        :return: The WHERE clause and its parameters
+        :raises ValueError: if a filter has an invalid value
+        """
+        filters = parse_filters(self.filter_types)
+        clauses = [f"{self.alias}.{column} = %s" for column in filters]
+        params = list(filters.values())
+
+        ranges = parse_filters({f"{timestamp_column}_from" : parse_timestamp,
+                                f"{timestamp_column}_until" : parse_timestamp})
+        for key, value in ranges.items():
+            operator = ">=" if key.endswith("_from") else "<"
+            clauses.append(f"{self.alias}.{timestamp_column} {operator} %s")
+            params.append(value)
+
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
+
+    def metric_columns(self, cur, metrics_column, where, params):
+        """
+        Find the metric keys of the exported rows and the types of their values
+        :param cur: A cursor of the export transaction
+        :param metrics_column: The JSONB column of the metrics
+        :param where: The WHERE clause of the export
+        :param params: The parameters of the WHERE clause
+        :return: A list of column name, SQL expression, Arrow type name, and the
+        parameters of the expressions
+        """
+        query = "SELECT metric.key, array_agg(DISTINCT jsonb_typeof(metric.value)), " \
+                "bool_and(jsonb_typeof(metric.value) <> 'number' " \
+                "OR metric.value::text ~ %s) " \
+                f"FROM {self.from_sql}, jsonb_each({self.alias}.{metrics_column}) metric" \
+                f"{where} GROUP BY metric.key ORDER BY metric.key"
+        cur.execute(query, [INTEGER_PATTERN] + params)
+
+        columns = []
+        column_params = []
+        for key, json_types, integral in cur.fetchall():
+            type_name = metric_type(json_types, integral)
+            expression, count = metric_sql(f"{self.alias}.{metrics_column}", type_name)
+            columns.append((f"{metrics_column}.{key}", expression, type_name))
+            column_params.extend([key] * count)
+        return columns, column_params
+
+def record_batch(rows, schema):
+    """
+    Build an Arrow record batch from rows
+    :param rows: The rows, in the order of the schema's fields
+    :param schema: The Arrow schema
+    :return: The record batch
+    """
+    arrays = [pyarrow.array(values, type=field.type)
+              for values, field in zip(zip(*rows), schema)]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+class ChunkSink:
+    """
+    A write-only file that keeps what is written to it until it is taken,
+    so an Arrow or Parquet writer can feed a streamed response
+    """
+    def __init__(self):
+        """
+        Create an empty sink
+        """
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        """
+        Keep written bytes
+        :param data: The bytes
+        :return: The number of bytes written
+        """
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        """
+        Report the number of bytes written
+        :return: The position in the file
+        """
+        return self.position
+
+    def writable(self):
+        """
+        Report that the sink can be written to
+        :return: True
+        """
+        return True
+
+    def flush(self):
+        """
+        Do nothing, as written bytes are kept until they are taken
+        :return: None
+        """
+
+    def close(self):
+        """
+        Close the sink
+        :return: None
+        """
+        self.closed = True
+
+    def take(self):
+        """
+        Take the bytes written since the last call
+        :return: The bytes
+        """
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def open_writer(sink, schema, file_format):
+    """
+    Open an Arrow IPC stream or Parquet writer
+    :param sink: The file to write to
+    :param schema: The Arrow schema of the rows
+    :param file_format: The name of the format
+    :return: The writer, which has write_batch and close methods
+    """
+    if file_format == "parquet":
+        return pyarrow.parquet.ParquetWriter(sink, schema)
+    return pyarrow.ipc.new_stream(sink, schema)
+
+def stream_export(cur, schema, file_format):
+    """
+    Write the rows of an export, one batch of rows at a time
+    :param cur: The cursor the export query ran on
+    :param schema: The Arrow schema of the rows
+    :param file_format: The name of the format
+    :return: A generator of the parts of the response
+    """
+    sink = ChunkSink()
+    writer = open_writer(sink, schema, file_format)
+    while True:
+        rows = cur.fetchmany(BATCH_ROWS)
+        if not rows:
+            break
+        writer.write_batch(record_batch(rows, schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+def export_response(export, metrics_column, timestamp_column):
+    """
+    Stream the rows of an export that match the query string.  The metric
+    keys are found and the rows read in one read-only transaction, through a
+    server-side cursor, so neither the rows nor the file are held in memory at once.
+    :param export: The Export
+    :param metrics_column: The JSONB column of the metrics, whose keys become columns
+    :param timestamp_column: The timestamp column of the range filters
+    :return: The response, or an error, status code
+    """
+    if pyarrow is None:
+        return jsonify({"error": "Exports need the pyarrow package"}), 501
+
+    file_format = request.args.get(FORMAT_KEY, "arrow")
+    if file_format not in FORMATS:
+        return jsonify({"error": f"{FORMAT_KEY} must be one of {list(FORMATS)}"}), 400
+
+    try:
+        where, params = export.where_sql(timestamp_column)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    conn = psycopg2.connect(get_database_uri())
+    try:
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cur:
+            metric_columns, metric_params = export.metric_columns(cur, metrics_column,
+                                                                  where, params)
+
+        columns = export.columns + metric_columns
+        schema = pyarrow.schema([(name, arrow_type(type_name))
+                                 for name, _, type_name in columns])
+        query = f"SELECT {', '.join(expression for _, expression, _ in columns)} " \
+                f"FROM {export.from_sql}{where} ORDER BY {export.alias}.{export.columns[0][0]}"
+
+        cur = conn.cursor(name=f"{export.name}_export")
+        cur.itersize = BATCH_ROWS
+        cur.execute(query, metric_params + params)
+    except BaseException:
+        conn.close()
+        raise
+
+    mimetype, extension = FORMATS[file_format]
+    response = current_app.response_class(stream_export(cur, schema, file_format),
+                                          mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{export.name}{extension}"'
+    response.call_on_close(conn.close)
+    return response
+
+MODEL_TESTS_EXPORT = Export(
+    "model_tests",
+    "model_tests t LEFT JOIN trained_models m ON m.model_id = t.model_id",
+    "t",
+    [
+        ("test_id", "t.test_id", "int32"),
+        ("project_id", "t.project_id", "int32"),
+        ("parameter_set_id", "t.parameter_set_id", "int32"),
+        ("model_id", "t.model_id", "int32"),
+        ("test_timestamp", "t.test_timestamp", "timestamp"),
+        ("passed_testing", "t.passed_testing", "bool_"),
+        ("metadata", "t.metadata::text", "json"),
+        # the trained model the test ran against, null if it does not exist
+        ("deployment_stage", "m.deployment_stage::text", "string"),
+        ("training_data_from", "m.training_data_from", "timestamp"),
+        ("training_data_until", "m.training_data_until", "timestamp"),
+        ("train_timestamp", "m.train_timestamp", "timestamp"),
+        ("passed_backtesting", "m.passed_backtesting", "bool_"),
+    ],
+    TEST_FILTER_TYPES,
+)
+
+TRAINED_MODELS_EXPORT = Export(
+    "trained_models",
+    "trained_models m",
+    "m",
+    [
+        ("model_id", "m.model_id", "int32"),
+        ("project_id", "m.project_id", "int32"),
+        ("parameter_set_id", "m.parameter_set_id", "int32"),
+        ("training_data_from", "m.training_data_from", "timestamp"),
+        ("training_data_until", "m.training_data_until", "timestamp"),
+        ("train_timestamp", "m.train_timestamp", "timestamp"),
+        ("deployment_stage", "m.deployment_stage::text", "string"),
+        ("backtest_timestamp", "m.backtest_timestamp", "timestamp"),
+        ("passed_backtesting", "m.passed_backtesting", "bool_"),
+        ("model_digest", "m.model_digest", "string"),
+        ("metadata", "m.metadata::text", "json"),
+    ],
+    MODEL_FILTER_TYPES,
+)
+
+@blueprint.route('/v1/model_tests/export', methods=["GET"])
+def export_model_tests():
+    """
+    Export the model tests matching the filter query arguments, with the
+    trained models they ran against and a column for each test metric
+    :return: The Arrow IPC stream or Parquet file
+    """
+    return export_response(MODEL_TESTS_EXPORT, "test_metrics", "test_timestamp")
+
+@blueprint.route('/v1/trained_models/export', methods=["GET"])
+def export_trained_models():
+    """
+    Export the trained models matching the filter query arguments, without
+    model objects, with a column for each backtest metric
+    :return: The Arrow IPC stream or Parquet file
+    """
+    return export_response(TRAINED_MODELS_EXPORT, "backtest_metrics", "train_timestamp")
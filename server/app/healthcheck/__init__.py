@@ -23,7 +23,8 @@ def healthcheck():
     successful_connection = False
     successful_queries = []
 
-    tables = ["model_tests", "parameter_sets", "projects", "trained_models"]
+    tables = ["changes", "model_aliases", "model_tests", "parameter_sets", "projects",
+              "trained_models"]
 
     try:
         uri = get_database_uri()
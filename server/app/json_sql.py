@@ -0,0 +1,221 @@
+"""
+SQL expressions that build the JSON documents of Ringling objects in the database
+Each produces the same fields as the dump of the object's schema.  List
+responses can be made of these documents, streamed from the database to the
+client without building objects in Python.
+"""
+
+import datetime as dt
+import json
+import os
+
+from flask import current_app
+
+import psycopg2
+
+from app.database import get_database_uri
+from app.msgpack_encoding import binary_model_object
+from app.msgpack_encoding import MODEL_OBJECT_KEY
+from app.msgpack_encoding import MSGPACK_MIMETYPE
+from app.msgpack_encoding import packb
+from app.msgpack_encoding import wants_msgpack
+from app.query_params import parse_bool
+
+DATABASE_JSON_KEY = "RINGLING_DATABASE_JSON"
+FETCH_ROWS = 1000
+
+# app.config key of whether list endpoints use the JSON built by the database
+DATABASE_JSON_CONFIG = "DATABASE_JSON"
+
+# timestamps are formatted as datetime.isoformat does, which keeps all six
+# digits of a fraction of a second where Postgres drops trailing zeros
+TIMESTAMP_COLUMNS = {"training_data_from", "training_data_until", "train_timestamp",
+                     "backtest_timestamp", "test_timestamp"}
+
+# keys of documents built by the database that hold a record, or a list of
+# records or of groups of records
+RECORD_KEYS = {"project", "parameter_set", "trained_model", "model_test", "latest_test"}
+RECORD_LIST_KEYS = {"parameter_sets", "trained_models", "model_tests"}
+
+def timestamp_json(column):
+    """
+    Build the ISO 8601 string of a timestamp without a time zone
+    :param column: The qualified column
+    :return: The SQL expression
+    """
+    return f"to_char({column}, 'YYYY-MM-DD\"T\"HH24:MI:SS') || " \
+           f"CASE WHEN to_char({column}, 'US') = '000000' THEN '' " \
+           f"ELSE to_char({column}, '.US') END"
+
+def json_object(alias, columns):
+    """
+    Build a json_build_object expression over columns of a table
+    :param alias: The alias of the table in the query
+    :param columns: The column names, which are also the field names
+    :return: The SQL expression
+    """
+    pairs = ", ".join(
+        f"'{column}', {timestamp_json(f'{alias}.{column}')}" if column in TIMESTAMP_COLUMNS
+        else f"'{column}', {alias}.{column}"
+        for column in columns)
+    return f"json_build_object({pairs})"
+
+def project_json(alias):
+    """
+    Build the JSON of a project
+    :param alias: The alias of the projects table in the query
+    :return: The SQL expression
+    """
+    return json_object(alias, ["project_id", "project_name", "metadata"])
+
+def parameter_set_json(alias, include_training_parameters=True):
+    """
+    Build the JSON of a parameter set
+    :param alias: The alias of the parameter_sets table in the query
+    :param include_training_parameters: If training_parameters is included
+    :return: The SQL expression
+    """
+    columns = ["project_id", "parameter_set_id", "is_active", "metadata"]
+    if include_training_parameters:
+        columns.append("training_parameters")
+    return json_object(alias, columns)
+
+def trained_model_json(alias, include_model_object=True):
+    """
+    Build the JSON of a trained model
+    :param alias: The alias of the trained_models table in the query
+    :param include_model_object: If model_object is included, otherwise it is null
+    :return: The SQL expression
+    """
+    columns = ["project_id", "parameter_set_id", "model_id", "training_data_from",
+               "training_data_until", "train_timestamp", "deployment_stage",
+               "backtest_timestamp", "backtest_metrics", "passed_backtesting", "metadata",
+               "model_digest"]
+    model_object = f"{alias}.model_object" if include_model_object else "NULL"
+    return json_object(alias, columns)[:-1] + f", 'model_object', {model_object})"
+
+def model_test_json(alias):
+    """
+    Build the JSON of a model test
+    :param alias: The alias of the model_tests table in the query
+    :return: The SQL expression
+    """
+    return json_object(alias, ["project_id", "parameter_set_id", "model_id", "test_id",
+                               "test_timestamp", "test_metrics", "passed_testing", "metadata"])
+
+def configure_database_json(app):
+    """
+    Set whether list endpoints use the JSON built by the database from the
+    environment.  Setting RINGLING_DATABASE_JSON to false builds it in Python.
+    :param app: The flask app
+    :return: None
+    """
+    app.config[DATABASE_JSON_CONFIG] = parse_bool(os.environ.get(DATABASE_JSON_KEY, "true"))
+
+def use_database_json():
+    """
+    Check if a list response is made of the JSON built by the database, which
+    it is when enabled unless the client prefers MessagePack
+    :return: True to use the JSON built by the database
+    """
+    return current_app.config[DATABASE_JSON_CONFIG] and not wants_msgpack()
+
+def stream_json_list(table, cur, list_query):
+    """
+    Write the documents of a list query, one page of rows at a time
+    :param table: The name of the list in the response
+    :param cur: The cursor the query ran on, whose rows are an ID and a JSON document
+    :param list_query: The ListQuery of the request
+    :return: A generator of the parts of the response
+    """
+    found_ids = []
+    yield f'{{"{table}": ['
+    while True:
+        rows = cur.fetchmany(FETCH_ROWS)
+        if not rows:
+            break
+        separator = "," if found_ids else ""
+        found_ids.extend(row[0] for row in rows)
+        yield separator + ",".join(row[1] for row in rows)
+
+    extra = json.dumps(list_query.update_response({}, found_ids))[1:-1]
+    yield "]" + (", " + extra if extra else "") + "}"
+
+def json_list_response(table, list_query, json_expression):
+    """
+    Build the response of a list endpoint from JSON built by the database.
+    The rows are read through a server-side cursor and sent as they arrive,
+    so neither the rows nor the response are held in memory at once.
+    :param table: The listed table, which is also the name of the list in the response
+    :param list_query: The ListQuery of the request
+    :param json_expression: The JSON expression of a row of the table
+    :return: The response
+    """
+    where, params = list_query.sql()
+    query = f"SELECT {list_query.id_column}, {json_expression}::text FROM {table}{where}"
+
+    conn = psycopg2.connect(get_database_uri())
+    try:
+        cur = conn.cursor(name=f"{table}_json")
+        cur.itersize = FETCH_ROWS
+        cur.execute(query, params)
+    except BaseException:
+        conn.close()
+        raise
+
+    response = current_app.response_class(stream_json_list(table, cur, list_query),
+                                          mimetype="application/json")
+    response.call_on_close(conn.close)
+    return response
+
+def record_from_database_json(record):
+    """
+    Convert the fields of a record in a JSON document built by the database
+    back to those of the Ringling object.  Values nested in the fields, such
+    as metadata, are left as they are.
+    :param record: The dictionary of the record
+    :return: The dictionary, with timestamps as datetimes and a hex model object as binary
+    """
+    for key in TIMESTAMP_COLUMNS.intersection(record):
+        if isinstance(record[key], str):
+            try:
+                record[key] = dt.datetime.fromisoformat(record[key])
+            except ValueError:
+                pass
+    if MODEL_OBJECT_KEY in record:
+        record[MODEL_OBJECT_KEY] = binary_model_object(record[MODEL_OBJECT_KEY])
+    return record
+
+def from_database_json(document):
+    """
+    Convert the records of a JSON document built by the database, such as a
+    project overview or a lineage.  Records are the objects at RECORD_KEYS
+    and the elements of the lists at RECORD_LIST_KEYS; an element holding
+    one of RECORD_KEYS groups records instead of being one.
+    :param document: The dictionary of the document, or of a group of records
+    :return: The dictionary, with the fields of its records converted
+    """
+    for key, value in document.items():
+        if value is None:
+            continue
+        if key in RECORD_KEYS:
+            record_from_database_json(value)
+        elif key in RECORD_LIST_KEYS:
+            for item in value:
+                if RECORD_KEYS.isdisjoint(item):
+                    record_from_database_json(item)
+                else:
+                    from_database_json(item)
+    return document
+
+def document_response(document):
+    """
+    Send a JSON document built by the database, re-encoded as MessagePack
+    when the client prefers it
+    :param document: The JSON document
+    :return: The response
+    """
+    if wants_msgpack():
+        obj = from_database_json(json.loads(document))
+        return current_app.response_class(packb(obj), mimetype=MSGPACK_MIMETYPE)
+    return current_app.response_class(document, mimetype="application/json")
@@ -0,0 +1,253 @@
+"""
+The lineage module
+Used to walk from a parameter set to the trained models trained with it and
+the tests run against them, and back.  Each walk is one query that follows
+indexes from the object asked for, so its cost depends on the size of the
+lineage rather than of the tables.
+"""
+from flask import Blueprint
+
+from flask import request
+from flask.json import jsonify
+
+import psycopg2
+
+from app.database import get_database_uri
+from app.json_sql import document_response
+from app.json_sql import model_test_json
+from app.json_sql import parameter_set_json
+from app.json_sql import trained_model_json
+from app.query_params import parse_bool
+from app.query_params import parse_deployment_stage
+from app.query_params import parse_filters
+
+blueprint = Blueprint("lineage", __name__)
+
+FORMAT_KEY = "format"
+FORMATS = ["nested", "flat"]
+
+# filters on trained models also drop the tests of the models they leave out
+MODEL_FILTER_TYPES = {
+    "deployment_stage" : parse_deployment_stage,
+    "passed_backtesting" : parse_bool,
+}
+
+TEST_FILTER_TYPES = {
+    "passed_testing" : parse_bool,
+}
+
+def filter_sql(alias, filters):
+    """
+    Build the conditions of equality filters on a table
+    :param alias: The alias of the table in the query
+    :param filters: A dictionary of column name:value
+    :return: The conditions, each starting with AND, and their parameters
+    """
+    conditions = "".join(f" AND {alias}.{column} = %s" for column in filters)
+    return conditions, list(filters.values())
+
+def optional_json(id_column, json_expression):
+    """
+    Build the JSON of a row of an outer join, which is null if the row is missing
+    :param id_column: The qualified primary key column of the row
+    :param json_expression: The JSON expression of the row
+    :return: The SQL expression
+    """
+    return f"CASE WHEN {id_column} IS NULL THEN NULL ELSE {json_expression} END"
+
+def optional_array(id_column, json_expression):
+    """
+    Build a JSON array of a row of an outer join, which is empty if the row is missing
+    :param id_column: The qualified primary key column of the row
+    :param json_expression: The JSON expression of the row
+    :return: The SQL expression
+    """
+    return f"CASE WHEN {id_column} IS NULL THEN '[]'::json " \
+           f"ELSE json_build_array({json_expression}) END"
+
+def tests_sql(model_alias, test_filters):
+    """
+    Build the subquery of the tests of a trained model
+    :param model_alias: The alias of the trained_models table in the enclosing query
+    :param test_filters: A dictionary of column name:value the tests must match
+    :return: The subquery, which is a JSON array, and its parameters
+    """
+    conditions, params = filter_sql("t", test_filters)
+    query = f"COALESCE((SELECT json_agg({model_test_json('t')} ORDER BY t.test_id) " \
+            f"FROM model_tests t WHERE t.model_id = {model_alias}.model_id{conditions}), " \
+            "'[]'::json)"
+    return query, params
+
+def parameter_set_lineage_sql(parameter_set_id, flat, model_filters, test_filters):
+    """
+    Build the query of the lineage of a parameter set
+    :param parameter_set_id: The parameter set ID
+    :param flat: If the objects are returned as lists by type instead of as a tree
+    :param model_filters: A dictionary of column name:value the trained models must match
+    :param test_filters: A dictionary of column name:value the tests must match
+    :return: The query and its parameters
+    """
+    model_conditions, model_params = filter_sql("m", model_filters)
+    parameter_set = parameter_set_json("s", False)
+    trained_model = trained_model_json("m", False)
+
+    if flat:
+        test_conditions, test_params = filter_sql("t", test_filters)
+        query = "WITH models AS (" \
+                "SELECT m.* FROM trained_models m " \
+                f"WHERE m.parameter_set_id = %s{model_conditions}), " \
+                "tests AS (" \
+                "SELECT t.* FROM models m JOIN model_tests t ON t.model_id = m.model_id " \
+                f"WHERE true{test_conditions}) " \
+                "SELECT json_build_object(" \
+                f"'parameter_sets', json_build_array({parameter_set}), " \
+                "'trained_models', COALESCE((SELECT json_agg(" \
+                f"{trained_model} ORDER BY m.model_id) FROM models m), '[]'::json), " \
+                "'model_tests', COALESCE((SELECT json_agg(" \
+                f"{model_test_json('t')} ORDER BY t.test_id) FROM tests t), '[]'::json)" \
+                ")::text FROM parameter_sets s WHERE s.parameter_set_id = %s"
+        return query, [parameter_set_id] + model_params + test_params + [parameter_set_id]
+
+    tests, test_params = tests_sql("m", test_filters)
+    query = "SELECT json_build_object(" \
+            f"'parameter_set', {parameter_set}, " \
+            "'trained_models', COALESCE((SELECT json_agg(json_build_object(" \
+            f"'trained_model', {trained_model}, 'model_tests', {tests}) " \
+            "ORDER BY m.model_id) FROM trained_models m " \
+            f"WHERE m.parameter_set_id = s.parameter_set_id{model_conditions}), '[]'::json)" \
+            ")::text FROM parameter_sets s WHERE s.parameter_set_id = %s"
+    return query, test_params + model_params + [parameter_set_id]
+
+def trained_model_lineage_sql(model_id, flat, test_filters):
+    """
+    Build the query of the lineage of a trained model
+    :param model_id: The trained model ID
+    :param flat: If the objects are returned as lists by type instead of as a tree
+    :param test_filters: A dictionary of column name:value the tests must match
+    :return: The query and its parameters
+    """
+    tests, test_params = tests_sql("m", test_filters)
+    parameter_set = parameter_set_json("s", False)
+    trained_model = trained_model_json("m", False)
+
+    if flat:
+        fields = f"'parameter_sets', {optional_array('s.parameter_set_id', parameter_set)}, " \
+                 f"'trained_models', json_build_array({trained_model}), " \
+                 f"'model_tests', {tests}"
+    else:
+        fields = f"'trained_model', {trained_model}, " \
+                 f"'parameter_set', {optional_json('s.parameter_set_id', parameter_set)}, " \
+                 f"'model_tests', {tests}"
+
+    query = f"SELECT json_build_object({fields})::text FROM trained_models m " \
+            "LEFT JOIN parameter_sets s ON s.parameter_set_id = m.parameter_set_id " \
+            "WHERE m.model_id = %s"
+    return query, test_params + [model_id]
+
+def model_test_lineage_sql(test_id, flat):
+    """
+    Build the query of the lineage of a model test
+    :param test_id: The model test ID
+    :param flat: If the objects are returned as lists by type instead of as a tree
+    :return: The query and its parameters
+    """
+    parameter_set = parameter_set_json("s", False)
+    trained_model = trained_model_json("m", False)
+    model_test = model_test_json("t")
+
+    if flat:
+        fields = f"'parameter_sets', {optional_array('s.parameter_set_id', parameter_set)}, " \
+                 f"'trained_models', {optional_array('m.model_id', trained_model)}, " \
+                 f"'model_tests', json_build_array({model_test})"
+    else:
+        fields = f"'model_test', {model_test}, " \
+                 f"'trained_model', {optional_json('m.model_id', trained_model)}, " \
+                 f"'parameter_set', {optional_json('s.parameter_set_id', parameter_set)}"
+
+    query = f"SELECT json_build_object({fields})::text FROM model_tests t " \
+            "LEFT JOIN trained_models m ON m.model_id = t.model_id " \
+            "LEFT JOIN parameter_sets s ON s.parameter_set_id = m.parameter_set_id " \
+            "WHERE t.test_id = %s"
+    return query, [test_id]
+
+def parse_format():
+    """
+    Parse the output format from the query string
+    :return: True for the flat format, False for the nested format
+    """
+    value = request.args.get(FORMAT_KEY, FORMATS[0])
+    if value not in FORMATS:
+        raise ValueError(f"{FORMAT_KEY} must be one of {FORMATS}")
+    return value == "flat"
+
+def lineage_response(query, params, cur_id):
+    """
+    Run a lineage query and forward the JSON the database built
+    :param query: The query
+    :param params: The parameters of the query
+    :param cur_id: The ID of the object the lineage starts from
+    :return: The lineage as a JSON object, or an error, status code
+    """
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            result = cur.fetchone()
+
+    conn.close()
+
+    if result is None:
+        return jsonify({"error": f"ID {cur_id} not found"}), 404
+
+    return document_response(result[0])
+
+@blueprint.route('/v1/parameter_sets/<int:parameter_set_id>/lineage', methods=["GET"])
+def get_parameter_set_lineage(parameter_set_id):
+    """
+    Retrieve the trained models trained with a parameter set and the tests
+    run against them, without training parameters or model objects
+    :param parameter_set_id: The parameter set ID
+    :return: The lineage as a JSON object
+    """
+    try:
+        flat = parse_format()
+        model_filters = parse_filters(MODEL_FILTER_TYPES)
+        test_filters = parse_filters(TEST_FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    query, params = parameter_set_lineage_sql(parameter_set_id, flat, model_filters, test_filters)
+    return lineage_response(query, params, parameter_set_id)
+
+@blueprint.route('/v1/trained_models/<int:model_id>/lineage', methods=["GET"])
+def get_trained_model_lineage(model_id):
+    """
+    Retrieve the parameter set a trained model was trained with and the tests
+    run against it, without training parameters or model objects
+    :param model_id: The trained model ID
+    :return: The lineage as a JSON object
+    """
+    try:
+        flat = parse_format()
+        test_filters = parse_filters(TEST_FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    query, params = trained_model_lineage_sql(model_id, flat, test_filters)
+    return lineage_response(query, params, model_id)
+
+@blueprint.route('/v1/model_tests/<int:test_id>/lineage', methods=["GET"])
+def get_model_test_lineage(test_id):
+    """
+    Retrieve the trained model a test ran against and the parameter set it
+    was trained with, without training parameters or model objects
+    :param test_id: The model test ID
+    :return: The lineage as a JSON object
+    """
+    try:
+        flat = parse_format()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    query, params = model_test_lineage_sql(test_id, flat)
+    return lineage_response(query, params, test_id)
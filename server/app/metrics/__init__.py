@@ -0,0 +1,24 @@
+"""
+The metrics module
+Used to report the counters of the worker that serves the request
+"""
+import os
+
+from flask import Blueprint
+
+from flask.json import jsonify
+
+from app.coalescing import single_flights
+
+blueprint = Blueprint("metrics", __name__)
+
+@blueprint.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Report the request coalescing counts of this worker process
+    :return: Jsonified metrics
+    """
+    return jsonify({
+        "pid" : os.getpid(),
+        "coalescing" : {name : flight.counts() for name, flight in single_flights.items()},
+    })
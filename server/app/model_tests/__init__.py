@@ -13,12 +13,25 @@ import psycopg2
 from psycopg2.extras import Json
 
 from app.database import get_database_uri
+from app.json_sql import json_list_response
+from app.json_sql import model_test_json
+from app.json_sql import use_database_json
+from app.msgpack_encoding import request_body
+from app.query_params import ListQuery
+from app.query_params import parse_bool
 from app.schemas import ModelTest
 from app.schemas import ModelTestSchema
 from app.schemas import ValidationError
 
 blueprint = Blueprint("model_tests", __name__)
 
+FILTER_TYPES = {
+    "project_id" : int,
+    "parameter_set_id" : int,
+    "model_id" : int,
+    "passed_testing" : parse_bool,
+}
+
 @blueprint.route('/v1/model_tests', methods=["POST"])
 def create_model_test():
     """
@@ -26,7 +39,7 @@ def create_model_test():
     :return: The ID of the newly created model test, status code
     """
     try:
-        model_test = ModelTestSchema().load(request.get_json())
+        model_test = ModelTestSchema().load(request_body())
     except ValidationError as err:
         return jsonify(err.messages), 400
 
@@ -57,15 +70,27 @@ def create_model_test():
 @blueprint.route('/v1/model_tests', methods=["GET"])
 def list_model_tests():
     """
-    Retrieve all model tests from Ringling
+    Retrieve all model tests from Ringling, or only those listed in the ids query argument
+    or matching the filter query arguments, optionally one page at a time
     :return: The model tests as a JSON object
     """
+    try:
+        list_query = ListQuery("test_id", FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    if use_database_json():
+        return json_list_response("model_tests", list_query, model_test_json("model_tests"))
+
+    where, params = list_query.sql()
+    query = 'SELECT test_id, project_id, parameter_set_id, ' \
+            'model_id, test_timestamp, test_metrics, ' \
+            'passed_testing, metadata FROM model_tests' + where
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            cur.execute('SELECT test_id, project_id, parameter_set_id, '
-                        'model_id, test_timestamp, test_metrics, '
-                        'passed_testing, metadata FROM model_tests')
+            cur.execute(query, params)
 
             tests = [
                 ModelTest(project_id, parameter_set_id, model_id,
@@ -76,7 +101,10 @@ def list_model_tests():
 
     conn.close()
 
-    return jsonify({ "model_tests" : tests })
+    response = list_query.update_response({ "model_tests" : tests },
+                                          [t.test_id for t in tests])
+
+    return jsonify(response)
 
 @blueprint.route('/v1/model_tests/<int:test_id>', methods=["GET"])
 def get_model_test_by_id(test_id):
@@ -0,0 +1,170 @@
+"""
+MessagePack request and response bodies
+A request whose Content-Type is application/msgpack has its body decoded as
+MessagePack, and a client whose Accept header prefers application/msgpack
+to application/json gets MessagePack responses.  Timestamps travel as
+MessagePack timestamps, which hold UTC times, and hex encoded model objects
+as binary; every other value is encoded as it is in JSON.  Without the
+msgpack package, responses are JSON and MessagePack bodies are rejected.
+"""
+
+import datetime as dt
+import re
+
+from flask import has_request_context
+from flask import request
+from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import UnsupportedMediaType
+
+from app.streaming_json import parse_json_object
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = {MSGPACK_MIMETYPE, "application/x-msgpack", "application/vnd.msgpack"}
+MODEL_OBJECT_KEY = "model_object"
+EPOCH = dt.datetime(1970, 1, 1)
+
+# only lowercase hex survives the round trip through binary unchanged
+HEX_PATTERN = re.compile("(?:[0-9a-f]{2})*")
+
+def wants_msgpack():
+    """
+    Check if the client of the current request prefers MessagePack responses
+    :return: True if msgpack is installed and the Accept header ranks
+    application/msgpack above application/json
+    """
+    if msgpack is None or not has_request_context():
+        return False
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE]) \
+        == MSGPACK_MIMETYPE
+
+def is_msgpack_request():
+    """
+    Check if the body of the current request is MessagePack
+    :return: True if its Content-Type is a MessagePack media type
+    """
+    return request.mimetype in MSGPACK_MIMETYPES
+
+def binary_model_object(model_object):
+    """
+    Get the bytes a hex encoded model object stands for
+    :param model_object: The model object string, or None
+    :return: The bytes, or the model object unchanged if it is not lowercase hex
+    """
+    if isinstance(model_object, str) and HEX_PATTERN.fullmatch(model_object):
+        return bytes.fromhex(model_object)
+    return model_object
+
+def default(obj):
+    """
+    Convert an object msgpack does not support
+    :param obj: The object to encode
+    :return: The MessagePack timestamp of a datetime, where one without a time zone is UTC
+    """
+    if isinstance(obj, dt.datetime):
+        if obj.tzinfo is not None:
+            obj = obj.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        # from the timedelta rather than a float timestamp, to keep every microsecond
+        delta = obj - EPOCH
+        return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+def packb(obj, dump=None):
+    """
+    Encode data as MessagePack
+    :param obj: The data to encode
+    :param dump: A function that converts other objects to dictionaries, or
+    raises TypeError for objects it does not support
+    :return: The MessagePack bytes
+    """
+    def convert(value):
+        if dump is not None and not isinstance(value, dt.datetime):
+            return dump(value)
+        return default(value)
+
+    return msgpack.packb(obj, default=convert, use_bin_type=True)
+
+def check_json_values(key, value):
+    """
+    Check that a nested value holds only values JSON can hold
+    :param key: The field the value is in, for the error message
+    :param value: The dictionary or list
+    :return: None
+    :raises ValueError: if a timestamp or binary value is nested in it
+    """
+    values = value.values() if isinstance(value, dict) else value
+    for item in values:
+        if isinstance(item, (msgpack.Timestamp, bytes)):
+            raise ValueError(f"{key} must only hold JSON values")
+        if isinstance(item, (dict, list)):
+            check_json_values(key, item)
+
+def from_msgpack(record):
+    """
+    Convert the fields of a decoded record back to those the schemas load.
+    Only the fields of the record itself are converted; maps nested in it,
+    such as metadata, are stored as JSON and must only hold JSON values.
+    :param record: The dictionary of the record
+    :return: The dictionary, with timestamps as datetimes without a time zone
+    in UTC and a binary model object as hex
+    :raises ValueError: if a nested value is a timestamp or binary
+    """
+    for key, value in record.items():
+        if isinstance(value, msgpack.Timestamp):
+            record[key] = value.to_datetime().replace(tzinfo=None)
+        elif key == MODEL_OBJECT_KEY and isinstance(value, bytes):
+            record[key] = value.hex()
+        elif isinstance(value, (dict, list)):
+            check_json_values(key, value)
+    return record
+
+def unpack_request():
+    """
+    Decode the MessagePack body of the current request
+    :return: The decoded body, with the fields of a map converted by from_msgpack
+    :raises ValueError: if the body is not valid MessagePack
+    """
+    if msgpack is None:
+        raise UnsupportedMediaType("MessagePack bodies need the msgpack package")
+    try:
+        body = msgpack.unpackb(request.get_data())
+        return from_msgpack(body) if isinstance(body, dict) else body
+    except (ValueError, msgpack.UnpackException) as err:
+        raise ValueError(f"Invalid MessagePack body: {err}") from err
+
+def request_body():
+    """
+    Decode the body of the current request, as MessagePack if its Content-Type
+    says so and as JSON otherwise
+    :return: The decoded body
+    """
+    if not is_msgpack_request():
+        return request.get_json()
+    try:
+        return unpack_request()
+    except ValueError as err:
+        raise BadRequest(str(err)) from err
+
+def request_record():
+    """
+    Read the object in the body of a create request.  A JSON body is parsed
+    incrementally, with large string values spooled to disk, and a
+    MessagePack body is decoded whole.
+    :return: The dictionary of the object
+    :raises ValueError: if the body cannot be decoded or is not an object
+    """
+    if not is_msgpack_request():
+        try:
+            return parse_json_object(request.stream)
+        except ValueError as err:
+            raise ValueError(f"Invalid JSON body: {err}") from err
+
+    record = unpack_request()
+    if not isinstance(record, dict):
+        raise ValueError("Expected a MessagePack map")
+    return record
@@ -14,37 +14,91 @@ from flask.json import jsonify
 import psycopg2
 from psycopg2.extras import Json
 
+from app.artifacts import copy_text
+from app.artifacts import digest_text
+from app.artifacts import UPLOAD_TABLE
+from app.bulk_updates import bulk_response
+from app.bulk_updates import BulkUpdate
 from app.database import get_database_uri
+from app.json_sql import json_list_response
+from app.json_sql import parameter_set_json
+from app.json_sql import use_database_json
+from app.msgpack_encoding import is_msgpack_request
+from app.msgpack_encoding import request_body
+from app.msgpack_encoding import request_record
+from app.query_params import ListQuery
+from app.query_params import parse_bool
 from app.schemas import ParameterSet
+from app.schemas import ParameterSetBulkPatchSchema
 from app.schemas import ParameterSetPatch
 from app.schemas import ParameterSetPatchSchema
 from app.schemas import ParameterSetSchema
 from app.schemas import ValidationError
+from app.streaming_json import SpooledString
 
 blueprint = Blueprint("parameter_sets", __name__)
 
+FILTER_TYPES = {
+    "project_id" : int,
+    "is_active" : parse_bool,
+}
+
+BULK_UPDATE = BulkUpdate("parameter_sets", "parameter_set_id", {
+    "project_id" : "project_id = %s",
+    "is_active" : "is_active = %s",
+})
+
 @blueprint.route('/v1/parameter_sets', methods=["POST"])
 def create_parameter_set():
     """
-    Create a new parameter set in Ringling
+    Create a new parameter set in Ringling.  The JSON body is parsed
+    incrementally, and a large training_parameters string is spooled to disk
+    and streamed into the database instead of being built as one string.  A
+    MessagePack body is decoded whole.
     :return: The ID of the newly created parameter set, status code
     """
+    if not request.is_json and not is_msgpack_request():
+        return jsonify({"error": "Expected a JSON or MessagePack body"}), 415
+
+    try:
+        record = request_record()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    training_parameters = record.get("training_parameters")
+    spooled = isinstance(training_parameters, SpooledString)
     try:
-        record = request.get_json()
-        parameter_set = ParameterSetSchema().load(record)
+        parameter_set = ParameterSetSchema().load({**record, "training_parameters": ""}
+                                                  if spooled else record)
     except ValidationError as err:
         return jsonify(err.messages), 400
 
+    if spooled:
+        try:
+            digest_text(training_parameters.reader())
+        except ValueError as err:
+            return jsonify({"error": f"training_parameters {err}"}), 400
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            cur.execute('INSERT INTO parameter_sets (project_id, training_parameters, '
-                        'is_active, metadata)'
-                        ' VALUES (%s, %s, %s, %s) RETURNING parameter_set_id',
-                        (parameter_set.project_id,
-                         Json(parameter_set.training_parameters),
-                         parameter_set.is_active,
-                         Json(parameter_set.metadata)))
+            if spooled:
+                copy_text(cur, training_parameters.reader())
+                cur.execute('INSERT INTO parameter_sets (project_id, training_parameters, '
+                            'is_active, metadata)'
+                            ' SELECT %s, to_jsonb(value), %s, %s::jsonb'
+                            f' FROM {UPLOAD_TABLE} RETURNING parameter_set_id',
+                            (parameter_set.project_id,
+                             parameter_set.is_active,
+                             Json(parameter_set.metadata)))
+            else:
+                cur.execute('INSERT INTO parameter_sets (project_id, training_parameters, '
+                            'is_active, metadata)'
+                            ' VALUES (%s, %s, %s, %s) RETURNING parameter_set_id',
+                            (parameter_set.project_id,
+                             Json(parameter_set.training_parameters),
+                             parameter_set.is_active,
+                             Json(parameter_set.metadata)))
 
             parameter_set_id = cur.fetchone()[0]
 
@@ -56,14 +110,27 @@ def create_parameter_set():
 @blueprint.route('/v1/parameter_sets', methods=["GET"])
 def list_parameter_sets():
     """
-    Retrieve all parameter sets from Ringling
+    Retrieve all parameter sets from Ringling, or only those listed in the ids query argument
+    or matching the filter query arguments, optionally one page at a time
     :return: The parameter sets as a JSON object
     """
+    try:
+        list_query = ListQuery("parameter_set_id", FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    if use_database_json():
+        return json_list_response("parameter_sets", list_query,
+                                  parameter_set_json("parameter_sets"))
+
+    where, params = list_query.sql()
+    query = 'SELECT parameter_set_id, project_id, ' \
+            'training_parameters, is_active, metadata FROM parameter_sets' + where
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            cur.execute('SELECT parameter_set_id, project_id, '
-                        'training_parameters, is_active, metadata FROM parameter_sets')
+            cur.execute(query, params)
 
             parameter_sets = [
                 ParameterSet(project_id, params, is_active, metadata, parameter_set_id) \
@@ -72,7 +139,10 @@ def list_parameter_sets():
 
     conn.close()
 
-    return jsonify({ "parameter_sets" : parameter_sets })
+    response = list_query.update_response({ "parameter_sets" : parameter_sets },
+                                          [p.parameter_set_id for p in parameter_sets])
+
+    return jsonify(response)
 
 @blueprint.route('/v1/parameter_sets/<int:parameter_set_id>', methods=["GET"])
 def get_parameter_set(parameter_set_id):
@@ -106,7 +176,7 @@ def update_parameter_set_status(parameter_set_id):
     :return: the patched parameter set
     """
     try:
-        patch = ParameterSetPatchSchema().load(request.get_json())
+        patch = ParameterSetPatchSchema().load(request_body())
     except ValidationError as err:
         return jsonify(err.messages), 400
 
@@ -127,3 +197,18 @@ def update_parameter_set_status(parameter_set_id):
     conn.close()
 
     return jsonify(patch)
+
+@blueprint.route('/v1/parameter_sets', methods=["PATCH"])
+def update_parameter_sets_status():
+    """
+    Update the activity status of the parameter sets listed in ids or matching
+    filter with one statement.  Parameter sets that already have the status are
+    left alone.  With dry_run, the parameter sets are only found.
+    :return: The count and IDs of the updated parameter sets
+    """
+    try:
+        patch = ParameterSetBulkPatchSchema().load(request_body())
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    return jsonify(bulk_response(patch, BULK_UPDATE.apply(patch)))
@@ -5,6 +5,7 @@ Used to perform actions with regard to Ringling projects
 import datetime as dt
 
 from flask import Blueprint
+from flask import current_app
 
 from flask import request
 from flask.json import jsonify
@@ -12,13 +13,35 @@ from flask.json import jsonify
 import psycopg2
 from psycopg2.extras import Json
 
+from app.coalescing import SingleFlight
 from app.database import get_database_uri
+from app.deployed_models import deployed_model_cache
+from app.json_sql import document_response
+from app.json_sql import json_list_response
+from app.json_sql import model_test_json
+from app.json_sql import parameter_set_json
+from app.json_sql import project_json
+from app.json_sql import trained_model_json
+from app.json_sql import use_database_json
+from app.msgpack_encoding import MSGPACK_MIMETYPE
+from app.msgpack_encoding import request_body
+from app.msgpack_encoding import wants_msgpack
+from app.query_params import ListQuery
+from app.query_params import LIMIT_KEY
+from app.query_params import MAX_LIMIT
+from app.query_params import parse_positive_int
 from app.schemas import Project
 from app.schemas import ProjectSchema
+from app.schemas import TrainedModel
 from app.schemas import ValidationError
 
 blueprint = Blueprint("projects", __name__)
 
+deployed_model_flight = SingleFlight("deployed_model")
+
+DEPTH_KEY = "depth"
+MAX_DEPTH = 2
+
 @blueprint.route('/v1/projects', methods=["POST"])
 def create_project():
     """
@@ -26,7 +49,7 @@ def create_project():
     :return: The ID of the newly created project, status code
     """
     try:
-        record = request.get_json()
+        record = request_body()
         project = ProjectSchema().load(record)
     except ValidationError as err:
         return jsonify(err.messages), 400
@@ -52,13 +75,25 @@ def create_project():
 @blueprint.route('/v1/projects', methods=["GET"])
 def list_projects():
     """
-    Retrieve all projects from Ringling
+    Retrieve all projects from Ringling, or only those listed in the ids query argument,
+    optionally one page at a time
     :return: The projects as a JSON object
     """
+    try:
+        list_query = ListQuery("project_id")
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    if use_database_json():
+        return json_list_response("projects", list_query, project_json("projects"))
+
+    where, params = list_query.sql()
+    query = "SELECT project_id, project_name, metadata FROM projects" + where
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT project_id, project_name, metadata FROM projects")
+            cur.execute(query, params)
 
             projects = [
                 Project(_name,  _metadata, _id,) \
@@ -68,7 +103,10 @@ def list_projects():
     conn.commit()
     conn.close()
 
-    return jsonify({"projects" : projects})
+    response = list_query.update_response({"projects" : projects},
+                                          [p.project_id for p in projects])
+
+    return jsonify(response)
 
 @blueprint.route('/v1/projects/<int:project_id>', methods=["GET"])
 def get_project(project_id):
@@ -93,3 +131,162 @@ def get_project(project_id):
     conn.close()
 
     return jsonify(project)
+
+@blueprint.route('/v1/projects/<int:project_id>/production_model', methods=["GET"])
+def get_production_model(project_id):
+    """
+    Retrieve the current production model of a project, the production model
+    with the highest ID, without its model object
+    :param project_id: The project ID
+    :return: the trained model as a JSON object
+    """
+    return get_deployed_model(project_id, "production")
+
+@blueprint.route('/v1/projects/<int:project_id>/testing_model', methods=["GET"])
+def get_testing_model(project_id):
+    """
+    Retrieve the current testing model of a project, the testing model
+    with the highest ID, without its model object
+    :param project_id: The project ID
+    :return: the trained model as a JSON object
+    """
+    return get_deployed_model(project_id, "testing")
+
+def get_deployed_model(project_id, deployment_stage):
+    """
+    Retrieve the trained model with the highest ID in a deployment stage of a
+    project.  Responses are cached by the worker for each response mimetype,
+    and concurrent misses share one query.
+    :param project_id: The project ID
+    :param deployment_stage: The deployment stage
+    :return: the trained model as a JSON object
+    """
+    mimetype = MSGPACK_MIMETYPE if wants_msgpack() else "application/json"
+    key = (project_id, deployment_stage, mimetype)
+    entry, generation = deployed_model_cache.get(key)
+    if entry is None:
+        def fetch():
+            response = current_app.make_response(
+                find_deployed_model(project_id, deployment_stage))
+            result = (response.get_data(), response.status_code)
+            deployed_model_cache.put(key, generation, result)
+            return result
+        entry = deployed_model_flight.do(key, fetch)
+
+    body, status = entry
+    return current_app.response_class(body, status, mimetype=mimetype)
+
+def find_deployed_model(project_id, deployment_stage):
+    """
+    Query the trained model with the highest ID in a deployment stage of a
+    project, using the partial index of the stage
+    :param project_id: The project ID
+    :param deployment_stage: The deployment stage
+    :return: the trained model as a JSON object, status code
+    """
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT model_id, parameter_set_id, training_data_from, "
+                        "training_data_until, train_timestamp, backtest_timestamp, "
+                        "backtest_metrics, passed_backtesting, metadata, model_digest "
+                        "FROM trained_models "
+                        "WHERE project_id = %s AND deployment_stage = %s "
+                        "ORDER BY model_id DESC LIMIT 1",
+                        (project_id, deployment_stage))
+            result = cur.fetchone()
+
+    conn.close()
+
+    if result is None:
+        return jsonify({"error": f"No {deployment_stage} model "
+                                 f"for project ID {project_id}"}), 404
+
+    model_id, parameter_set_id, data_start, data_end, train_timestamp, \
+        backtest_timestamp, backtest_metrics, passed_backtesting, metadata, digest = result
+    model = TrainedModel(project_id, parameter_set_id, data_start, data_end, None,
+                         train_timestamp, deployment_stage, backtest_timestamp,
+                         backtest_metrics, passed_backtesting, metadata, model_id, digest)
+    return jsonify(model), 200
+
+def overview_query(depth, limit):
+    """
+    Build the query of a project overview.  Lateral joins collect the newest
+    children of the project, and json_agg builds the whole document in the
+    database, returned as text.
+    :param depth: 0 for the project only, 1 to add its parameter sets and trained
+    models, 2 to also add the latest test of each trained model
+    :param limit: The maximum number of parameter sets and of trained models, or None
+    :return: The query and its parameters
+    """
+    fields = [f"'project', {project_json('p')}"]
+    joins = ""
+    params = []
+    if depth >= 1:
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = " LIMIT %s"
+            params += [limit, limit]
+
+        latest_test = "NULL"
+        test_join = ""
+        if depth >= 2:
+            latest_test = "lt.test"
+            test_join = " LEFT JOIN LATERAL (" \
+                        f"SELECT {model_test_json('t')} AS test FROM model_tests t " \
+                        "WHERE t.model_id = m.model_id ORDER BY t.test_id DESC LIMIT 1" \
+                        ") lt ON true"
+
+        fields += ["'parameter_sets', COALESCE(ps.items, '[]'::json)",
+                   "'trained_models', COALESCE(tm.items, '[]'::json)"]
+        joins = " LEFT JOIN LATERAL (" \
+                f"SELECT json_agg({parameter_set_json('s', False)} " \
+                "ORDER BY s.parameter_set_id) AS items " \
+                "FROM (SELECT * FROM parameter_sets WHERE project_id = p.project_id " \
+                f"ORDER BY parameter_set_id DESC{limit_clause}) s" \
+                ") ps ON true" \
+                " LEFT JOIN LATERAL (" \
+                f"SELECT json_agg(json_build_object('trained_model', " \
+                f"{trained_model_json('m', False)}, 'latest_test', {latest_test}) " \
+                "ORDER BY m.model_id) AS items " \
+                "FROM (SELECT * FROM trained_models WHERE project_id = p.project_id " \
+                f"ORDER BY model_id DESC{limit_clause}) m{test_join}" \
+                ") tm ON true"
+
+    query = f"SELECT json_build_object({', '.join(fields)})::text " \
+            f"FROM projects p{joins} WHERE p.project_id = %s"
+    return query, params
+
+@blueprint.route('/v1/projects/<int:project_id>/overview', methods=["GET"])
+def get_project_overview(project_id):
+    """
+    Retrieve a project with its parameter sets, its trained models without
+    their model objects, and the latest test of each trained model, with one query
+    :param project_id: The project ID
+    :return: the overview as a JSON object
+    """
+    try:
+        depth = int(request.args.get(DEPTH_KEY, MAX_DEPTH))
+        if not 0 <= depth <= MAX_DEPTH:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": f"{DEPTH_KEY} must be between 0 and {MAX_DEPTH}"}), 400
+    try:
+        limit = parse_positive_int(LIMIT_KEY, MAX_LIMIT)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    query, params = overview_query(depth, limit)
+
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params + [project_id])
+            result = cur.fetchone()
+
+    conn.close()
+
+    if result is None:
+        return jsonify({"error": f"ID {project_id} not found"}), 404
+
+    return document_response(result[0])
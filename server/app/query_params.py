@@ -0,0 +1,177 @@
+"""
+Query string helper methods
+"""
+
+import datetime as dt
+
+from flask import request
+
+IDS_KEY = "ids"
+MAX_IDS = 1000
+LIMIT_KEY = "limit"
+AFTER_ID_KEY = "after_id"
+MAX_LIMIT = 10000
+DEPLOYMENT_STAGES = ["testing", "production", "retired"]
+
+def parse_id_list(arg_name=IDS_KEY):
+    """
+    Parse a comma separated list of integer IDs from the query string
+    :param arg_name: The name of the query string argument
+    :return: The list of IDs without duplicates, or None if the argument was not given
+    """
+    value = request.args.get(arg_name)
+    if value is None:
+        return None
+
+    try:
+        ids = [int(_id) for _id in value.split(",") if _id.strip() != ""]
+    except ValueError as err:
+        raise ValueError(f"{arg_name} must be a comma separated list of integers") from err
+
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"At most {MAX_IDS} {arg_name} can be requested at once")
+
+    return ids
+
+def find_missing_ids(requested_ids, found_ids):
+    """
+    Find the requested IDs that were not returned by a query
+    :param requested_ids: The IDs that were asked for
+    :param found_ids: The IDs that were found
+    :return: The missing IDs in the order they were requested
+    """
+    found_ids = set(found_ids)
+    return [_id for _id in requested_ids if _id not in found_ids]
+
+def parse_bool(value):
+    """
+    Parse a boolean query string value
+    :param value: The string value
+    :return: The boolean
+    """
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise ValueError(f"{value} is not a boolean")
+
+def parse_deployment_stage(value):
+    """
+    Parse a deployment stage query string value
+    :param value: The string value
+    :return: The deployment stage
+    """
+    if value not in DEPLOYMENT_STAGES:
+        raise ValueError(f"{value} is not one of {DEPLOYMENT_STAGES}")
+    return value
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp query string value
+    :param value: The string value
+    :return: The datetime, converted to UTC without a time zone if it has one
+    """
+    try:
+        moment = dt.datetime.fromisoformat(value)
+    except ValueError as err:
+        raise ValueError(f"{value} is not an ISO 8601 timestamp") from err
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return moment
+
+def parse_filters(filter_types):
+    """
+    Parse equality filters from the query string
+    :param filter_types: A dictionary of column name:parsing function of the allowed filters
+    :return: A dictionary of column name:value of the filters that were given
+    """
+    filters = {}
+    for column, parse in filter_types.items():
+        value = request.args.get(column)
+        if value is None:
+            continue
+        try:
+            filters[column] = parse(value)
+        except ValueError as err:
+            raise ValueError(f"Invalid value for {column}: {err}") from err
+    return filters
+
+def parse_positive_int(arg_name, maximum=None):
+    """
+    Parse a positive integer from the query string
+    :param arg_name: The name of the query string argument
+    :param maximum: The largest allowed value
+    :return: The integer, or None if the argument was not given
+    """
+    value = request.args.get(arg_name)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError as err:
+        raise ValueError(f"{arg_name} must be an integer") from err
+    if maximum is None and value < 1:
+        raise ValueError(f"{arg_name} must be a positive integer")
+    if maximum is not None and not 1 <= value <= maximum:
+        raise ValueError(f"{arg_name} must be between 1 and {maximum}")
+    return value
+
+class ListQuery:
+    """
+    The IDs, filters, and page a list endpoint was asked for
+    """
+    def __init__(self, id_column, filter_types=None):
+        """
+        Parse the query string of the current request
+        :param id_column: The primary key column of the listed table
+        :param filter_types: A dictionary of column name:parsing function of the allowed filters
+        """
+        self.id_column = id_column
+        self.ids = parse_id_list()
+        self.filters = parse_filters(filter_types or {})
+        self.limit = parse_positive_int(LIMIT_KEY, MAX_LIMIT)
+        self.after_id = None
+        if self.limit is not None:
+            self.after_id = parse_positive_int(AFTER_ID_KEY)
+
+    def sql(self):
+        """
+        Build the clauses to append to the SELECT of the list endpoint
+        :return: The WHERE, ORDER BY, and LIMIT clauses, and their parameters
+        """
+        clauses = []
+        params = []
+        if self.ids is not None:
+            clauses.append(f"{self.id_column} = ANY(%s)")
+            params.append(self.ids)
+        for column, value in self.filters.items():
+            clauses.append(f"{column} = %s")
+            params.append(value)
+        if self.after_id is not None:
+            clauses.append(f"{self.id_column} > %s")
+            params.append(self.after_id)
+
+        query = ""
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if self.limit is not None:
+            query += f" ORDER BY {self.id_column} LIMIT %s"
+            params.append(self.limit)
+
+        return query, tuple(params)
+
+    def update_response(self, response, found_ids):
+        """
+        Add the missing IDs and the next page cursor to a list response
+        :param response: The response dictionary
+        :param found_ids: The IDs returned by the query, in order
+        :return: The response dictionary
+        """
+        if self.ids is not None:
+            response["missing_ids"] = find_missing_ids(self.ids, found_ids)
+        if self.limit is not None:
+            response["next_after_id"] = None
+            if len(found_ids) == self.limit:
+                response["next_after_id"] = found_ids[-1]
+        return response
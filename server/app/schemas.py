@@ -3,21 +3,41 @@ The schemas module
 Contains the frameworks for all object types stored in Ringling
 """
 
+import datetime as dt
+
 from flask.json.provider import DefaultJSONProvider
 
 from marshmallow import fields
 from marshmallow import post_load
 from marshmallow import Schema
+from marshmallow import validate
+from marshmallow import validates_schema
 
 # import this so it can be imported from this module
 # by users of this module.  this avoids other modules
 # directly depending on marshmallow
 from marshmallow import ValidationError
 
+from app.msgpack_encoding import binary_model_object
+from app.msgpack_encoding import MODEL_OBJECT_KEY
+from app.msgpack_encoding import MSGPACK_MIMETYPE
+from app.msgpack_encoding import packb
+from app.msgpack_encoding import wants_msgpack
+from app.query_params import DEPLOYMENT_STAGES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_BULK_IDS = 10000
+
 class Project:
     """
     Object for the project class fields
     """
+    __slots__ = ("project_id", "project_name", "metadata")
+
     def __init__(self, project_name, metadata, project_id=None):
         """
         Initialize the project
@@ -30,10 +50,21 @@ class Project:
         self.project_id = project_id
         self.metadata = metadata
 
+    def to_dict(self):
+        """
+        Get the fields of the project, as the schema dumps them
+        :return: The dictionary of the fields
+        """
+        return {"project_id" : self.project_id,
+                "project_name" : self.project_name,
+                "metadata" : self.metadata}
+
 class ParameterSet:
     """
     Object for Parameter Set fields
     """
+    __slots__ = ("project_id", "parameter_set_id", "training_parameters", "is_active", "metadata")
+
     def __init__(self, project_id, training_parameters, is_active, metadata, parameter_set_id=None):
         """
         Initialize the parameter set object
@@ -49,10 +80,23 @@ class ParameterSet:
         self.is_active = is_active
         self.metadata = metadata
 
+    def to_dict(self):
+        """
+        Get the fields of the parameter set, as the schema dumps them
+        :return: The dictionary of the fields
+        """
+        return {"project_id" : self.project_id,
+                "parameter_set_id" : self.parameter_set_id,
+                "training_parameters" : self.training_parameters,
+                "is_active" : self.is_active,
+                "metadata" : self.metadata}
+
 class ParameterSetPatch:
     """
     Object for activity status updates for parameter set fields
     """
+    __slots__ = ("is_active", "parameter_set_id")
+
     def __init__(self, is_active, parameter_set_id=None):
         """
         Initialize a parameter set update
@@ -62,15 +106,28 @@ class ParameterSetPatch:
         self.is_active = is_active
         self.parameter_set_id = parameter_set_id
 
+    def to_dict(self):
+        """
+        Get the fields of the parameter set patch, as the schema dumps them
+        :return: The dictionary of the fields
+        """
+        return {"is_active" : self.is_active,
+                "parameter_set_id" : self.parameter_set_id}
 
 class TrainedModel:
     """
     Object for trained models fields
     """
+    __slots__ = ("project_id", "parameter_set_id", "model_id", "training_data_from",
+                 "training_data_until", "model_object", "train_timestamp", "deployment_stage",
+                 "backtest_timestamp", "backtest_metrics", "passed_backtesting", "metadata",
+                 "model_digest")
+
     def __init__(self, project_id, parameter_set_id, training_data_from,
                  training_data_until, model_object,
                  train_timestamp, deployment_stage, backtest_timestamp,
-                 backtest_metrics, passed_backtesting, metadata, model_id=None):
+                 backtest_metrics, passed_backtesting, metadata, model_id=None,
+                 model_digest=None):
         """
         Initialize a new trained model
         :param project_id: The project ID of the trained model
@@ -85,6 +142,7 @@ class TrainedModel:
         :param passed_backtesting: If the model passed backtesting or not
         :param metadata: The metadata for the trained model
         :param model_id: The ID for the model
+        :param model_digest: The SHA-256 hex digest of the model object
         """
         self.project_id = project_id
         self.parameter_set_id = parameter_set_id
@@ -98,12 +156,33 @@ class TrainedModel:
         self.passed_backtesting = passed_backtesting
         self.metadata = metadata
         self.model_id = model_id
+        self.model_digest = model_digest
 
+    def to_dict(self):
+        """
+        Get the fields of the trained model, as the schema dumps them
+        :return: The dictionary of the fields, with datetimes left for the encoder
+        """
+        return {"project_id" : self.project_id,
+                "parameter_set_id" : self.parameter_set_id,
+                "model_id" : self.model_id,
+                "training_data_from" : self.training_data_from,
+                "training_data_until" : self.training_data_until,
+                "model_object" : self.model_object,
+                "train_timestamp" : self.train_timestamp,
+                "deployment_stage" : self.deployment_stage,
+                "backtest_timestamp" : self.backtest_timestamp,
+                "backtest_metrics" : self.backtest_metrics,
+                "passed_backtesting" : self.passed_backtesting,
+                "metadata" : self.metadata,
+                "model_digest" : self.model_digest}
 
 class TrainedModelPatch:
     """
     Object for deployment stage updates for trained models
     """
+    __slots__ = ("deployment_stage", "model_id")
+
     def __init__(self, deployment_stage, model_id=None):
         """
         Initialize a trained model update
@@ -113,10 +192,40 @@ class TrainedModelPatch:
         self.deployment_stage = deployment_stage
         self.model_id = model_id
 
+    def to_dict(self):
+        """
+        Get the fields of the trained model patch, as the schema dumps them
+        :return: The dictionary of the fields
+        """
+        return {"deployment_stage" : self.deployment_stage,
+                "model_id" : self.model_id}
+
+class BulkPatch:
+    """
+    Object for an update applied to many rows, selected by ID or by a filter
+    """
+    __slots__ = ("ids", "filters", "dry_run", "values")
+
+    def __init__(self, ids=None, filters=None, dry_run=False, **values):
+        """
+        Initialize a bulk update
+        :param ids: The IDs of the rows to update
+        :param filters: A dictionary of filter name:value that the rows to update must match
+        :param dry_run: If the matching rows should only be reported, not updated
+        :param values: The new values of the updated columns
+        """
+        self.ids = ids
+        self.filters = filters
+        self.dry_run = dry_run
+        self.values = values
+
 class ModelTest:
     """
     Object for model test fields
     """
+    __slots__ = ("model_id", "project_id", "parameter_set_id", "test_id", "test_timestamp",
+                 "test_metrics", "passed_testing", "metadata")
+
     def __init__(self, project_id, parameter_set_id, model_id, test_timestamp,
                  test_metrics, passed_testing, metadata, test_id=None):
         """
@@ -139,6 +248,85 @@ class ModelTest:
         self.passed_testing = passed_testing
         self.metadata = metadata
 
+    def to_dict(self):
+        """
+        Get the fields of the model test, as the schema dumps them
+        :return: The dictionary of the fields, with datetimes left for the encoder
+        """
+        return {"model_id" : self.model_id,
+                "project_id" : self.project_id,
+                "parameter_set_id" : self.parameter_set_id,
+                "test_id" : self.test_id,
+                "test_timestamp" : self.test_timestamp,
+                "test_metrics" : self.test_metrics,
+                "passed_testing" : self.passed_testing,
+                "metadata" : self.metadata}
+
+class ModelAlias:
+    """
+    Object for a named pointer from a project to one of its trained models
+    """
+    __slots__ = ("model_id", "project_id", "alias", "change_id", "updated_at")
+
+    def __init__(self, model_id, project_id=None, alias=None, change_id=None, updated_at=None):
+        """
+        Initialize a model alias
+        :param model_id: The ID of the trained model the alias points to
+        :param project_id: The project ID of the alias
+        :param alias: The name of the alias, e.g. champion
+        :param change_id: The ID of the change that last set the alias, used as its ETag
+        :param updated_at: When the alias was last set
+        """
+        self.model_id = model_id
+        self.project_id = project_id
+        self.alias = alias
+        self.change_id = change_id
+        self.updated_at = updated_at
+
+    def to_dict(self):
+        """
+        Get the fields of the model alias, as the schema dumps them
+        :return: The dictionary of the fields, with datetimes left for the encoder
+        """
+        return {"model_id" : self.model_id,
+                "project_id" : self.project_id,
+                "alias" : self.alias,
+                "change_id" : self.change_id,
+                "updated_at" : self.updated_at}
+
+class Change:
+    """
+    Object for an entry of the change feed
+    """
+    __slots__ = ("change_id", "changed_at", "project_id", "change_type", "body")
+
+    def __init__(self, change_id, changed_at, project_id, change_type, body):
+        """
+        Initialize a change
+        :param change_id: The ID of the change, increasing in commit order of the inserts
+        :param changed_at: When the change was made
+        :param project_id: The project ID the change belongs to
+        :param change_type: What was changed, e.g. alias
+        :param body: The new values
+        """
+        self.change_id = change_id
+        self.changed_at = changed_at
+        self.project_id = project_id
+        self.change_type = change_type
+        self.body = body
+
+    def to_dict(self):
+        """
+        Get the fields of the change feed entry, as the schema dumps them
+        :return: The dictionary of the fields, with datetimes left for the encoder
+        """
+        return {"change_id" : self.change_id,
+                "changed_at" : self.changed_at,
+                "project_id" : self.project_id,
+                "change_type" : self.change_type,
+                "body" : self.body}
+
+
 class ProjectSchema(Schema):
     """
     Schema for projects
@@ -210,6 +398,7 @@ class TrainedModelSchema(Schema):
     backtest_metrics = fields.Raw(required=True)
     passed_backtesting = fields.Boolean(required=True)
     metadata = fields.Raw(required=True)
+    model_digest = fields.String(dump_only=True)
 
     @post_load
     def make_trained_model(self, data, **kwargs):
@@ -239,6 +428,102 @@ class TrainedModelPatchSchema(Schema):
         return TrainedModelPatch(**data)
 
 
+class ModelAliasSchema(Schema):
+    """
+    Schema for model aliases
+    """
+    model_id = fields.Integer(required=True)
+    project_id = fields.Integer(dump_only=True)
+    alias = fields.String(dump_only=True)
+    change_id = fields.Integer(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
+
+    @post_load
+    def make_model_alias(self, data, **kwargs):
+        """
+        Create a model alias
+        :param data: Data for the model alias
+        :param kwargs: Additional keyword arguments
+        :return: A ready model alias
+        """
+        return ModelAlias(**data)
+
+class ChangeSchema(Schema):
+    """
+    Schema for change feed entries, which are only dumped
+    """
+    change_id = fields.Integer()
+    changed_at = fields.DateTime()
+    project_id = fields.Integer()
+    change_type = fields.String()
+    body = fields.Raw()
+
+class BulkPatchSchema(Schema):
+    """
+    Base schema for bulk updates.  Exactly one of ids and filter must be given.
+    """
+    ids = fields.List(fields.Integer(), validate=validate.Length(min=1, max=MAX_BULK_IDS))
+    dry_run = fields.Boolean(load_default=False)
+
+    @validates_schema
+    def validate_selection(self, data, **kwargs):
+        """
+        Make sure the rows to update are selected one way
+        :param data: Data for the bulk update
+        :param kwargs: Additional keyword arguments
+        :return: None
+        """
+        if ("ids" in data) == ("filters" in data):
+            raise ValidationError("Exactly one of ids and filter is required")
+        if "filters" in data and not data["filters"]:
+            raise ValidationError("filter must have at least one field", "filter")
+
+    @post_load
+    def make_bulk_patch(self, data, **kwargs):
+        """
+        Create a bulk update
+        :param data: Data for the bulk update
+        :param kwargs: Additional keyword arguments
+        :return: A ready bulk update
+        """
+        return BulkPatch(**data)
+
+class TrainedModelFilterSchema(Schema):
+    """
+    Schema for the filter of bulk trained model updates
+    """
+    project_id = fields.Integer()
+    parameter_set_id = fields.Integer()
+    deployment_stage = fields.String(validate=validate.OneOf(DEPLOYMENT_STAGES))
+    passed_backtesting = fields.Boolean()
+    train_timestamp_before = fields.DateTime()
+
+class TrainedModelBulkPatchSchema(BulkPatchSchema):
+    """
+    Schema for bulk deployment stage updates of trained models.  Moving models
+    to production takes the promote endpoint, which keeps one production model
+    per project and records the change.
+    """
+    deployment_stage = fields.String(required=True, validate=validate.OneOf(
+        [stage for stage in DEPLOYMENT_STAGES if stage != "production"],
+        error="Must be one of: {choices}.  Use POST /v1/trained_models/<model_id>/promote "
+              "to move a trained model to production."))
+    filters = fields.Nested(TrainedModelFilterSchema, data_key="filter")
+
+class ParameterSetFilterSchema(Schema):
+    """
+    Schema for the filter of bulk parameter set updates
+    """
+    project_id = fields.Integer()
+    is_active = fields.Boolean()
+
+class ParameterSetBulkPatchSchema(BulkPatchSchema):
+    """
+    Schema for bulk activity status updates of parameter sets
+    """
+    is_active = fields.Boolean(required=True)
+    filters = fields.Nested(ParameterSetFilterSchema, data_key="filter")
+
 class ModelTestSchema(Schema):
     """
     Schema for model tests
@@ -262,28 +547,86 @@ class ModelTestSchema(Schema):
         """
         return ModelTest(**data)
 
+# The to_dict methods build the same dictionaries as the schemas' dump
+# methods, without a marshmallow pass per object
+DUMPERS = {cls : cls.to_dict for cls in [Project, ParameterSet, ParameterSetPatch, TrainedModel,
+                                         TrainedModelPatch, ModelTest, ModelAlias, Change]}
+
 class CustomJSONProvider(DefaultJSONProvider):
     """
-    Convert schemas to json objects
+    Convert Ringling objects to JSON with their to_dict methods, encoding with orjson
+    when it is installed and with the standard library otherwise.  Responses
+    to clients that prefer MessagePack are encoded as MessagePack instead.
     """
     @staticmethod
     def default(obj):
         """
-        Method to convert schema objects to json
+        Convert an object the encoder does not support
         :param obj: The object to dump
-        :return: JSON with all the values according to the schema
-        """
-        if isinstance(obj, Project):
-            return ProjectSchema().dump(obj)
-        if isinstance(obj, ParameterSetPatch):
-            return ParameterSetPatchSchema().dump(obj)
-        if isinstance(obj, ParameterSet):
-            return ParameterSetSchema().dump(obj)
-        if isinstance(obj, TrainedModel):
-            return TrainedModelSchema().dump(obj)
-        if isinstance(obj, TrainedModelPatch):
-            return TrainedModelPatchSchema().dump(obj)
-        if isinstance(obj, ModelTest):
-            return ModelTestSchema().dump(obj)
+        :return: A dictionary of the fields of a Ringling object, or the ISO 8601
+        string of a datetime
+        """
+        dump = DUMPERS.get(type(obj))
+        if dump is not None:
+            return dump(obj)
+        if isinstance(obj, dt.datetime):
+            return obj.isoformat()
 
         return DefaultJSONProvider.default(obj)
+
+    @staticmethod
+    def msgpack_dump(obj):
+        """
+        Convert a Ringling object for MessagePack
+        :param obj: The object to dump
+        :return: A dictionary of the fields of the object, with its model object as binary
+        """
+        dump = DUMPERS.get(type(obj))
+        if dump is None:
+            raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+        values = dump(obj)
+        if MODEL_OBJECT_KEY in values:
+            values[MODEL_OBJECT_KEY] = binary_model_object(values[MODEL_OBJECT_KEY])
+        return values
+
+    def orjson_options(self):
+        """
+        Get the orjson options matching the provider's settings
+        :return: The options
+        """
+        options = 0
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON
+        :param obj: The data to serialize
+        :param kwargs: Arguments of json.dumps, which use the standard library
+        :return: The JSON string
+        """
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.orjson_options()).decode()
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the arguments as JSON in a response, encoded straight to bytes with orjson
+        :param args: A single value or several values to put in a list
+        :param kwargs: Keyword arguments to put in a dictionary
+        :return: The response
+        """
+        if wants_msgpack():
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(packb(obj, self.msgpack_dump),
+                                            mimetype=MSGPACK_MIMETYPE)
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.orjson_options() | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=options),
+                                        mimetype=self.mimetype)
@@ -0,0 +1,347 @@
+"""
+Incremental parsing of JSON request bodies
+Large top-level string values are spooled to temporary files instead of
+being built as Python strings
+"""
+
+import json
+import re
+import tempfile
+
+SPOOL_THRESHOLD = 1024 * 1024
+READ_SIZE = 64 * 1024
+
+WHITESPACE = b" \t\r\n"
+# quotes, backslashes, and the control characters JSON strings must escape
+STRING_SPECIAL = re.compile(rb'["\\\x00-\x1f]')
+VALUE_SPECIAL = re.compile(rb'["{}\[\],]')
+ESCAPES = {
+    ord('"'): b'"',
+    ord("\\"): b"\\",
+    ord("/"): b"/",
+    ord("b"): b"\b",
+    ord("f"): b"\f",
+    ord("n"): b"\n",
+    ord("r"): b"\r",
+    ord("t"): b"\t",
+}
+
+class SpooledString:
+    """
+    A JSON string value that was written to a temporary file as UTF-8
+    """
+    def __init__(self, file):
+        """
+        Initialize the spooled string
+        :param file: The binary temporary file holding the string
+        """
+        self.file = file
+
+    def reader(self):
+        """
+        Rewind the file to read the string from the start
+        :return: The binary file
+        """
+        self.file.seek(0)
+        return self.file
+
+class StringSink:
+    """
+    Collects the bytes of a string value, moving them to a temporary file
+    once they pass the spool threshold
+    """
+    def __init__(self, spool_threshold):
+        """
+        Initialize the sink
+        :param spool_threshold: The size in bytes after which the string is spooled,
+        or None to keep it in memory
+        """
+        self.spool_threshold = spool_threshold
+        self.buffer = bytearray()
+        self.file = None
+
+    def write(self, data):
+        """
+        Add bytes to the string
+        :param data: The bytes
+        :return: None
+        """
+        if self.file is not None:
+            self.file.write(data)
+            return
+        self.buffer += data
+        if self.spool_threshold is not None and len(self.buffer) > self.spool_threshold:
+            self.file = tempfile.TemporaryFile()
+            self.file.write(self.buffer)
+            self.buffer = None
+
+    def value(self):
+        """
+        Get the finished string
+        :return: A str, or a SpooledString if it was spooled
+        """
+        if self.file is not None:
+            return SpooledString(self.file)
+        try:
+            return self.buffer.decode("utf-8")
+        except UnicodeDecodeError as err:
+            raise ValueError(f"String is not valid UTF-8: {err}") from err
+
+class StreamingJSONParser:
+    """
+    Parses a JSON object from a binary stream a block at a time
+    """
+    def __init__(self, stream, spool_threshold=SPOOL_THRESHOLD, read_size=READ_SIZE):
+        """
+        Initialize the parser
+        :param stream: The binary stream of the JSON document
+        :param spool_threshold: The size in bytes after which top-level strings are spooled
+        :param read_size: The number of bytes to read from the stream at once
+        """
+        self.stream = stream
+        self.spool_threshold = spool_threshold
+        self.read_size = read_size
+        self.buf = b""
+        self.pos = 0
+        # the offset in the stream of the start of buf
+        self.offset = 0
+
+    def parse_object(self):
+        """
+        Parse the document, which must be a single JSON object
+        :return: A dictionary of its fields.  Top-level strings longer than
+        spool_threshold are SpooledString objects; other values are parsed with json.loads.
+        """
+        self.skip_whitespace()
+        self.expect(b"{")
+        result = {}
+
+        self.skip_whitespace()
+        if self.peek() == ord("}"):
+            self.pos += 1
+        else:
+            while True:
+                self.skip_whitespace()
+                self.expect(b'"')
+                key = self.read_string(None)
+                self.skip_whitespace()
+                self.expect(b":")
+                self.skip_whitespace()
+                if self.peek() == ord('"'):
+                    self.pos += 1
+                    result[key] = self.read_string(self.spool_threshold)
+                else:
+                    start = self.position()
+                    try:
+                        result[key] = json.loads(self.read_raw_value())
+                    except json.JSONDecodeError as err:
+                        raise ValueError(f"{err.msg} at byte {start + err.pos}") from err
+
+                self.skip_whitespace()
+                if self.peek() == ord("}"):
+                    self.pos += 1
+                    break
+                self.expect(b",")
+
+        self.skip_whitespace()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected data after the JSON object at byte {self.position()}")
+        return result
+
+    def position(self):
+        """
+        Get the offset in the stream of the next byte
+        :return: The offset in bytes
+        """
+        return self.offset + self.pos
+
+    def fill(self):
+        """
+        Read the next block of the stream, dropping the consumed part of the buffer
+        :return: If any bytes were read
+        """
+        data = self.stream.read(self.read_size)
+        if not data:
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def ensure(self, count):
+        """
+        Make sure the buffer holds at least count unconsumed bytes
+        :param count: The number of bytes
+        :return: None
+        """
+        while len(self.buf) - self.pos < count:
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON")
+
+    def peek(self):
+        """
+        Get the next byte without consuming it
+        :return: The byte as an integer, or None at the end of the stream
+        """
+        if self.pos == len(self.buf) and not self.fill():
+            return None
+        return self.buf[self.pos]
+
+    def expect(self, char):
+        """
+        Consume the next byte, which must be char
+        :param char: The expected byte
+        :return: None
+        """
+        if self.peek() != char[0]:
+            raise ValueError(f"Expected {char.decode()} at byte {self.position()}")
+        self.pos += 1
+
+    def skip_whitespace(self):
+        """
+        Consume whitespace
+        :return: None
+        """
+        while True:
+            char = self.peek()
+            if char is None or char not in WHITESPACE:
+                return
+            self.pos += 1
+
+    def read_string(self, spool_threshold):
+        """
+        Read and unescape a string whose opening quote was consumed
+        :param spool_threshold: The size in bytes after which the string is spooled,
+        or None to keep it in memory
+        :return: A str, or a SpooledString if it was spooled
+        """
+        sink = StringSink(spool_threshold)
+        while True:
+            match = STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                sink.write(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                self.ensure(1)
+                continue
+
+            sink.write(self.buf[self.pos:match.start()])
+            self.pos = match.start()
+            self.check_not_control()
+            self.pos += 1
+            if match.group() == b'"':
+                return sink.value()
+            sink.write(self.read_escape())
+
+    def check_not_control(self):
+        """
+        Check that the next byte, inside a string, is not a control
+        character, which JSON only allows escaped
+        :return: None
+        """
+        if self.buf[self.pos] < 0x20:
+            raise ValueError(f"Invalid control character in string at byte {self.position()}")
+
+    def read_escape(self):
+        """
+        Read an escape sequence whose backslash was consumed
+        :return: The UTF-8 bytes of the escaped character
+        """
+        self.ensure(1)
+        char = self.buf[self.pos]
+        self.pos += 1
+        if char in ESCAPES:
+            return ESCAPES[char]
+        if char != ord("u"):
+            raise ValueError(f"Invalid escape \\{chr(char)} at byte {self.position() - 2}")
+
+        code = self.read_code_unit()
+        if 0xD800 <= code < 0xDC00:
+            self.ensure(2)
+            if self.buf[self.pos:self.pos + 2] != b"\\u":
+                raise ValueError("Unpaired surrogate in string")
+            self.pos += 2
+            low = self.read_code_unit()
+            if not 0xDC00 <= low < 0xE000:
+                raise ValueError("Unpaired surrogate in string")
+            code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+        elif 0xDC00 <= code < 0xE000:
+            raise ValueError("Unpaired surrogate in string")
+        return chr(code).encode("utf-8")
+
+    def read_code_unit(self):
+        """
+        Read the four hex digits of a \\u escape
+        :return: The code unit
+        """
+        self.ensure(4)
+        digits = self.buf[self.pos:self.pos + 4]
+        self.pos += 4
+        try:
+            return int(digits, 16)
+        except ValueError as err:
+            raise ValueError(f"Invalid \\u escape {digits!r}") from err
+
+    def read_raw_value(self):
+        """
+        Read the text of a non-string value, up to the comma or brace that ends it
+        :return: The bytes of the value
+        """
+        raw = bytearray()
+        depth = 0
+        while True:
+            match = VALUE_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                raw += self.buf[self.pos:]
+                self.pos = len(self.buf)
+                if not self.fill():
+                    return bytes(raw)
+                continue
+
+            char = match.group()
+            if depth == 0 and char in (b",", b"}", b"]"):
+                raw += self.buf[self.pos:match.start()]
+                self.pos = match.start()
+                return bytes(raw)
+
+            raw += self.buf[self.pos:match.end()]
+            self.pos = match.end()
+            if char in (b"{", b"["):
+                depth += 1
+            elif char in (b"}", b"]"):
+                depth -= 1
+            elif char == b'"':
+                self.copy_string(raw)
+
+    def copy_string(self, raw):
+        """
+        Copy a string inside a non-string value without unescaping it
+        :param raw: The bytearray to copy to, after the opening quote
+        :return: None
+        """
+        while True:
+            match = STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                raw += self.buf[self.pos:]
+                self.pos = len(self.buf)
+                self.ensure(1)
+                continue
+
+            raw += self.buf[self.pos:match.start()]
+            self.pos = match.start()
+            self.check_not_control()
+            raw += match.group()
+            self.pos += 1
+            if match.group() == b'"':
+                return
+            self.ensure(1)
+            raw += self.buf[self.pos:self.pos + 1]
+            self.pos += 1
+
+def parse_json_object(stream, spool_threshold=SPOOL_THRESHOLD):
+    """
+    Parse a JSON object from a binary stream, spooling large top-level strings to disk
+    :param stream: The binary stream, e.g. request.stream
+    :param spool_threshold: The size in bytes after which top-level strings are spooled
+    :return: A dictionary of the object's fields
+    """
+    return StreamingJSONParser(stream, spool_threshold).parse_object()
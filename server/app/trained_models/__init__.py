@@ -3,109 +3,286 @@ The trained models module
 Used to perform actions with regard to trained models
 """
 import datetime as dt
+import hashlib
+import json
 
 from flask import Blueprint
+from flask import current_app
 
+from flask import make_response
 from flask import request
 from flask.json import jsonify
 
 import psycopg2
 from psycopg2.extras import Json
 
+from app.artifact_cache import ARTIFACT_CACHE_CONFIG
+from app.artifacts import copy_text
+from app.artifacts import copy_text_out
+from app.artifacts import digest_text
+from app.artifacts import open_model_object
+from app.artifacts import GZIP_MIMETYPE
+from app.artifacts import UPLOAD_TABLE
+from app.bulk_updates import bulk_response
+from app.bulk_updates import BulkUpdate
+from app.changes import record_change
+from app.coalescing import coalesce_response
+from app.coalescing import SingleFlight
 from app.database import get_database_uri
+from app.deployed_models import deployed_model_cache
+from app.json_sql import json_list_response
+from app.json_sql import trained_model_json
+from app.json_sql import use_database_json
+from app.msgpack_encoding import is_msgpack_request
+from app.msgpack_encoding import request_body
+from app.msgpack_encoding import request_record
+from app.query_params import ListQuery
+from app.query_params import parse_bool
+from app.query_params import parse_deployment_stage
 from app.schemas import TrainedModel
+from app.schemas import TrainedModelBulkPatchSchema
 from app.schemas import TrainedModelPatch
 from app.schemas import TrainedModelPatchSchema
 from app.schemas import TrainedModelSchema
 from app.schemas import ValidationError
+from app.streaming_json import SpooledString
 
 blueprint = Blueprint("trained_models", __name__)
 
+INCLUDE_MODEL_OBJECT_KEY = "include_model_object"
+PROMOTION_CHANGE_TYPE = "promotion"
+# with the project ID, the advisory lock that serializes promotions within a project
+PROMOTE_LOCK_KEY = 0x50524F4D
+TRAINED_MODEL_PART = "trained_model"
+MODEL_OBJECT_PART = "model_object"
+
+# model_object is last so streamed model objects can be selected from the upload table
+INSERT_COLUMNS = "project_id, parameter_set_id, training_data_from, training_data_until, " \
+                 "model_digest, train_timestamp, deployment_stage, backtest_timestamp, " \
+                 "backtest_metrics, passed_backtesting, metadata, model_object"
+
+BULK_UPDATE = BulkUpdate("trained_models", "model_id", {
+    "project_id" : "project_id = %s",
+    "parameter_set_id" : "parameter_set_id = %s",
+    "deployment_stage" : "deployment_stage = %s",
+    "passed_backtesting" : "passed_backtesting = %s",
+    "train_timestamp_before" : "train_timestamp < %s",
+})
+
+trained_model_flight = SingleFlight("trained_model")
+model_object_flight = SingleFlight("model_object")
+
+FILTER_TYPES = {
+    "project_id" : int,
+    "parameter_set_id" : int,
+    "deployment_stage" : parse_deployment_stage,
+    "passed_backtesting" : parse_bool,
+}
+
+def model_digest(model_object):
+    """
+    Compute the digest that identifies a model object
+    :param model_object: The serialized model object string
+    :return: The SHA-256 hex digest of the UTF-8 encoded string
+    """
+    return hashlib.sha256(model_object.encode("utf-8")).hexdigest()
+
+def insert_values(trained_model, digest):
+    """
+    Get the values of a trained model for the INSERT_COLUMNS before model_object
+    :param trained_model: The trained model
+    :param digest: The digest of its model object
+    :return: A tuple of the values
+    """
+    return (trained_model.project_id,
+            trained_model.parameter_set_id,
+            trained_model.training_data_from,
+            trained_model.training_data_until,
+            digest,
+            trained_model.train_timestamp,
+            trained_model.deployment_stage,
+            trained_model.backtest_timestamp,
+            Json(trained_model.backtest_metrics),
+            trained_model.passed_backtesting,
+            Json(trained_model.metadata))
+
 @blueprint.route('/v1/trained_models', methods=["POST"])
 def create_trained_model():
     """
-    Create a new trained model in Ringling
+    Create a new trained model in Ringling.  The JSON body is parsed
+    incrementally, and a large model_object is spooled to disk and streamed
+    into the database instead of being built as one string.  A MessagePack
+    body is decoded whole.
     :return: The ID of the newly created trained model, status code
     """
+    if request.mimetype == "multipart/form-data":
+        return upload_trained_model()
+    if not request.is_json and not is_msgpack_request():
+        return jsonify({"error": "Expected a JSON or MessagePack body"}), 415
+
     try:
-        trained_model = TrainedModelSchema().load(request.get_json())
+        record = request_record()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    model_object = record.get("model_object")
+    spooled = isinstance(model_object, SpooledString)
+    try:
+        trained_model = TrainedModelSchema().load({**record, "model_object": ""}
+                                                  if spooled else record)
     except ValidationError as err:
         return jsonify(err.messages), 400
 
+    if spooled:
+        return insert_streamed_trained_model(trained_model, model_object.reader)
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            query = "INSERT INTO trained_models (project_id, parameter_set_id, " \
-                    "training_data_from, training_data_until, model_object, train_timestamp, " \
-                    "deployment_stage, backtest_timestamp, " \
-                    "backtest_metrics, passed_backtesting, metadata) " + \
-                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) " + \
+            query = f"INSERT INTO trained_models ({INSERT_COLUMNS}) " + \
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) " + \
                     "RETURNING model_id"
 
             cur.execute(query,
-                        (trained_model.project_id,
-                         trained_model.parameter_set_id,
-                         trained_model.training_data_from,
-                         trained_model.training_data_until,
-                         trained_model.model_object,
-                         trained_model.train_timestamp,
-                         trained_model.deployment_stage,
-                         trained_model.backtest_timestamp,
-                         Json(trained_model.backtest_metrics),
-                         trained_model.passed_backtesting,
-                         Json(trained_model.metadata))
-                        )
+                        insert_values(trained_model, model_digest(trained_model.model_object)) +
+                        (trained_model.model_object,))
+
+            model_id = cur.fetchone()[0]
+
+    conn.commit()
+    conn.close()
+    deployed_model_cache.invalidate(trained_model.project_id)
+
+    return jsonify({"model_id" : model_id}), 201
+
+def upload_trained_model():
+    """
+    Create a new trained model from a multipart/form-data upload.  The
+    trained_model part holds the JSON fields other than model_object, and the
+    model_object file part holds the model object, gzip compressed if its
+    Content-Type is application/gzip.  The form parser spools the file to disk,
+    and it is streamed from there into the database.  A compressed model
+    object that decompresses to more than MAX_CONTENT_LENGTH bytes gets a 413.
+    :return: The ID of the newly created trained model, status code
+    """
+    if TRAINED_MODEL_PART not in request.form or MODEL_OBJECT_PART not in request.files:
+        return jsonify({"error": f"Expected a {TRAINED_MODEL_PART} field and "
+                                 f"a {MODEL_OBJECT_PART} file"}), 400
+
+    try:
+        fields = json.loads(request.form[TRAINED_MODEL_PART])
+        trained_model = TrainedModelSchema().load({**fields, "model_object": ""})
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    except (ValueError, TypeError):
+        return jsonify({"error": f"{TRAINED_MODEL_PART} must be a JSON object"}), 400
+
+    upload = request.files[MODEL_OBJECT_PART]
+    compressed = upload.mimetype == GZIP_MIMETYPE
+    max_size = current_app.config["MAX_CONTENT_LENGTH"]
+    return insert_streamed_trained_model(
+        trained_model, lambda: open_model_object(upload.stream, compressed, max_size))
 
+def insert_streamed_trained_model(trained_model, open_reader):
+    """
+    Insert a trained model whose model object is in a file, streaming it
+    into the database with COPY
+    :param trained_model: The trained model, without its model object
+    :param open_reader: A function with no arguments that returns a binary file
+    of the model object from its start
+    :return: The ID of the newly created trained model, status code
+    """
+    try:
+        digest = digest_text(open_reader())
+    except ValueError as err:
+        return jsonify({"error": f"model_object {err}"}), 400
+
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            copy_text(cur, open_reader())
+            query = f"INSERT INTO trained_models ({INSERT_COLUMNS}) " + \
+                    "SELECT %s, %s, %s, %s, %s, %s, %s::model_deployment_stage, %s, " + \
+                    "%s::jsonb, %s, %s::jsonb, value " + \
+                    f"FROM {UPLOAD_TABLE} RETURNING model_id"
+            cur.execute(query, insert_values(trained_model, digest))
             model_id = cur.fetchone()[0]
 
     conn.commit()
     conn.close()
+    deployed_model_cache.invalidate(trained_model.project_id)
 
     return jsonify({"model_id" : model_id}), 201
 
 @blueprint.route('/v1/trained_models', methods=["GET"])
 def list_models():
     """
-    Retrieve all trained models from Ringling
+    Retrieve all trained models from Ringling, or only those listed in the ids query argument
+    or matching the filter query arguments, optionally one page at a time
     :return: The trained models as a JSON object
     """
+    try:
+        list_query = ListQuery("model_id", FILTER_TYPES)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    if use_database_json():
+        return json_list_response("trained_models", list_query,
+                                  trained_model_json("trained_models"))
+
+    where, params = list_query.sql()
+    query = 'SELECT model_id, project_id, parameter_set_id, ' \
+            'training_data_from, training_data_until, ' \
+            'train_timestamp, deployment_stage, model_object, backtest_timestamp, ' \
+            'backtest_metrics, passed_backtesting, metadata, model_digest' \
+            ' FROM trained_models' + where
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
-            cur.execute('SELECT model_id, project_id, parameter_set_id, '
-                        'training_data_from, training_data_until, '
-                        'train_timestamp, deployment_stage, model_object, backtest_timestamp, '
-                        'backtest_metrics, passed_backtesting, metadata'
-                        ' FROM trained_models')
+            cur.execute(query, params)
 
             models = [
                 TrainedModel(project_id, parameter_set_id, data_start, data_end, model_object,
                              train_timestamp, deployment_stage, backtest_timestamp,
-                             backtest_metrics, passed_backtesting, metadata, model_id)
+                             backtest_metrics, passed_backtesting, metadata, model_id, digest)
                 for model_id, project_id, parameter_set_id, data_start,
                 data_end, train_timestamp, deployment_stage, model_object, backtest_timestamp,
-                backtest_metrics, passed_backtesting, metadata in cur
+                backtest_metrics, passed_backtesting, metadata, digest in cur
             ]
 
     conn.close()
 
-    return jsonify({ "trained_models" : models })
+    response = list_query.update_response({ "trained_models" : models },
+                                          [m.model_id for m in models])
+
+    return jsonify(response)
 
 @blueprint.route('/v1/trained_models/<int:model_id>', methods=["GET"])
+@coalesce_response(trained_model_flight)
 def get_model_by_id(model_id):
     """
-    Retrieve a trained model from Ringling by ID
+    Retrieve a trained model from Ringling by ID.  The model object is left out
+    if the include_model_object query argument is false.  Identical concurrent
+    requests share one query and one serialized response.
     :param model_id: The trained model ID to retrieve
     :return: the trained model as a JSON object
     """
+    try:
+        include_model_object = parse_bool(request.args.get(INCLUDE_MODEL_OBJECT_KEY, "true"))
+    except ValueError as err:
+        return jsonify({"error": f"Invalid value for {INCLUDE_MODEL_OBJECT_KEY}: {err}"}), 400
+
+    model_object_column = "model_object" if include_model_object else "NULL"
+
     uri = get_database_uri()
     with psycopg2.connect(uri) as conn:
         with conn.cursor() as cur:
             query = "SELECT model_id, project_id, parameter_set_id, " \
                     "training_data_from, training_data_until, " \
-                    "model_object, train_timestamp, deployment_stage, " \
-                    "backtest_timestamp, backtest_metrics, passed_backtesting, metadata " + \
-                    "FROM trained_models WHERE model_id = %s"
+                    f"{model_object_column}, train_timestamp, deployment_stage, " \
+                    "backtest_timestamp, backtest_metrics, passed_backtesting, metadata, " \
+                    "model_digest FROM trained_models WHERE model_id = %s"
             cur.execute(query, (model_id,))
             result = cur.fetchone()
             if result is None:
@@ -113,25 +290,104 @@ def get_model_by_id(model_id):
 
             model_id, project_id, parameter_set_id, data_start, data_end, \
                 model_object, train_timestamp, deployment_stage, \
-                backtest_timestamp, backtest_metrics, passed_backtesting, metadata = result
+                backtest_timestamp, backtest_metrics, passed_backtesting, metadata, \
+                digest = result
             model = TrainedModel(project_id, parameter_set_id, data_start,
                                  data_end, model_object, train_timestamp,
                                  deployment_stage, backtest_timestamp,
-                                 backtest_metrics, passed_backtesting, metadata, model_id)
+                                 backtest_metrics, passed_backtesting, metadata, model_id,
+                                 digest)
 
     conn.close()
 
     return jsonify(model)
 
+@blueprint.route('/v1/trained_models/<int:model_id>/model_object', methods=["GET"])
+def get_model_object(model_id):
+    """
+    Retrieve the serialized model object of a trained model from Ringling by ID.
+    The ETag is the digest of the model object, so a request whose If-None-Match
+    holds that digest gets a 304 without the model object being read.  With
+    the artifact cache enabled, the model object is streamed from the database
+    to the cache on the first request and sent from the cached file after that.
+    Concurrent requests for a model object that is not cached, or for any
+    model object with the cache disabled, share one read of it.  A model
+    object larger than the cache, or evicted by another worker before it
+    could be opened, is sent from the database.
+    :param model_id: The trained model ID to retrieve
+    :return: the model object as the body of the response
+    """
+    cache = current_app.config[ARTIFACT_CACHE_CONFIG]
+
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            # octet_length of a text value reads its size without detoasting it
+            cur.execute("SELECT model_digest, octet_length(model_object) FROM trained_models "
+                        "WHERE model_id = %s", (model_id,))
+            result = cur.fetchone()
+            if result is None:
+                return jsonify({"error": f"ID {model_id} not found"}), 404
+            digest, size = result
+
+            if request.if_none_match.contains(digest):
+                response = make_response("", 304)
+            else:
+                file = open_cached_model_object(cache, cur, model_id, digest, size)
+                if file is not None:
+                    response = cache.send(model_id, digest, file)
+                else:
+                    response = make_response(model_object_flight.do(
+                        (model_id, digest), lambda: read_model_object(cur, model_id)))
+                    response.mimetype = "application/octet-stream"
+
+    conn.close()
+
+    response.set_etag(digest)
+    return response
+
+def open_cached_model_object(cache, cur, model_id, digest, size):
+    """
+    Open the cached file of a model object, streaming the model object from
+    the database to the cache first if it is missing
+    :param cache: The ArtifactCache, or None when caching is disabled
+    :param cur: The database cursor
+    :param model_id: The trained model ID
+    :param digest: The digest of the model object
+    :param size: The size of the model object in bytes
+    :return: The binary file, or None if the model object is not cached
+    """
+    if cache is None or not cache.fits(size):
+        return None
+    file = cache.open(model_id, digest)
+    if file is None:
+        model_object_flight.do(("cache", model_id, digest), lambda: cache.fill(
+            model_id, digest, lambda out: copy_text_out(
+                cur, "SELECT model_object FROM trained_models WHERE model_id = %s",
+                (model_id,), out)))
+        file = cache.open(model_id, digest)
+    return file
+
+def read_model_object(cur, model_id):
+    """
+    Read the model object of a trained model
+    :param cur: The database cursor
+    :param model_id: The trained model ID
+    :return: The UTF-8 bytes of the model object
+    """
+    cur.execute("SELECT model_object FROM trained_models WHERE model_id = %s", (model_id,))
+    return cur.fetchone()[0].encode("utf-8")
+
 @blueprint.route('/v1/trained_models/<int:model_id>', methods=["PATCH"])
 def update_trained_model(model_id):
     """
-    Update the deployment status of trained model from Ringling by ID
+    Update the deployment status of trained model from Ringling by ID, dropping
+    the cached production and testing models of its project
     :param model_id: The trained model ID to update
     :return: the patched trained model
     """
     try:
-        patch = TrainedModelPatchSchema().load(request.get_json())
+        patch = TrainedModelPatchSchema().load(request_body())
     except ValidationError as err:
         return jsonify(err.messages), 400
 
@@ -140,7 +396,7 @@ def update_trained_model(model_id):
         with conn.cursor() as cur:
             query = "UPDATE trained_models SET deployment_stage = %s " + \
                     "WHERE model_id = %s " + \
-                    "RETURNING model_id"
+                    "RETURNING model_id, project_id"
 
             cur.execute(query,
                         (patch.deployment_stage,
@@ -149,11 +405,76 @@ def update_trained_model(model_id):
             if result is None:
                 return jsonify({"error": f"ID {model_id} not found"}), 404
 
-            model_id = result[0]
+            model_id, project_id = result
             patch.model_id = model_id
 
     conn.commit()
 
     conn.close()
+    deployed_model_cache.invalidate(project_id)
 
     return jsonify(patch)
+
+@blueprint.route('/v1/trained_models', methods=["PATCH"])
+def update_trained_models():
+    """
+    Update the deployment stage of the trained models listed in ids or matching
+    filter with one statement.  Models already in the stage are left alone.
+    With dry_run, the models are only found.
+    :return: The count and IDs of the updated trained models
+    """
+    try:
+        patch = TrainedModelBulkPatchSchema().load(request_body())
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    rows = BULK_UPDATE.apply(patch)
+    if not patch.dry_run:
+        for project_id in {project_id for _, project_id in rows}:
+            deployed_model_cache.invalidate(project_id)
+
+    return jsonify(bulk_response(patch, rows))
+
+@blueprint.route('/v1/trained_models/<int:model_id>/promote', methods=["POST"])
+def promote_trained_model(model_id):
+    """
+    Move a trained model to production and retire the other production models
+    of its project in one transaction.  Promotions within a project are
+    serialized, and the stages change in a single UPDATE, so readers never see
+    zero or two production models.  The promotion is added to the change feed.
+    :param model_id: The trained model ID to promote
+    :return: The promoted and retired trained model patches, status code
+    """
+    uri = get_database_uri()
+    with psycopg2.connect(uri) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT project_id FROM trained_models WHERE model_id = %s",
+                        (model_id,))
+            result = cur.fetchone()
+            if result is None:
+                return jsonify({"error": f"ID {model_id} not found"}), 404
+            project_id = result[0]
+
+            cur.execute("SELECT pg_advisory_xact_lock(%s, %s)", (PROMOTE_LOCK_KEY, project_id))
+            cur.execute("UPDATE trained_models SET deployment_stage = "
+                        "CASE WHEN model_id = %s THEN 'production' "
+                        "ELSE 'retired' END::model_deployment_stage "
+                        "WHERE model_id = %s "
+                        "OR (project_id = %s AND deployment_stage = 'production') "
+                        "RETURNING model_id, deployment_stage",
+                        (model_id, model_id, project_id))
+            patches = [TrainedModelPatch(stage, _id) for _id, stage in cur]
+            retired = sorted((p for p in patches if p.model_id != model_id),
+                             key=lambda p: p.model_id)
+
+            change_id, _ = record_change(cur, project_id, PROMOTION_CHANGE_TYPE,
+                                         {"model_id" : model_id,
+                                          "retired_model_ids" : [p.model_id for p in retired]})
+
+    conn.commit()
+    conn.close()
+    deployed_model_cache.invalidate(project_id)
+
+    return jsonify({"promoted" : TrainedModelPatch("production", model_id),
+                    "retired" : retired,
+                    "change_id" : change_id})
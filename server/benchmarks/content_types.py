@@ -0,0 +1,87 @@
+"""
+Compare JSON and MessagePack bodies of trained models: the payload size and
+the time to encode and decode them.
+
+Usage: python benchmarks/content_types.py [--objects 1000] [--model-object-bytes 65536]
+       [--repeats 5]
+
+Run from the server directory with msgpack installed.  Each body is a list of
+--objects TrainedModel objects with model objects of --model-object-bytes
+bytes, encoded as the service encodes responses and decoded as it decodes
+requests.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import time
+
+import msgpack
+from flask import Flask
+
+from app.msgpack_encoding import from_msgpack
+from app.msgpack_encoding import packb
+from app.schemas import CustomJSONProvider
+from app.schemas import TrainedModel
+
+def make_models(count, model_object_bytes):
+    """
+    Build trained models like those read from the database
+    :param count: The number of trained models
+    :param model_object_bytes: The size of each model object before hex encoding
+    :return: The list of trained models
+    """
+    now = dt.datetime.now()
+    model_object = os.urandom(model_object_bytes).hex()
+    return [TrainedModel(1, 1, now - dt.timedelta(days=30), now, model_object, now, "testing",
+                         now, {"accuracy" : 0.85, "recall" : 0.5}, True,
+                         {"source" : "benchmark"}, model_id, "0" * 64)
+            for model_id in range(count)]
+
+def best_time(repeats, function, *args):
+    """
+    Measure the best time of a function
+    :param repeats: The number of times to run it
+    :param function: The function
+    :param args: The arguments of the function
+    :return: The best time in seconds and the result of the last run
+    """
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--model-object-bytes", type=int, default=65536)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    provider = CustomJSONProvider(Flask(__name__))
+    models = make_models(args.objects, args.model_object_bytes)
+
+    encodings = {
+        "json" : (lambda: provider.dumps(models).encode("utf-8"), json.loads),
+        "msgpack" : (lambda: packb(models, provider.msgpack_dump),
+                     lambda body: msgpack.unpackb(body, object_hook=from_msgpack)),
+    }
+
+    print(f"{args.objects:,} trained models with {args.model_object_bytes:,} byte model objects")
+    for name, (encode, decode) in encodings.items():
+        encode_time, body = best_time(args.repeats, encode)
+        decode_time, _ = best_time(args.repeats, decode, body)
+        print(f"{name:<8} {len(body):14,} bytes  encode {encode_time * 1000:9.1f} ms  "
+              f"decode {decode_time * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
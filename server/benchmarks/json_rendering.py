@@ -0,0 +1,99 @@
+"""
+Compare the rows per second of list endpoints when the JSON documents are
+built by the database with building them from Python objects and schemas.
+
+Usage: python benchmarks/json_rendering.py [--rows 100000] [--repeats 3]
+
+Run from the server directory with the same POSTGRES_* environment variables
+as the service.  The first run adds --rows trained models and model tests
+under project ID -1 of that database, and later runs reuse them.
+"""
+
+import argparse
+import time
+
+import psycopg2
+
+from app import create_app
+from app.database import get_database_uri
+from app.json_sql import DATABASE_JSON_CONFIG
+
+PROJECT_ID = -1
+
+def add_rows(rows):
+    """
+    Add trained models and model tests to the benchmark project until it has rows of each
+    :param rows: The number of rows of each table
+    :return: None
+    """
+    with psycopg2.connect(get_database_uri()) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM trained_models WHERE project_id = %s",
+                        (PROJECT_ID,))
+            missing = rows - cur.fetchone()[0]
+            if missing > 0:
+                cur.execute("INSERT INTO trained_models (project_id, parameter_set_id, "
+                            "training_data_from, training_data_until, model_object, "
+                            "model_digest, train_timestamp, deployment_stage, "
+                            "backtest_timestamp, backtest_metrics, passed_backtesting, metadata) "
+                            "SELECT %s, 1, now(), now(), md5(i::text), md5(i::text), now(), "
+                            "'testing', now(), json_build_object('accuracy', random()), "
+                            "true, '{\"source\": \"benchmark\"}' "
+                            "FROM generate_series(1, %s) i",
+                            (PROJECT_ID, missing))
+
+            cur.execute("SELECT count(*) FROM model_tests WHERE project_id = %s",
+                        (PROJECT_ID,))
+            missing = rows - cur.fetchone()[0]
+            if missing > 0:
+                cur.execute("INSERT INTO model_tests (project_id, parameter_set_id, model_id, "
+                            "test_timestamp, test_metrics, passed_testing, metadata) "
+                            "SELECT %s, 1, i, now(), json_build_object('recall', random()), "
+                            "i %% 2 = 0, '{}' FROM generate_series(1, %s) i",
+                            (PROJECT_ID, missing))
+    conn.close()
+
+def run(client, path, rows, repeats):
+    """
+    Measure the best rows per second of listing the benchmark project
+    :param client: The flask test client
+    :param path: The path of the list endpoint
+    :param rows: The number of rows listed
+    :param repeats: The number of times to list them
+    :return: The rows per second
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(path, query_string={"project_id" : PROJECT_ID})
+        body = response.get_data()
+        elapsed = time.perf_counter() - start
+        response.close()
+        if response.status_code != 200:
+            raise RuntimeError(body.decode("utf-8"))
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    add_rows(args.rows)
+    app = create_app()
+    client = app.test_client()
+
+    for path in ["/v1/trained_models", "/v1/model_tests"]:
+        for database_json in [False, True]:
+            app.config[DATABASE_JSON_CONFIG] = database_json
+            rate = run(client, path, args.rows, args.repeats)
+            name = "database" if database_json else "python"
+            print(f"{path:<20} {name:<10} {rate:12,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
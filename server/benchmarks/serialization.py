@@ -0,0 +1,126 @@
+"""
+Measure how fast the service serializes trained models and model tests, so
+dump throughput can be compared across releases.
+
+Usage: python benchmarks/serialization.py [--objects 10000] [--repeats 5] [--output results.jsonl]
+
+Run from the server directory.  Each path serializes --objects TrainedModel
+and --objects ModelTest objects in one list, as a list endpoint does.  With
+--output, the results are appended to that file as one JSON line along with
+the date and git commit, to track them over time.
+"""
+
+import argparse
+import datetime as dt
+import json
+import subprocess
+import time
+
+from flask import Flask
+
+from app import schemas
+from app.schemas import CustomJSONProvider
+from app.schemas import ModelTest
+from app.schemas import ModelTestSchema
+from app.schemas import TrainedModel
+from app.schemas import TrainedModelSchema
+
+def make_objects(count):
+    """
+    Build trained models and model tests like those read from the database
+    :param count: The number of objects of each type
+    :return: The dictionary of the lists of objects by type
+    """
+    now = dt.datetime.now()
+    models = [TrainedModel(1, 1, now - dt.timedelta(days=30), now, None, now, "testing", now,
+                           {"accuracy" : 0.85, "recall" : 0.5}, True, {"source" : "benchmark"},
+                           model_id, "0" * 64)
+              for model_id in range(count)]
+    tests = [ModelTest(1, 1, test_id, now, {"recall" : 0.5}, test_id % 2 == 0, {}, test_id)
+             for test_id in range(count)]
+    return {"trained_models" : (models, TrainedModelSchema),
+            "model_tests" : (tests, ModelTestSchema)}
+
+def schema_per_object(objects, schema_class):
+    """
+    Serialize as the provider did before the dumpers: a new schema per object
+    and the standard library encoder
+    :param objects: The objects
+    :param schema_class: The schema of the objects
+    :return: The JSON string
+    """
+    return json.dumps([schema_class().dump(obj) for obj in objects], sort_keys=True)
+
+def measure(serialize, objects, schema_class, repeats):
+    """
+    Measure the best time of a serialization
+    :param serialize: A function of the objects and their schema that serializes them
+    :param objects: The objects
+    :param schema_class: The schema of the objects
+    :param repeats: The number of times to run it
+    :return: The best time in seconds
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        serialize(objects, schema_class)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def git_commit():
+    """
+    Get the commit the benchmark runs on
+    :return: The commit hash, or None outside a git checkout
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, check=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """
+    Run the benchmark
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    provider = CustomJSONProvider(Flask(__name__))
+    orjson = schemas.orjson
+
+    def standard_library(objects):
+        schemas.orjson = None
+        try:
+            return provider.dumps(objects)
+        finally:
+            schemas.orjson = orjson
+
+    paths = {
+        "schema per object" : schema_per_object,
+        "dumpers, json" : lambda objects, _: standard_library(objects),
+    }
+    if orjson is not None:
+        paths["dumpers, orjson"] = lambda objects, _: provider.dumps(objects)
+
+    results = {}
+    for name, (objects, schema_class) in make_objects(args.objects).items():
+        for path, serialize in paths.items():
+            elapsed = measure(serialize, objects, schema_class, args.repeats)
+            rate = len(objects) / elapsed
+            results[f"{name}: {path}"] = round(rate)
+            print(f"{name:<15} {path:<18} {rate:12,.0f} objects/s")
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            file.write(json.dumps({"date" : dt.datetime.now().isoformat(),
+                                   "commit" : git_commit(),
+                                   "objects" : args.objects,
+                                   "objects_per_second" : results}) + "\n")
+
+if __name__ == "__main__":
+    main()
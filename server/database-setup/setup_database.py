@@ -68,6 +68,12 @@ if __name__ == "__main__":
                         "metadata JSONB NOT NULL "
                         ");")
 
+            # indexes include the primary key so filtered listings can be paged by ID
+            cur.execute("CREATE INDEX parameter_sets_project_id_idx "
+                        "ON parameter_sets (project_id, parameter_set_id);")
+            cur.execute("CREATE INDEX parameter_sets_is_active_idx "
+                        "ON parameter_sets (is_active, parameter_set_id);")
+
             cur.execute("DROP TABLE IF EXISTS trained_models;")
             cur.execute("DROP TYPE IF EXISTS model_status;")
 
@@ -81,6 +87,8 @@ if __name__ == "__main__":
                         "training_data_until timestamp NOT NULL, "
                         # serialized objects are stored as hex strings of bytes objects
                         "model_object text NOT NULL, "
+                        # SHA-256 of the UTF-8 model_object, used as its ETag
+                        "model_digest text NOT NULL, "
                         "train_timestamp timestamp NOT NULL, "
                         "deployment_stage model_deployment_stage NOT NULL, "
                         "backtest_timestamp timestamp NOT NULL, "
@@ -89,6 +97,23 @@ if __name__ == "__main__":
                         "metadata JSONB NOT NULL "
                         ");")
 
+            cur.execute("CREATE INDEX trained_models_project_id_idx "
+                        "ON trained_models (project_id, model_id);")
+            # lineage queries walk from a parameter set to its trained models
+            cur.execute("CREATE INDEX trained_models_parameter_set_id_idx "
+                        "ON trained_models (parameter_set_id, model_id);")
+            cur.execute("CREATE INDEX trained_models_deployment_stage_idx "
+                        "ON trained_models (deployment_stage, model_id);")
+            cur.execute("CREATE INDEX trained_models_passed_backtesting_idx "
+                        "ON trained_models (passed_backtesting, model_id);")
+            # the current production and testing models of a project are the newest in each stage
+            cur.execute("CREATE INDEX trained_models_production_idx "
+                        "ON trained_models (project_id, model_id) "
+                        "WHERE deployment_stage = 'production';")
+            cur.execute("CREATE INDEX trained_models_testing_idx "
+                        "ON trained_models (project_id, model_id) "
+                        "WHERE deployment_stage = 'testing';")
+
             cur.execute("DROP TABLE IF EXISTS model_tests;")
 
             cur.execute("CREATE TABLE model_tests ( "
@@ -102,6 +127,44 @@ if __name__ == "__main__":
                         "metadata JSONB NOT NULL "
                         ");")
 
+            cur.execute("CREATE INDEX model_tests_project_id_idx "
+                        "ON model_tests (project_id, test_id);")
+            cur.execute("CREATE INDEX model_tests_model_id_idx "
+                        "ON model_tests (model_id, test_id);")
+            cur.execute("CREATE INDEX model_tests_parameter_set_id_idx "
+                        "ON model_tests (parameter_set_id, test_id);")
+            cur.execute("CREATE INDEX model_tests_passed_testing_idx "
+                        "ON model_tests (passed_testing, test_id);")
+            # exports read a range of test times of a project
+            cur.execute("CREATE INDEX model_tests_test_timestamp_idx "
+                        "ON model_tests (project_id, test_timestamp);")
+
+            cur.execute("DROP TABLE IF EXISTS changes;")
+
+            # the change feed: one row per change, read in change_id order
+            cur.execute("CREATE TABLE changes ( "
+                        "change_id bigint PRIMARY KEY GENERATED ALWAYS AS IDENTITY, "
+                        "changed_at timestamp NOT NULL DEFAULT now(), "
+                        "project_id integer NOT NULL, "
+                        "change_type text NOT NULL, "
+                        "body JSONB NOT NULL "
+                        ");")
+
+            cur.execute("CREATE INDEX changes_project_id_idx "
+                        "ON changes (project_id, change_id);")
+
+            cur.execute("DROP TABLE IF EXISTS model_aliases;")
+
+            # setting an alias updates its one row; change_id is the change that set it
+            cur.execute("CREATE TABLE model_aliases ( "
+                        "project_id integer NOT NULL, "
+                        "alias text NOT NULL, "
+                        "model_id integer NOT NULL, "
+                        "change_id bigint NOT NULL, "
+                        "updated_at timestamp NOT NULL, "
+                        "PRIMARY KEY (project_id, alias) "
+                        ");")
+
             cur.execute(f"DROP ROLE IF EXISTS {SERVICE_USER};")
             cur.execute(f"CREATE USER {SERVICE_USER} WITH PASSWORD '"
                         f"{os.environ.get(USER_PASSWORD_KEY)}';")
@@ -109,6 +172,8 @@ if __name__ == "__main__":
             cur.execute(f"GRANT SELECT, INSERT, UPDATE ON parameter_sets TO {SERVICE_USER};")
             cur.execute(f"GRANT SELECT, INSERT, UPDATE ON trained_models TO {SERVICE_USER};")
             cur.execute(f"GRANT SELECT, INSERT, UPDATE ON model_tests TO {SERVICE_USER};")
+            cur.execute(f"GRANT SELECT, INSERT, UPDATE ON model_aliases TO {SERVICE_USER};")
+            cur.execute(f"GRANT SELECT, INSERT ON changes TO {SERVICE_USER};")
 
         conn.commit()
 
@@ -0,0 +1,141 @@
+"""
+Run tests for Ringling model aliases
+"""
+# pylint: disable=duplicate-code
+import os
+import unittest
+from datetime import datetime
+
+import requests
+
+from test_utils import check_base_url
+
+BASE_URL_KEY = "BASE_URL"
+NOW = datetime.now().isoformat()
+
+def create_project_with_models(count):
+    """
+    Create a project with trained models
+    :param count: The number of trained models
+    :return: The project ID and the list of trained model IDs
+    """
+    base_url = os.environ[BASE_URL_KEY]
+    response = requests.post(os.path.join(base_url, "v1/projects"),
+                             json={"project_name" : "aliases" + str(datetime.now()),
+                                   "metadata" : {}},
+                             timeout=5)
+    project_id = response.json()["project_id"]
+
+    model_ids = []
+    for _ in range(count):
+        obj = { "project_id" : project_id,
+                "parameter_set_id" : 1,
+                "training_data_from" : NOW,
+                "training_data_until" : NOW,
+                "model_object" : "abcdef",
+                "train_timestamp" : NOW,
+                "deployment_stage" : "testing",
+                "backtest_timestamp": NOW,
+                "backtest_metrics": {},
+                "passed_backtesting": True,
+                "metadata": {}
+        }
+        response = requests.post(os.path.join(base_url, "v1/trained_models"), json=obj, timeout=5)
+        model_ids.append(response.json()["model_id"])
+
+    return project_id, model_ids
+
+class AliasesTests(unittest.TestCase):
+    """
+    Testing suite for model aliases
+    """
+    def get_url(self, project_id):
+        """
+        Get the aliases url of a project
+        :param project_id: The project ID
+        :return: The full aliases url
+        """
+        return os.path.join(os.environ[BASE_URL_KEY], f"v1/projects/{project_id}/aliases")
+
+    def test_set_alias(self):
+        """
+        Test setting, swapping, and reading an alias
+        :return: If the alias points at the last model it was set to, and the ETag changes
+        """
+        project_id, model_ids = create_project_with_models(2)
+        alias_url = os.path.join(self.get_url(project_id), "champion")
+
+        response = requests.get(alias_url, timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+        etags = []
+        for model_id in model_ids:
+            response = requests.put(alias_url, json={"model_id" : model_id}, timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["model_id"], model_id)
+            etags.append(response.headers["ETag"])
+        self.assertNotEqual(etags[0], etags[1])
+
+        response = requests.get(alias_url, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        json_response = response.json()
+        self.assertEqual(json_response["model_id"], model_ids[1])
+        self.assertEqual(json_response["alias"], "champion")
+        self.assertEqual(json_response["project_id"], project_id)
+        self.assertEqual(response.headers["ETag"], etags[1])
+
+        response = requests.get(alias_url, headers={"If-None-Match" : etags[1]}, timeout=5)
+        self.assertEqual(response.status_code, 304)
+
+        requests.put(os.path.join(self.get_url(project_id), "challenger"),
+                     json={"model_id" : model_ids[0]}, timeout=5)
+        response = requests.get(self.get_url(project_id), timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(a["alias"], a["model_id"]) for a in response.json()["aliases"]],
+                         [("challenger", model_ids[0]), ("champion", model_ids[1])])
+        response = requests.get(self.get_url(project_id),
+                                headers={"If-None-Match" : response.headers["ETag"]}, timeout=5)
+        self.assertEqual(response.status_code, 304)
+
+    def test_set_alias_if_match(self):
+        """
+        Test compare-and-swap of an alias with If-Match
+        :return: If a stale ETag gets a 412 and leaves the alias unchanged
+        """
+        project_id, model_ids = create_project_with_models(2)
+        alias_url = os.path.join(self.get_url(project_id), "canary-eu")
+
+        response = requests.put(alias_url, json={"model_id" : model_ids[0]}, timeout=5)
+        etag = response.headers["ETag"]
+
+        response = requests.put(alias_url, json={"model_id" : model_ids[1]},
+                                headers={"If-Match" : etag}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+
+        response = requests.put(alias_url, json={"model_id" : model_ids[0]},
+                                headers={"If-Match" : etag}, timeout=5)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(requests.get(alias_url, timeout=5).json()["model_id"], model_ids[1])
+
+    def test_set_alias_bad_requests(self):
+        """
+        Test setting aliases with bad names, bodies, and models
+        :return: If each request returns a 400
+        """
+        project_id, model_ids = create_project_with_models(1)
+        other_project_id, _ = create_project_with_models(0)
+
+        requests_400 = [
+            (os.path.join(self.get_url(project_id), "-bad"), {"model_id" : model_ids[0]}),
+            (os.path.join(self.get_url(project_id), "champion"), {"model": model_ids[0]}),
+            (os.path.join(self.get_url(project_id), "champion"), {"model_id" : 0}),
+            (os.path.join(self.get_url(other_project_id), "champion"),
+             {"model_id" : model_ids[0]}),
+        ]
+        for url, obj in requests_400:
+            response = requests.put(url, json=obj, timeout=5)
+            self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
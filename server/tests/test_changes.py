@@ -0,0 +1,61 @@
+"""
+Run tests for the Ringling change feed
+"""
+import os
+import unittest
+
+import requests
+
+from test_aliases import create_project_with_models
+from test_utils import check_base_url
+
+BASE_URL_KEY = "BASE_URL"
+
+class ChangesTests(unittest.TestCase):
+    """
+    Testing suite for the change feed
+    """
+    def get_url(self):
+        """
+        Get the change feed url
+        :return: The full change feed url
+        """
+        return os.path.join(os.environ[BASE_URL_KEY], "v1/changes")
+
+    def test_alias_changes(self):
+        """
+        Test that setting aliases adds to the change feed
+        :return: If each alias change is in the feed in order, and the feed can be paged
+        """
+        project_id, model_ids = create_project_with_models(2)
+        aliases_url = os.path.join(os.environ[BASE_URL_KEY], f"v1/projects/{project_id}/aliases")
+        for model_id in model_ids:
+            requests.put(os.path.join(aliases_url, "champion"), json={"model_id" : model_id},
+                         timeout=5)
+
+        response = requests.get(self.get_url(), params={"project_id" : project_id}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        changes = response.json()["changes"]
+        self.assertEqual([(c["change_type"], c["body"]) for c in changes],
+                         [("alias", {"alias" : "champion", "model_id" : model_id})
+                          for model_id in model_ids])
+        self.assertLess(changes[0]["change_id"], changes[1]["change_id"])
+
+        response = requests.get(self.get_url(),
+                                params={"project_id" : project_id, "limit" : 1,
+                                        "after_id" : changes[0]["change_id"]},
+                                timeout=5)
+        self.assertEqual(response.json()["changes"], changes[1:])
+        self.assertEqual(response.json()["next_after_id"], changes[1]["change_id"])
+
+    def test_bad_filter(self):
+        """
+        Test reading the change feed with a bad filter
+        :return: If a 400 is returned
+        """
+        response = requests.get(self.get_url(), params={"project_id" : "x"}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
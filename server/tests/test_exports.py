@@ -0,0 +1,164 @@
+"""
+Run tests for Ringling Arrow and Parquet exports
+"""
+# pylint: disable=duplicate-code
+import io
+import os
+import unittest
+
+import requests
+
+from test_utils import check_base_url
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+BASE_URL_KEY = "BASE_URL"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class ExportTests(unittest.TestCase):
+    """
+    Testing suite for exports of model tests and trained models
+    """
+    def setUp(self):
+        """
+        Skip the tests if the service does not have pyarrow installed
+        :return: None
+        """
+        response = self.export("v1/model_tests/export", {"model_id" : 0})
+        if response.status_code == 501:
+            self.skipTest("the service does not have pyarrow installed")
+
+    @staticmethod
+    def export(path, params):
+        """
+        Request an export
+        :param path: The path of the export
+        :param params: The query string arguments
+        :return: The response
+        """
+        return requests.get(os.path.join(os.environ[BASE_URL_KEY], path),
+                            params=params, timeout=5)
+
+    def create_trained_model(self, backtest_metrics):
+        """
+        Create a trained model
+        :param backtest_metrics: The backtest metrics of the trained model
+        :return: The trained model ID
+        """
+        obj = { "project_id" : 7,
+                "parameter_set_id" : 7,
+                "training_data_from" : "2023-01-01T00:00:00",
+                "training_data_until" : "2023-02-01T00:00:00",
+                "model_object" : "00",
+                "train_timestamp" : "2023-02-02T00:00:00",
+                "deployment_stage" : "testing",
+                "backtest_timestamp": "2023-02-03T00:00:00",
+                "backtest_metrics": backtest_metrics,
+                "passed_backtesting": True,
+                "metadata": {}
+        }
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/trained_models"),
+                                 json=obj, timeout=5)
+        self.assertEqual(response.status_code, 201)
+        return response.json()["model_id"]
+
+    def create_model_test(self, model_id, test_timestamp, test_metrics):
+        """
+        Create a model test
+        :param model_id: The ID of the trained model tested
+        :param test_timestamp: The time of the test
+        :param test_metrics: The metrics of the test
+        :return: The model test ID
+        """
+        obj = { "project_id" : 7,
+                "parameter_set_id" : 7,
+                "model_id" : model_id,
+                "test_timestamp" : test_timestamp,
+                "test_metrics" : test_metrics,
+                "passed_testing" : True,
+                "metadata" : {"source" : "export"}
+        }
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/model_tests"),
+                                 json=obj, timeout=5)
+        self.assertEqual(response.status_code, 201)
+        return response.json()["test_id"]
+
+    def test_export_model_tests(self):
+        """
+        Test exporting model tests as an Arrow IPC stream
+        :return: If each metric is a column of the type of its values
+        """
+        model_id = self.create_trained_model({})
+        self.create_model_test(model_id, "2023-03-01T00:00:00",
+                               {"rows" : 10, "recall" : 0.5, "ok" : True, "note" : "a"})
+        self.create_model_test(model_id, "2023-04-01T00:00:00",
+                               {"rows" : 20, "recall" : 1, "note" : {"nested" : 1}})
+
+        response = self.export("v1/model_tests/export", {"model_id" : model_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], ARROW_MIMETYPE)
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.schema.field("test_metrics.rows").type, pyarrow.int64())
+        self.assertEqual(table.schema.field("test_metrics.recall").type, pyarrow.float64())
+        self.assertEqual(table.column("test_metrics.recall").to_pylist(), [0.5, 1.0])
+        self.assertEqual(table.column("test_metrics.ok").to_pylist(), [True, None])
+        self.assertEqual(table.column("test_metrics.note").to_pylist(), ['"a"', '{"nested": 1}'])
+        self.assertEqual(table.column("deployment_stage").to_pylist(), ["testing", "testing"])
+
+    def test_export_range(self):
+        """
+        Test exporting a range of test times
+        :return: If only the tests in the range are exported
+        """
+        model_id = self.create_trained_model({})
+        self.create_model_test(model_id, "2023-03-01T00:00:00", {"recall" : 0.5})
+        test_id = self.create_model_test(model_id, "2023-04-01T00:00:00", {"recall" : 0.6})
+
+        response = self.export("v1/model_tests/export",
+                               {"model_id" : model_id,
+                                "test_timestamp_from" : "2023-03-15T00:00:00",
+                                "test_timestamp_until" : "2023-05-01T00:00:00"})
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.column("test_id").to_pylist(), [test_id])
+
+    def test_export_trained_models_parquet(self):
+        """
+        Test exporting trained models as a Parquet file
+        :return: If the backtest metrics are columns of the file
+        """
+        model_id = self.create_trained_model({"export_auc" : 0.75})
+
+        response = self.export("v1/trained_models/export",
+                               {"project_id" : 7, "format" : "parquet"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], PARQUET_MIMETYPE)
+        table = pyarrow.parquet.read_table(io.BytesIO(response.content))
+
+        model_ids = table.column("model_id").to_pylist()
+        self.assertIn(model_id, model_ids)
+        self.assertEqual(table.column("backtest_metrics.export_auc")[model_ids.index(model_id)]
+                         .as_py(), 0.75)
+
+    def test_export_errors(self):
+        """
+        Test exports with an invalid format or filter
+        :return: If both are rejected with a 400
+        """
+        response = self.export("v1/model_tests/export", {"format" : "csv"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.export("v1/model_tests/export", {"test_timestamp_from" : "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Run tests for Ringling lineage queries
+"""
+# pylint: disable=duplicate-code
+import os
+import unittest
+from datetime import datetime
+
+import requests
+
+from test_utils import check_base_url
+
+BASE_URL_KEY = "BASE_URL"
+NOW = datetime.now().isoformat()
+
+def post(path, obj):
+    """
+    Create an object
+    :param path: The path of the resource type
+    :param obj: The object
+    :return: The JSON response
+    """
+    response = requests.post(os.path.join(os.environ[BASE_URL_KEY], path), json=obj, timeout=5)
+    return response.json()
+
+def create_lineage():
+    """
+    Create a parameter set with a production model that has a passed and a
+    failed test, and a testing model that failed backtesting and has a passed test
+    :return: The parameter set ID, the two model IDs, and the three test IDs
+    """
+    project_id = post("v1/projects", {"project_name" : "lineage" + str(datetime.now()),
+                                      "metadata" : {}})["project_id"]
+    parameter_set_id = post("v1/parameter_sets", {"project_id" : project_id,
+                                                  "training_parameters" : {},
+                                                  "is_active" : True,
+                                                  "metadata" : {}})["parameter_set_id"]
+
+    model_ids = []
+    for deployment_stage, passed_backtesting in [("production", True), ("testing", False)]:
+        obj = { "project_id" : project_id,
+                "parameter_set_id" : parameter_set_id,
+                "training_data_from" : NOW,
+                "training_data_until" : NOW,
+                "model_object" : "abcdef",
+                "train_timestamp" : NOW,
+                "deployment_stage" : deployment_stage,
+                "backtest_timestamp": NOW,
+                "backtest_metrics": {},
+                "passed_backtesting": passed_backtesting,
+                "metadata": {}
+        }
+        model_ids.append(post("v1/trained_models", obj)["model_id"])
+
+    test_ids = []
+    for model_id, passed_testing in [(model_ids[0], True), (model_ids[0], False),
+                                     (model_ids[1], True)]:
+        obj = { "project_id" : project_id,
+                "parameter_set_id" : parameter_set_id,
+                "model_id" : model_id,
+                "test_timestamp" : NOW,
+                "test_metrics" : {},
+                "passed_testing" : passed_testing,
+                "metadata" : {}
+        }
+        test_ids.append(post("v1/model_tests", obj)["test_id"])
+
+    return parameter_set_id, model_ids, test_ids
+
+class LineageTests(unittest.TestCase):
+    """
+    Testing suite for lineage queries
+    """
+    def get_lineage(self, path, **params):
+        """
+        Get a lineage
+        :param path: The path of the object the lineage starts from
+        :param params: The query string arguments
+        :return: The response
+        """
+        return requests.get(os.path.join(os.environ[BASE_URL_KEY], path, "lineage"),
+                            params=params, timeout=5)
+
+    def test_parameter_set_lineage(self):
+        """
+        Test walking from a parameter set to its models and their tests
+        :return: If the nested and flat lineages hold the same objects, and the filters apply
+        """
+        parameter_set_id, model_ids, test_ids = create_lineage()
+        path = f"v1/parameter_sets/{parameter_set_id}"
+
+        response = self.get_lineage(path)
+        self.assertEqual(response.status_code, 200)
+        lineage = response.json()
+        self.assertEqual(lineage["parameter_set"]["parameter_set_id"], parameter_set_id)
+        self.assertNotIn("training_parameters", lineage["parameter_set"])
+        models = lineage["trained_models"]
+        self.assertEqual([model["trained_model"]["model_id"] for model in models], model_ids)
+        self.assertIsNone(models[0]["trained_model"]["model_object"])
+        self.assertEqual([[test["test_id"] for test in model["model_tests"]] for model in models],
+                         [test_ids[:2], test_ids[2:]])
+
+        lineage = self.get_lineage(path, format="flat").json()
+        self.assertEqual([obj["parameter_set_id"] for obj in lineage["parameter_sets"]],
+                         [parameter_set_id])
+        self.assertEqual([obj["model_id"] for obj in lineage["trained_models"]], model_ids)
+        self.assertEqual([obj["test_id"] for obj in lineage["model_tests"]], test_ids)
+
+        lineage = self.get_lineage(path, format="flat", deployment_stage="production",
+                                   passed_testing="false").json()
+        self.assertEqual([obj["model_id"] for obj in lineage["trained_models"]], model_ids[:1])
+        self.assertEqual([obj["test_id"] for obj in lineage["model_tests"]], test_ids[1:2])
+
+        lineage = self.get_lineage(path, passed_backtesting="false").json()
+        self.assertEqual([model["trained_model"]["model_id"]
+                          for model in lineage["trained_models"]], model_ids[1:])
+
+    def test_upstream_lineage(self):
+        """
+        Test walking from a model test and a trained model back to the parameter set
+        :return: If the test's model and parameter set are returned
+        """
+        parameter_set_id, model_ids, test_ids = create_lineage()
+
+        lineage = self.get_lineage(f"v1/model_tests/{test_ids[1]}").json()
+        self.assertEqual(lineage["model_test"]["test_id"], test_ids[1])
+        self.assertEqual(lineage["trained_model"]["model_id"], model_ids[0])
+        self.assertEqual(lineage["parameter_set"]["parameter_set_id"], parameter_set_id)
+
+        lineage = self.get_lineage(f"v1/model_tests/{test_ids[1]}", format="flat").json()
+        self.assertEqual([obj["model_id"] for obj in lineage["trained_models"]], model_ids[:1])
+
+        lineage = self.get_lineage(f"v1/trained_models/{model_ids[0]}",
+                                   passed_testing="true").json()
+        self.assertEqual(lineage["parameter_set"]["parameter_set_id"], parameter_set_id)
+        self.assertEqual([test["test_id"] for test in lineage["model_tests"]], test_ids[:1])
+
+    def test_lineage_errors(self):
+        """
+        Test lineages of missing objects and with bad arguments
+        :return: If missing objects return a 404 and bad arguments a 400
+        """
+        for path in ["v1/parameter_sets/0", "v1/trained_models/0", "v1/model_tests/0"]:
+            self.assertEqual(self.get_lineage(path).status_code, 404)
+
+        parameter_set_id, _, _ = create_lineage()
+        path = f"v1/parameter_sets/{parameter_set_id}"
+        for params in [{"format" : "tree"}, {"deployment_stage" : "staging"},
+                       {"passed_testing" : "maybe"}]:
+            self.assertEqual(self.get_lineage(path, **params).status_code, 400)
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
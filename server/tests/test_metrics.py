@@ -0,0 +1,38 @@
+"""
+Run tests for the metrics service
+"""
+import os
+import unittest
+
+import requests
+
+from test_utils import check_base_url
+
+BASE_URL_KEY = "BASE_URL"
+
+class MetricsTests(unittest.TestCase):
+    """
+    Contains all tests pertaining to metrics service
+    """
+    def get_url(self):
+        """
+        Get the URL
+        :return: The metrics URL
+        """
+        return os.path.join(os.environ[BASE_URL_KEY], "metrics")
+
+    def test_metrics(self):
+        """
+        Make sure the coalescing counts are reported
+        :return: If each single flight reports its counts
+        """
+        response = requests.get(self.get_url(), timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        coalescing = response.json()["coalescing"]
+        for name in ["trained_model", "model_object"]:
+            self.assertEqual(set(coalescing[name]), {"fetches", "coalesced", "in_flight"})
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
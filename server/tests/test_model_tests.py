@@ -169,6 +169,95 @@ class ModelTestsTests(unittest.TestCase):
         json_obj = response.json()
         self.assertIn("error", json_obj)
 
+    def test_list_tests_by_ids(self):
+        """
+        Test listing model tests by a list of IDs
+        :return: If only the requested model tests are returned, and missing IDs are reported
+        """
+        test_ids = []
+        for model_id in [2, 3]:
+            obj = {
+                    "project_id" : 5,
+                    "parameter_set_id" : 1,
+                    "model_id" : model_id,
+                    "test_timestamp" : dt.datetime.now().isoformat(),
+                    "test_metrics" : { "recall" : 0.8, "precision" : 0.2 },
+                    "passed_testing" : True,
+                    "metadata": {"meta1": 1, "meta2": 2}
+                  }
+
+            response = requests.post(self.get_url(),
+                                json=obj, timeout=5)
+
+            self.assertEqual(response.status_code, 201)
+            test_ids.append(response.json()["test_id"])
+
+        ids = ",".join(str(test_id) for test_id in test_ids + [0])
+        response = requests.get(self.get_url(), params={"ids" : ids}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+
+        json_response = response.json()
+        returned_ids = [test["test_id"] for test in json_response["model_tests"]]
+        self.assertCountEqual(test_ids, returned_ids)
+        self.assertEqual(json_response["missing_ids"], [0])
+
+    def test_list_tests_paged(self):
+        """
+        Test listing filtered model tests one page at a time
+        :return: If walking the pages returns every matching model test once, in ID
+        order, ending with the ones created here since earlier runs leave theirs behind
+        """
+        test_ids = []
+        for _ in range(5):
+            obj = {
+                    "project_id" : 5,
+                    "parameter_set_id" : 1,
+                    "model_id" : 777,
+                    "test_timestamp" : dt.datetime.now().isoformat(),
+                    "test_metrics" : { "recall" : 0.8, "precision" : 0.2 },
+                    "passed_testing" : True,
+                    "metadata": {"meta1": 1, "meta2": 2}
+                  }
+
+            response = requests.post(self.get_url(),
+                                json=obj, timeout=5)
+
+            self.assertEqual(response.status_code, 201)
+            test_ids.append(response.json()["test_id"])
+
+        returned_ids = []
+        params = {"model_id" : 777, "limit" : 2}
+        while True:
+            response = requests.get(self.get_url(), params=params, timeout=5)
+            self.assertEqual(response.status_code, 200)
+
+            json_response = response.json()
+            self.assertLessEqual(len(json_response["model_tests"]), 2)
+            returned_ids.extend(test["test_id"] for test in json_response["model_tests"])
+            if json_response["next_after_id"] is None:
+                break
+            params["after_id"] = json_response["next_after_id"]
+
+        self.assertEqual(len(returned_ids), len(set(returned_ids)))
+        self.assertEqual(returned_ids, sorted(returned_ids))
+        self.assertEqual(test_ids, returned_ids[-len(test_ids):])
+
+    def test_list_tests_bad_filter(self):
+        """
+        Test listing model tests with malformed filter and page arguments
+        :return: If listing with a non-boolean filter, a zero limit, or a zero
+        after_id returned a 400
+        """
+        response = requests.get(self.get_url(), params={"passed_testing" : "maybe"}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.get(self.get_url(), params={"limit" : 0}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.get(self.get_url(), params={"limit" : 5, "after_id" : 0}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error" : "after_id must be a positive integer"})
+
 if __name__ == "__main__":
     check_base_url(BASE_URL_KEY)
     unittest.main()
@@ -0,0 +1,174 @@
+"""
+Run tests for Ringling MessagePack requests and responses
+"""
+# pylint: disable=duplicate-code
+import os
+import unittest
+from datetime import datetime
+
+import requests
+
+from test_utils import check_base_url
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+BASE_URL_KEY = "BASE_URL"
+MSGPACK_MIMETYPE = "application/msgpack"
+NOW = datetime(2023, 5, 1, 12, 30, 15, 123456)
+
+def to_timestamp(moment):
+    """
+    Build the MessagePack timestamp of a datetime without a time zone
+    :param moment: The datetime, taken to be UTC
+    :return: The timestamp
+    """
+    delta = moment - datetime(1970, 1, 1)
+    return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+
+@unittest.skipIf(msgpack is None, "msgpack is not installed")
+class MessagePackTests(unittest.TestCase):
+    """
+    Testing suite for MessagePack content negotiation
+    """
+    def setUp(self):
+        """
+        Skip the tests if the service does not have msgpack installed
+        :return: None
+        """
+        response = requests.get(os.path.join(os.environ[BASE_URL_KEY], "healthcheck"),
+                                headers={"Accept" : MSGPACK_MIMETYPE}, timeout=5)
+        if response.headers["Content-Type"] != MSGPACK_MIMETYPE:
+            self.skipTest("the service does not have msgpack installed")
+
+    def request(self, method, path, obj=None, accept=MSGPACK_MIMETYPE):
+        """
+        Send a request with a MessagePack body
+        :param method: The HTTP method
+        :param path: The path of the resource
+        :param obj: The object to send, or None for no body
+        :param accept: The Accept header
+        :return: The response
+        """
+        headers = {"Accept" : accept}
+        data = None
+        if obj is not None:
+            headers["Content-Type"] = MSGPACK_MIMETYPE
+            data = msgpack.packb(obj, use_bin_type=True)
+        return requests.request(method, os.path.join(os.environ[BASE_URL_KEY], path),
+                                data=data, headers=headers, timeout=5)
+
+    def create_trained_model(self, model_object, metadata=None):
+        """
+        Create a trained model with a MessagePack body
+        :param model_object: The model object as bytes
+        :param metadata: The metadata, empty by default
+        :return: The trained model ID
+        """
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 5,
+                "training_data_from" : to_timestamp(NOW),
+                "training_data_until" : to_timestamp(NOW),
+                "model_object" : model_object,
+                "train_timestamp" : to_timestamp(NOW),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": to_timestamp(NOW),
+                "backtest_metrics": {"precision" : 0.5},
+                "passed_backtesting": True,
+                "metadata": metadata or {}
+        }
+        response = self.request("POST", "v1/trained_models", obj)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers["Content-Type"], MSGPACK_MIMETYPE)
+        return msgpack.unpackb(response.content)["model_id"]
+
+    def test_trained_model_round_trip(self):
+        """
+        Test creating and getting a trained model as MessagePack
+        :return: If the model object is binary, the timestamps are native, and
+        JSON clients see the model object as hex
+        """
+        model_id = self.create_trained_model(b"\x00\x01\xfe\xff")
+
+        response = self.request("GET", f"v1/trained_models/{model_id}")
+        self.assertEqual(response.headers["Content-Type"], MSGPACK_MIMETYPE)
+        model = msgpack.unpackb(response.content)
+        self.assertEqual(model["model_object"], b"\x00\x01\xfe\xff")
+        self.assertEqual(model["train_timestamp"], to_timestamp(NOW))
+        self.assertEqual(model["backtest_metrics"], {"precision" : 0.5})
+
+        response = self.request("GET", f"v1/trained_models/{model_id}", accept="*/*")
+        self.assertEqual(response.headers["Content-Type"], "application/json")
+        model = response.json()
+        self.assertEqual(model["model_object"], "0001feff")
+        self.assertEqual(model["train_timestamp"], NOW.isoformat())
+
+    def test_list_and_lineage(self):
+        """
+        Test listing trained models and getting a lineage as MessagePack
+        :return: If the listed model and the lineage hold native timestamps
+        """
+        model_id = self.create_trained_model(b"\xab")
+
+        response = self.request("GET", "v1/trained_models", accept=MSGPACK_MIMETYPE)
+        models = msgpack.unpackb(response.content)["trained_models"]
+        model = [model for model in models if model["model_id"] == model_id][0]
+        self.assertEqual(model["model_object"], b"\xab")
+        self.assertEqual(model["training_data_from"], to_timestamp(NOW))
+
+        response = self.request("GET", f"v1/trained_models/{model_id}/lineage")
+        self.assertEqual(response.headers["Content-Type"], MSGPACK_MIMETYPE)
+        lineage = msgpack.unpackb(response.content)
+        self.assertEqual(lineage["trained_model"]["model_id"], model_id)
+        self.assertEqual(lineage["trained_model"]["train_timestamp"], to_timestamp(NOW))
+
+    def test_nested_values_unchanged(self):
+        """
+        Test metadata whose keys are named like timestamp and model object fields
+        :return: If the metadata is stored and returned as it was sent, and
+        a timestamp nested in metadata is rejected with a 400
+        """
+        metadata = {"train_timestamp" : "2023-01-01T00:00:00", "model_object" : "abcd",
+                    "history" : [{"test_timestamp" : "2023-01-02T00:00:00"}]}
+        model_id = self.create_trained_model(b"\xcd", metadata)
+
+        response = self.request("GET", f"v1/trained_models/{model_id}/lineage")
+        lineage = msgpack.unpackb(response.content)
+        self.assertEqual(lineage["trained_model"]["metadata"], metadata)
+        self.assertEqual(lineage["trained_model"]["train_timestamp"], to_timestamp(NOW))
+
+        response = self.request("GET", f"v1/trained_models/{model_id}/lineage?format=flat")
+        lineage = msgpack.unpackb(response.content)
+        self.assertEqual(lineage["trained_models"][0]["metadata"], metadata)
+        self.assertEqual(lineage["trained_models"][0]["train_timestamp"], to_timestamp(NOW))
+
+        response = self.request("POST", "v1/model_tests",
+                                { "project_id" : 5,
+                                  "parameter_set_id" : 5,
+                                  "model_id" : model_id,
+                                  "test_timestamp" : to_timestamp(NOW),
+                                  "test_metrics" : {},
+                                  "passed_testing" : True,
+                                  "metadata" : {"run" : {"at" : to_timestamp(NOW)}}
+                                })
+        self.assertEqual(response.status_code, 400)
+
+    def test_msgpack_errors(self):
+        """
+        Test MessagePack bodies that cannot be decoded or are not maps
+        :return: If both are rejected with a 400
+        """
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/model_tests"),
+                                 data=b"\xc1", headers={"Content-Type" : MSGPACK_MIMETYPE},
+                                 timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.request("POST", "v1/trained_models", [1, 2])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", msgpack.unpackb(response.content))
+
+if __name__ == "__main__":
+    check_base_url(BASE_URL_KEY)
+    unittest.main()
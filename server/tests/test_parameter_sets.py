@@ -4,6 +4,7 @@ Run tests for Ringling parameter sets
 # pylint: disable=duplicate-code
 import os
 import unittest
+from datetime import datetime
 
 import requests
 
@@ -290,6 +291,68 @@ class ParameterSetsTests(unittest.TestCase):
 
         self.assertEqual(response.status_code, 404)
 
+    def test_create_large_parameters(self):
+        """
+        Test creating a parameter set whose training parameters are a string
+        large enough to be spooled
+        :return: If the training parameters are stored unchanged
+        """
+        obj = { "project_id" : 5,
+                "training_parameters" : "\u00e9\"\\\n" + os.urandom(1024 * 1024).hex(),
+                "is_active" : True,
+                "metadata": {"meta1": 1, "meta2": 2}
+        }
+
+        response = requests.post(self.get_url(), json=obj, timeout=30)
+        self.assertEqual(response.status_code, 201)
+
+        url = os.path.join(self.get_url(), str(response.json()["parameter_set_id"]))
+        response = requests.get(url, timeout=30)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(obj["training_parameters"], response.json()["training_parameters"])
+
+    def test_bulk_update_status(self):
+        """
+        Test updating the status of many parameter sets at once, by ID and by filter
+        :return: If a dry run changes nothing, the update reports the changed IDs, and
+        parameter sets that already have the status are not counted
+        """
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/projects"),
+                                 json={"project_name" : f"bulk{datetime.now()}",
+                                       "metadata" : {}},
+                                 timeout=5)
+        project_id = response.json()["project_id"]
+        ids = []
+        for is_active in [True, True, False]:
+            obj = { "project_id" : project_id,
+                    "training_parameters" : {},
+                    "is_active" : is_active,
+                    "metadata": {}
+            }
+            response = requests.post(self.get_url(), json=obj, timeout=5)
+            ids.append(response.json()["parameter_set_id"])
+
+        update = {"is_active" : False, "filter" : {"project_id" : project_id}, "dry_run" : True}
+        response = requests.patch(self.get_url(), json=update, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"dry_run" : True, "count" : 2, "ids" : ids[:2]})
+
+        update["dry_run"] = False
+        response = requests.patch(self.get_url(), json=update, timeout=5)
+        self.assertEqual(response.json(), {"dry_run" : False, "count" : 2, "ids" : ids[:2]})
+        response = requests.get(self.get_url(), params={"project_id" : project_id,
+                                                        "is_active" : "true"}, timeout=5)
+        self.assertEqual(response.json()["parameter_sets"], [])
+
+        response = requests.patch(self.get_url(), json={"is_active" : True, "ids" : ids[1:]},
+                                  timeout=5)
+        self.assertEqual(response.json()["ids"], ids[1:])
+
+        for update in [{"is_active" : True}, {"is_active" : True, "ids" : [1], "filter" : {}},
+                       {"is_active" : True, "filter" : {"model_id" : 1}}]:
+            response = requests.patch(self.get_url(), json=update, timeout=5)
+            self.assertEqual(response.status_code, 400)
+
 if __name__ == "__main__":
     check_base_url(BASE_URL_KEY)
     unittest.main()
@@ -126,6 +126,133 @@ class ProjectsTests(unittest.TestCase):
         json_obj = response.json()
         self.assertIn("error", json_obj)
 
+    def test_deployed_models(self):
+        """
+        Test resolving the current production and testing models of a project
+        :return: If the newest model of each stage is returned without its model object,
+        and promoting a model is seen right away
+        """
+        response = requests.post(self.get_url(),
+                                 json={"project_name" : "deployed" + str(datetime.now()),
+                                       "metadata" : {}},
+                                 timeout=5)
+        project_id = response.json()["project_id"]
+        project_url = os.path.join(self.get_url(), str(project_id))
+        models_url = os.path.join(os.environ[BASE_URL_KEY], "v1/trained_models")
+
+        response = requests.get(os.path.join(project_url, "production_model"), timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+        model_ids = {}
+        for stage in ["production", "production", "testing"]:
+            obj = { "project_id" : project_id,
+                    "parameter_set_id" : 1,
+                    "training_data_from" : NOW,
+                    "training_data_until" : NOW,
+                    "model_object" : "abcdef",
+                    "train_timestamp" : NOW,
+                    "deployment_stage" : stage,
+                    "backtest_timestamp": NOW,
+                    "backtest_metrics": {},
+                    "passed_backtesting": True,
+                    "metadata": {}
+            }
+            response = requests.post(models_url, json=obj, timeout=5)
+            self.assertEqual(response.status_code, 201)
+            model_ids[stage] = response.json()["model_id"]
+
+        for stage in ["production", "testing"]:
+            response = requests.get(os.path.join(project_url, f"{stage}_model"), timeout=5)
+            self.assertEqual(response.status_code, 200)
+            json_response = response.json()
+            self.assertEqual(json_response["model_id"], model_ids[stage])
+            self.assertEqual(json_response["deployment_stage"], stage)
+            self.assertIsNone(json_response["model_object"])
+
+        response = requests.patch(os.path.join(models_url, str(model_ids["testing"])),
+                                  json={"deployment_stage" : "production"}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+
+        response = requests.get(os.path.join(project_url, "production_model"), timeout=5)
+        self.assertEqual(response.json()["model_id"], model_ids["testing"])
+        response = requests.get(os.path.join(project_url, "testing_model"), timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+    def test_project_overview(self):
+        """
+        Test getting a project with its children in one request
+        :return: If the overview holds the parameter sets, trained models, and latest tests
+        of the project, and the depth and limit arguments cut it down
+        """
+        base_url = os.environ[BASE_URL_KEY]
+        response = requests.post(self.get_url(),
+                                 json={"project_name" : "overview" + str(datetime.now()),
+                                       "metadata" : {}},
+                                 timeout=5)
+        project_id = response.json()["project_id"]
+        response = requests.post(os.path.join(base_url, "v1/parameter_sets"),
+                                 json={"project_id" : project_id, "training_parameters" : {},
+                                       "is_active" : True, "metadata" : {}},
+                                 timeout=5)
+        parameter_set_id = response.json()["parameter_set_id"]
+
+        model_ids = []
+        for _ in range(2):
+            obj = { "project_id" : project_id,
+                    "parameter_set_id" : parameter_set_id,
+                    "training_data_from" : NOW,
+                    "training_data_until" : NOW,
+                    "model_object" : "abcdef",
+                    "train_timestamp" : NOW,
+                    "deployment_stage" : "testing",
+                    "backtest_timestamp": NOW,
+                    "backtest_metrics": {},
+                    "passed_backtesting": True,
+                    "metadata": {}
+            }
+            response = requests.post(os.path.join(base_url, "v1/trained_models"), json=obj,
+                                     timeout=5)
+            model_ids.append(response.json()["model_id"])
+
+        test_ids = []
+        for passed_testing in [False, True]:
+            obj = { "project_id" : project_id,
+                    "parameter_set_id" : parameter_set_id,
+                    "model_id" : model_ids[0],
+                    "test_timestamp" : NOW,
+                    "test_metrics" : {"recall" : 0.5},
+                    "passed_testing" : passed_testing,
+                    "metadata" : {}
+            }
+            response = requests.post(os.path.join(base_url, "v1/model_tests"), json=obj,
+                                     timeout=5)
+            test_ids.append(response.json()["test_id"])
+
+        overview_url = os.path.join(self.get_url(), str(project_id), "overview")
+        response = requests.get(overview_url, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        overview = response.json()
+        self.assertEqual(overview["project"]["project_id"], project_id)
+        # other tests may have added children to the project ID already
+        self.assertEqual(overview["parameter_sets"][-1]["parameter_set_id"], parameter_set_id)
+        self.assertNotIn("training_parameters", overview["parameter_sets"][-1])
+        models = overview["trained_models"][-2:]
+        self.assertEqual([m["trained_model"]["model_id"] for m in models], model_ids)
+        self.assertIsNone(models[0]["trained_model"]["model_object"])
+        self.assertEqual(models[0]["latest_test"]["test_id"], test_ids[-1])
+        self.assertIsNone(models[1]["latest_test"])
+
+        response = requests.get(overview_url, params={"depth" : 1, "limit" : 1}, timeout=5)
+        models = response.json()["trained_models"]
+        self.assertEqual([m["trained_model"]["model_id"] for m in models], model_ids[1:])
+        response = requests.get(overview_url, params={"depth" : 0}, timeout=5)
+        self.assertEqual(set(response.json()), {"project"})
+
+        response = requests.get(overview_url, params={"depth" : 3}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+        response = requests.get(os.path.join(self.get_url(), "0", "overview"), timeout=5)
+        self.assertEqual(response.status_code, 404)
+
 if __name__ == "__main__":
     check_base_url(BASE_URL_KEY)
     unittest.main()
@@ -3,15 +3,25 @@ Run tests for Ringling trained models
 """
 # pylint: disable=duplicate-code
 import datetime as dt
+import gzip
+import hashlib
+import http.client
+import json
 import pickle
 import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 import requests
 
 from test_utils import check_base_url
 
 BASE_URL_KEY = "BASE_URL"
+CACHE_MAX_BYTES_KEY = "RINGLING_ARTIFACT_CACHE_MAX_BYTES"
+CACHE_MAX_BYTES = int(os.environ.get(CACHE_MAX_BYTES_KEY, "0"))
+MAX_CONTENT_LENGTH_KEY = "RINGLING_MAX_CONTENT_LENGTH"
+MAX_CONTENT_LENGTH = int(os.environ.get(MAX_CONTENT_LENGTH_KEY, "0"))
 
 class TrainedModelTests(unittest.TestCase):
     """
@@ -56,8 +66,10 @@ class TrainedModelTests(unittest.TestCase):
 
     def test_create_success_bad_schema(self):
         """
-        Test if a trained model with a bad schema generates the correct response
-        :return: If a trained model with bad schema returns a 400 error
+        Test if a trained model with a bad schema or invalid JSON generates the
+        correct response
+        :return: If a trained model with bad schema returns a 400 error, and raw
+        control characters in strings return a 400 naming their offset in the body
         """
         test_model = set([1, 3, 5])
 
@@ -79,6 +91,20 @@ class TrainedModelTests(unittest.TestCase):
 
         self.assertEqual(response.status_code, 400)
 
+        padding = "x" * 200000
+        bodies = [b'{"model_object" : "ab\ncd"}',
+                  b'{"metadata" : {"note" : "\t"}}',
+                  f'{{"metadata" : {{"pad" : "{padding}"}}, "model_object" : "ab\x01"}}'
+                  .encode("utf-8")]
+        for body in bodies:
+            response = requests.post(self.get_url(), data=body,
+                                     headers={"Content-Type" : "application/json"}, timeout=5)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("control character", response.json()["error"])
+
+        offset = bodies[2].index(b"\x01")
+        self.assertTrue(response.json()["error"].endswith(f"at byte {offset}"))
+
     def test_list_models(self):
         """
         Test if displaying all trained models works correctly
@@ -301,6 +327,397 @@ class TrainedModelTests(unittest.TestCase):
 
         self.assertEqual(response.status_code, 404)
 
+    def test_list_models_by_ids(self):
+        """
+        Test listing trained models by a list of IDs
+        :return: If only the requested trained models are returned, each as it is
+        returned by ID, and missing IDs are reported
+        """
+        model_ids = []
+        for parameter_set_id in [1, 2]:
+            obj = { "project_id" : 5,
+                    "parameter_set_id" : parameter_set_id,
+                    "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                    "training_data_until" : dt.datetime.now().isoformat(),
+                    "model_object" : pickle.dumps(set([1, 3, 5])).hex(),
+                    "train_timestamp" : dt.datetime.now().isoformat(),
+                    "deployment_stage" : "testing",
+                    "backtest_timestamp": dt.datetime.now().isoformat(),
+                    "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                    "passed_backtesting": True,
+                    "metadata": {"meta1": 1, "meta2": 2}
+            }
+
+            response = requests.post(self.get_url(),
+                                json=obj, timeout=5)
+
+            self.assertEqual(response.status_code, 201)
+            model_ids.append(response.json()["model_id"])
+
+        ids = ",".join(str(model_id) for model_id in model_ids + [0])
+        response = requests.get(self.get_url(), params={"ids" : ids}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+
+        json_response = response.json()
+        returned_ids = [model["model_id"] for model in json_response["trained_models"]]
+        self.assertCountEqual(model_ids, returned_ids)
+        self.assertEqual(json_response["missing_ids"], [0])
+        for model in json_response["trained_models"]:
+            response = requests.get(os.path.join(self.get_url(), str(model["model_id"])),
+                                    timeout=5)
+            self.assertEqual(model, response.json())
+
+    def test_list_models_by_bad_ids(self):
+        """
+        Test listing trained models with a malformed list of IDs
+        :return: If listing with non-integer IDs returned a 400
+        """
+        response = requests.get(self.get_url(), params={"ids" : "1,two,3"}, timeout=5)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    def test_get_model_object(self):
+        """
+        Test downloading the model object of a trained model by itself
+        :return: If the model object is returned with its digest as the ETag,
+        and a matching If-None-Match returns a 304
+        """
+        model_object = pickle.dumps(set([8, 13, 21])).hex()
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 50,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "model_object" : model_object,
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                "passed_backtesting": True,
+                "metadata": {"meta1": 1, "meta2": 2}
+        }
+
+        response = requests.post(self.get_url(), json=obj, timeout=5)
+        self.assertEqual(response.status_code, 201)
+        model_url = os.path.join(self.get_url(), str(response.json()["model_id"]))
+
+        response = requests.get(model_url, params={"include_model_object" : "false"},
+                                timeout=5)
+        self.assertEqual(response.status_code, 200)
+        json_response = response.json()
+        self.assertIsNone(json_response["model_object"])
+        digest = hashlib.sha256(model_object.encode("utf-8")).hexdigest()
+        self.assertEqual(json_response["model_digest"], digest)
+
+        object_url = os.path.join(model_url, "model_object")
+        for _ in range(2):
+            response = requests.get(object_url, timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content.decode("utf-8"), model_object)
+            self.assertEqual(response.headers["ETag"], f'"{digest}"')
+
+        response = requests.get(object_url, headers={"If-None-Match" : f'"{digest}"'},
+                                timeout=5)
+        self.assertEqual(response.status_code, 304)
+
+        response = requests.get(os.path.join(self.get_url(), "0", "model_object"), timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_model_concurrently(self):
+        """
+        Test many concurrent requests for the same trained model
+        :return: If every request gets the trained model, and each one either ran a fetch
+        or shared one in the coalescing metrics
+        """
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 52,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "model_object" : pickle.dumps(set(range(10000))).hex(),
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "production",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                "passed_backtesting": True,
+                "metadata": {"meta1": 1, "meta2": 2}
+        }
+
+        response = requests.post(self.get_url(), json=obj, timeout=5)
+        self.assertEqual(response.status_code, 201)
+        model_url = os.path.join(self.get_url(), str(response.json()["model_id"]))
+        metrics_url = os.path.join(os.environ[BASE_URL_KEY], "metrics")
+
+        def counts():
+            coalescing = requests.get(metrics_url, timeout=5).json()["coalescing"]
+            return coalescing["trained_model"]["fetches"] + \
+                coalescing["trained_model"]["coalesced"]
+
+        before = counts()
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            responses = list(executor.map(lambda _: requests.get(model_url, timeout=10),
+                                          range(32)))
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["model_object"], obj["model_object"])
+        self.assertEqual(counts() - before, len(responses))
+
+    def test_promote_model(self):
+        """
+        Test promoting trained models, including concurrent promotions in one project
+        :return: If the promoted model is the only production model of its project, the
+        others are retired and returned, and an unknown ID returns a 404
+        """
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/projects"),
+                                 json={"project_name" : f"promote{dt.datetime.now()}",
+                                       "metadata" : {}},
+                                 timeout=5)
+        project_id = response.json()["project_id"]
+        model_ids = []
+        for stage in ["production", "production", "testing", "testing", "testing"]:
+            obj = { "project_id" : project_id,
+                    "parameter_set_id" : 53,
+                    "training_data_from" : dt.datetime.now().isoformat(),
+                    "training_data_until" : dt.datetime.now().isoformat(),
+                    "model_object" : "abcdef",
+                    "train_timestamp" : dt.datetime.now().isoformat(),
+                    "deployment_stage" : stage,
+                    "backtest_timestamp": dt.datetime.now().isoformat(),
+                    "backtest_metrics": {},
+                    "passed_backtesting": True,
+                    "metadata": {}
+            }
+            response = requests.post(self.get_url(), json=obj, timeout=5)
+            model_ids.append(response.json()["model_id"])
+
+        response = requests.post(os.path.join(self.get_url(), str(model_ids[2]), "promote"),
+                                 timeout=5)
+        self.assertEqual(response.status_code, 200)
+        json_response = response.json()
+        self.assertEqual(json_response["promoted"],
+                         {"model_id" : model_ids[2], "deployment_stage" : "production"})
+        self.assertEqual(json_response["retired"],
+                         [{"model_id" : _id, "deployment_stage" : "retired"}
+                          for _id in model_ids[:2]])
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = list(executor.map(
+                lambda _id: requests.post(os.path.join(self.get_url(), str(_id), "promote"),
+                                          timeout=5),
+                model_ids[3:]))
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+
+        response = requests.get(self.get_url(), params={"project_id" : project_id,
+                                                        "deployment_stage" : "production"},
+                                timeout=5)
+        production_ids = [m["model_id"] for m in response.json()["trained_models"]]
+        self.assertEqual(len(production_ids), 1)
+        self.assertIn(production_ids[0], model_ids[3:])
+
+        response = requests.post(os.path.join(self.get_url(), "0", "promote"), timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_update_stage(self):
+        """
+        Test updating the deployment stage of many trained models at once
+        :return: If the models trained before a date are retired, and a dry run changes nothing
+        """
+        response = requests.post(os.path.join(os.environ[BASE_URL_KEY], "v1/projects"),
+                                 json={"project_name" : f"bulk{dt.datetime.now()}",
+                                       "metadata" : {}},
+                                 timeout=5)
+        project_id = response.json()["project_id"]
+        model_ids = []
+        for days in [200, 100, 10]:
+            train_timestamp = dt.datetime.now() - dt.timedelta(days=days)
+            obj = { "project_id" : project_id,
+                    "parameter_set_id" : 54,
+                    "training_data_from" : train_timestamp.isoformat(),
+                    "training_data_until" : train_timestamp.isoformat(),
+                    "model_object" : "abcdef",
+                    "train_timestamp" : train_timestamp.isoformat(),
+                    "deployment_stage" : "testing",
+                    "backtest_timestamp": dt.datetime.now().isoformat(),
+                    "backtest_metrics": {},
+                    "passed_backtesting": True,
+                    "metadata": {}
+            }
+            response = requests.post(self.get_url(), json=obj, timeout=5)
+            model_ids.append(response.json()["model_id"])
+
+        cutoff = (dt.datetime.now() - dt.timedelta(days=90)).isoformat()
+        update = {"deployment_stage" : "retired", "dry_run" : True,
+                  "filter" : {"project_id" : project_id, "train_timestamp_before" : cutoff}}
+        for dry_run in [True, False]:
+            update["dry_run"] = dry_run
+            response = requests.patch(self.get_url(), json=update, timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(),
+                             {"dry_run" : dry_run, "count" : 2, "ids" : model_ids[:2]})
+
+        response = requests.get(self.get_url(), params={"project_id" : project_id, "limit" : 10},
+                                timeout=5)
+        self.assertEqual([m["deployment_stage"] for m in response.json()["trained_models"]],
+                         ["retired", "retired", "testing"])
+
+        response = requests.patch(self.get_url(), json={"deployment_stage" : "retired",
+                                                        "ids" : model_ids}, timeout=5)
+        self.assertEqual(response.json()["ids"], model_ids[2:])
+
+        for stage in ["archived", "production"]:
+            response = requests.patch(self.get_url(), json={"deployment_stage" : stage,
+                                                            "ids" : model_ids}, timeout=5)
+            self.assertEqual(response.status_code, 400)
+
+    def test_upload_model(self):
+        """
+        Test creating a trained model with a multipart upload of its model object
+        :return: If gzip compressed and plain uploads are stored, and bad uploads return a 400
+        """
+        model_object = pickle.dumps(set(range(1000))).hex()
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 51,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                "passed_backtesting": True,
+                "metadata": {"meta1": 1, "meta2": 2}
+        }
+
+        uploads = [(gzip.compress(model_object.encode("utf-8")), "application/gzip"),
+                   (model_object.encode("utf-8"), "application/octet-stream")]
+        for body, content_type in uploads:
+            response = requests.post(self.get_url(),
+                                     data={"trained_model" : json.dumps(obj)},
+                                     files={"model_object" : ("model_object", body, content_type)},
+                                     timeout=5)
+            self.assertEqual(response.status_code, 201)
+
+            model_url = os.path.join(self.get_url(), str(response.json()["model_id"]))
+            json_response = requests.get(model_url, timeout=5).json()
+            self.assertEqual(json_response["model_object"], model_object)
+            self.assertEqual(json_response["parameter_set_id"], 51)
+            self.assertEqual(json_response["model_digest"],
+                             hashlib.sha256(model_object.encode("utf-8")).hexdigest())
+
+        response = requests.post(self.get_url(),
+                                 data={"trained_model" : json.dumps(obj)},
+                                 files={"model_object" : ("model_object", b"\xff\x00",
+                                                          "application/octet-stream")},
+                                 timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+        response = requests.post(self.get_url(),
+                                 files={"model_object" : ("model_object", b"abcdef",
+                                                          "application/octet-stream")},
+                                 timeout=5)
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_large_model(self):
+        """
+        Test creating a trained model whose model object is large enough to be spooled
+        :return: If the model object is stored unchanged
+        """
+        model_object = os.urandom(3 * 1024 * 1024).hex()
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 52,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "model_object" : model_object,
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                "passed_backtesting": True,
+                "metadata": {"meta1": 1, "meta2": 2}
+        }
+
+        response = requests.post(self.get_url(), json=obj, timeout=30)
+        self.assertEqual(response.status_code, 201)
+
+        model_url = os.path.join(self.get_url(), str(response.json()["model_id"]),
+                                 "model_object")
+        response = requests.get(model_url, timeout=30)
+        self.assertEqual(response.content.decode("utf-8"), model_object)
+        self.assertEqual(response.headers["ETag"],
+                         f'"{hashlib.sha256(model_object.encode("utf-8")).hexdigest()}"')
+
+    @unittest.skipIf(not 0 < MAX_CONTENT_LENGTH <= 256 * 1024 ** 2,
+                     f"{MAX_CONTENT_LENGTH_KEY} is not set to a small maximum of the server")
+    def test_upload_decompresses_too_large(self):
+        """
+        Test uploading a gzip compressed model object that decompresses to
+        more than the maximum request size
+        :return: If a 413 is returned
+        """
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 52,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8},
+                "passed_backtesting": True,
+                "metadata": {}
+        }
+        body = gzip.compress(b"0" * (MAX_CONTENT_LENGTH + 1))
+        response = requests.post(self.get_url(), data={"trained_model": json.dumps(obj)},
+                                 files={"model_object" : ("model_object", body,
+                                                          "application/gzip")},
+                                 timeout=30)
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("error", response.json())
+
+    @unittest.skipIf(not 0 < CACHE_MAX_BYTES <= 64 * 1024 ** 2,
+                     f"{CACHE_MAX_BYTES_KEY} is not set to a small cache budget of the server")
+    def test_get_model_object_over_cache_budget(self):
+        """
+        Test getting a model object larger than the artifact cache of the server
+        :return: If the model object is sent from the database every time
+        """
+        model_object = "ab" * (CACHE_MAX_BYTES // 2 + 1)
+        obj = { "project_id" : 5,
+                "parameter_set_id" : 52,
+                "training_data_from" : (dt.datetime.now() - dt.timedelta(days=3)).isoformat(),
+                "training_data_until" : dt.datetime.now().isoformat(),
+                "model_object" : model_object,
+                "train_timestamp" : dt.datetime.now().isoformat(),
+                "deployment_stage" : "testing",
+                "backtest_timestamp": dt.datetime.now().isoformat(),
+                "backtest_metrics": {"recall": 0.8, "precision": 0.2},
+                "passed_backtesting": True,
+                "metadata": {}
+        }
+
+        response = requests.post(self.get_url(), json=obj, timeout=30)
+        self.assertEqual(response.status_code, 201)
+
+        model_url = os.path.join(self.get_url(), str(response.json()["model_id"]),
+                                 "model_object")
+        for _ in range(2):
+            response = requests.get(model_url, timeout=30)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content.decode("utf-8"), model_object)
+
+    def test_create_too_large(self):
+        """
+        Test creating a trained model with a body over the maximum size
+        :return: If a 413 is returned before the body is sent
+        """
+        url = urlparse(self.get_url())
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+        conn.putrequest("POST", url.path)
+        conn.putheader("Content-Type", "application/json")
+        conn.putheader("Content-Length", str(64 * 1024 ** 3))
+        conn.endheaders()
+        response = conn.getresponse()
+        self.assertEqual(response.status, 413)
+        self.assertIn("error", json.loads(response.read()))
+        conn.close()
+
 if __name__ == "__main__":
     check_base_url(BASE_URL_KEY)
     unittest.main()